@@ -29,6 +29,8 @@ class BgCommandHandler(object):
     """
 
     SHOULD_KILL_PROC_GROUP = True
+    # Submit does not wait for the job, so no gain in concurrent submits.
+    SUBMIT_MAX_WORKERS = 1
     POLL_CMD = "ps"
     REC_ID_FROM_SUBMIT_OUT = re.compile(r"""\A(?P<id>\d+)\Z""")
 
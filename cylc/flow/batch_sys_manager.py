@@ -62,6 +62,13 @@ batch_sys.submit(job_file_path, submit_opts) => ret_code, out, err
       beyond just running a system or shell command. See also
       "batch_sys.SUBMIT_CMD".
 
+batch_sys.submit_many(job_file_paths, submit_opts_list) => results
+    * Submit multiple jobs in one go, e.g. with a single call to the batch
+      system, and return a list containing a (ret_code, out, err) tuple for
+      each job, in the same order as the arguments. The job ID of each job is
+      extracted from its "out" and "err" as for "batch_sys.submit". Jobs
+      with a job submit command template are not submitted in this way.
+
 batch_sys.manip_job_id(job_id) => job_id
     * Modify the job ID that is returned by the job submit command.
 
@@ -104,6 +111,13 @@ batch_sys.SUBMIT_CMD_ENV
       containing extra environment variables for getting the batch system
       command to submit a job file.
 
+batch_sys.SUBMIT_MAX_WORKERS
+    * The maximum number of jobs to submit concurrently, in separate threads,
+      in a call to "BatchSysManager.jobs_submit". Default is 1 if
+      "batch_sys.submit" is defined, as it may not be thread-safe, otherwise
+      "BatchSysManager.SUBMIT_MAX_WORKERS". Set to 1 to submit jobs one at a
+      time.
+
 batch_sys.SUBMIT_CMD_TMPL
     * A Python string template for getting the batch system command to submit a
       job file. The command is formed using the logic:
@@ -112,6 +126,7 @@ batch_sys.SUBMIT_CMD_TMPL
 
 """
 
+from concurrent.futures import ThreadPoolExecutor
 import json
 import os
 import shlex
@@ -206,6 +221,7 @@ class BatchSysManager():
     OUT_PREFIX_MESSAGE = "[TASK JOB MESSAGE]"
     OUT_PREFIX_SUMMARY = "[TASK JOB SUMMARY]"
     OUT_PREFIX_CMD_ERR = "[TASK JOB ERROR]"
+    SUBMIT_MAX_WORKERS = 4
     _INSTANCES = {}
 
     @classmethod
@@ -359,15 +375,13 @@ class BatchSysManager():
         else:
             items = self._jobs_submit_prep_by_args(job_log_root, job_log_dirs)
         now = get_current_time_string(override_use_utc=utc_mode)
-        for job_log_dir, batch_sys_name, submit_opts in items:
-            job_file_path = os.path.join(
-                job_log_root, job_log_dir, JOB_LOG_JOB)
+        results = self._jobs_submit_impl(job_log_root, items)
+        for (job_log_dir, batch_sys_name, _), result in zip(items, results):
             if not batch_sys_name:
                 sys.stdout.write("%s%s|%s|1|\n" % (
                     self.OUT_PREFIX_SUMMARY, now, job_log_dir))
                 continue
-            ret_code, out, err, job_id = self._job_submit_impl(
-                job_file_path, batch_sys_name, submit_opts)
+            ret_code, out, err, job_id = result
             sys.stdout.write("%s%s|%s|%d|%s\n" % (
                 self.OUT_PREFIX_SUMMARY, now, job_log_dir, ret_code, job_id))
             for key, value in [("STDERR", err), ("STDOUT", out)]:
@@ -543,54 +557,25 @@ class BatchSysManager():
             bad_pids.extend(exp_pids)
             items.append([self._get_sys("background"), exp_pids, bad_pids])
         debug_messages = []
+        poll_cache = self._get_poll_cache(batch_sys_name)
         for batch_sys, exp_ids, bad_ids in items:
-            if hasattr(batch_sys, "get_poll_many_cmd"):
-                # Some poll commands may not be as simple
-                cmd = batch_sys.get_poll_many_cmd(exp_ids)
-            else:  # if hasattr(batch_sys, "POLL_CMD"):
-                # Simple poll command that takes a list of job IDs
-                cmd = [batch_sys.POLL_CMD] + exp_ids
             try:
-                proc = procopen(cmd, stdindevnull=True,
-                                stderrpipe=True, stdoutpipe=True)
+                if poll_cache is not None and bad_ids is bad_job_ids:
+                    present_ids = poll_cache.get_present_ids(
+                        exp_ids,
+                        lambda ids: self._jobs_poll_batch_sys_query(
+                            batch_sys, ids, debug_messages))
+                else:
+                    present_ids = self._jobs_poll_batch_sys_query(
+                        batch_sys, exp_ids, debug_messages)
             except OSError as exc:
-                # subprocess.Popen has a bad habit of not setting the
-                # filename of the executable when it raises an OSError.
-                if not exc.filename:
-                    exc.filename = cmd[0]
                 sys.stderr.write(str(exc) + "\n")
                 return
-            ret_code = proc.wait()
-            out, err = (f.decode() for f in proc.communicate())
-            debug_messages.append('%s - %s' % (
-                batch_sys, len(out.split('\n'))))
-            sys.stderr.write(err)
-            if (ret_code and hasattr(batch_sys, "POLL_CANT_CONNECT_ERR") and
-                    batch_sys.POLL_CANT_CONNECT_ERR in err):
-                # Poll command failed because it cannot connect to batch system
+            if present_ids is None:
                 # Assume jobs are still healthy until the batch system is back.
                 bad_ids[:] = []
-            elif hasattr(batch_sys, "filter_poll_many_output"):
-                # Allow custom filter
-                for id_ in batch_sys.filter_poll_many_output(out):
-                    try:
-                        bad_ids.remove(id_)
-                    except ValueError:
-                        pass
             else:
-                # Just about all poll commands return a table, with column 1
-                # being the job ID. The logic here should be sufficient to
-                # ensure that any table header is ignored.
-                for line in out.splitlines():
-                    try:
-                        head = line.split(None, 1)[0]
-                    except IndexError:
-                        continue
-                    if head in exp_ids:
-                        try:
-                            bad_ids.remove(head)
-                        except ValueError:
-                            pass
+                bad_ids[:] = [id_ for id_ in bad_ids if id_ not in present_ids]
 
         debug_flag = False
         for ctx in my_ctx_list:
@@ -618,23 +603,81 @@ class BatchSysManager():
         if debug_flag:
             ctx.batch_sys_call_no_lines = ', '.join(debug_messages)
 
+    @staticmethod
+    def _jobs_poll_batch_sys_query(batch_sys, exp_ids, debug_messages):
+        """Helper 3 for self.jobs_poll(job_log_root, job_log_dirs).
+
+        Run the poll command of batch_sys for exp_ids. Return the set of the
+        IDs still in the batch system, or None if the poll command cannot
+        connect to the batch system.
+        """
+        if hasattr(batch_sys, "get_poll_many_cmd"):
+            # Some poll commands may not be as simple
+            cmd = batch_sys.get_poll_many_cmd(exp_ids)
+        else:  # if hasattr(batch_sys, "POLL_CMD"):
+            # Simple poll command that takes a list of job IDs
+            cmd = [batch_sys.POLL_CMD] + exp_ids
+        try:
+            proc = procopen(cmd, stdindevnull=True,
+                            stderrpipe=True, stdoutpipe=True)
+        except OSError as exc:
+            # subprocess.Popen has a bad habit of not setting the
+            # filename of the executable when it raises an OSError.
+            if not exc.filename:
+                exc.filename = cmd[0]
+            raise
+        ret_code = proc.wait()
+        out, err = (f.decode() for f in proc.communicate())
+        debug_messages.append('%s - %s' % (
+            batch_sys, len(out.split('\n'))))
+        sys.stderr.write(err)
+        if (ret_code and hasattr(batch_sys, "POLL_CANT_CONNECT_ERR") and
+                batch_sys.POLL_CANT_CONNECT_ERR in err):
+            # Poll command failed because it cannot connect to batch system
+            return None
+        present_ids = set()
+        if hasattr(batch_sys, "filter_poll_many_output"):
+            # Allow custom filter
+            for id_ in batch_sys.filter_poll_many_output(out):
+                if id_ in exp_ids:
+                    present_ids.add(id_)
+        else:
+            # Just about all poll commands return a table, with column 1
+            # being the job ID. The logic here should be sufficient to
+            # ensure that any table header is ignored.
+            for line in out.splitlines():
+                try:
+                    head = line.split(None, 1)[0]
+                except IndexError:
+                    continue
+                if head in exp_ids:
+                    present_ids.add(head)
+        return present_ids
+
+    @staticmethod
+    def _get_poll_cache(batch_sys_name):
+        """Return the shared poll cache for batch_sys_name, if configured.
+
+        See "[hosts][localhost][batch systems][NAME]poll cache ttl" in the
+        global config of the job host.
+        """
+        from cylc.flow.batch_sys_poll_cache import BatchSysPollCache
+        from cylc.flow.cfgspec.glbl_cfg import glbl_cfg
+        try:
+            ttl = glbl_cfg().get_host_item('batch systems')[batch_sys_name][
+                'poll cache ttl']
+        except KeyError:
+            ttl = None
+        if not ttl:
+            return None
+        return BatchSysPollCache(
+            glbl_cfg().get_host_item('batch system poll cache directory'),
+            batch_sys_name, ttl)
+
     def _job_submit_impl(
             self, job_file_path, batch_sys_name, submit_opts):
         """Helper for self.jobs_submit() and self.job_submit()."""
-
-        # Create NN symbolic link, if necessary
-        self._create_nn(job_file_path)
-        for name in JOB_LOG_ERR, JOB_LOG_OUT:
-            try:
-                os.unlink(os.path.join(job_file_path, name))
-            except OSError:
-                pass
-
-        # Start new status file
-        job_status_file = open(job_file_path + ".status", "w")
-        job_status_file.write(
-            "%s=%s\n" % (self.CYLC_BATCH_SYS_NAME, batch_sys_name))
-        job_status_file.close()
+        self._job_submit_prep(job_file_path, batch_sys_name)
 
         # Submit job
         batch_sys = self._get_sys(batch_sys_name)
@@ -685,6 +728,27 @@ class BatchSysManager():
             except (AttributeError, IOError):
                 pass
 
+        return self._job_submit_result(
+            job_file_path, batch_sys, ret_code, out, err)
+
+    def _job_submit_prep(self, job_file_path, batch_sys_name):
+        """Prepare the job log directory for a job submit."""
+        # Create NN symbolic link, if necessary
+        self._create_nn(job_file_path)
+        for name in JOB_LOG_ERR, JOB_LOG_OUT:
+            try:
+                os.unlink(os.path.join(job_file_path, name))
+            except OSError:
+                pass
+
+        # Start new status file
+        job_status_file = open(job_file_path + ".status", "w")
+        job_status_file.write(
+            "%s=%s\n" % (self.CYLC_BATCH_SYS_NAME, batch_sys_name))
+        job_status_file.close()
+
+    def _job_submit_result(self, job_file_path, batch_sys, ret_code, out, err):
+        """Return (ret_code, out, err, job_id) for a job submit command."""
         # Filter submit command output, if relevant
         # Get job ID, if possible
         job_id = None
@@ -698,6 +762,65 @@ class BatchSysManager():
 
         return ret_code, out, err, job_id
 
+    def _jobs_submit_impl(self, job_log_root, items):
+        """Submit the jobs of the items from a "self._jobs_submit_prep_*".
+
+        Use "batch_sys.submit_many" where possible. Otherwise, submit jobs of
+        each batch system concurrently, up to its SUBMIT_MAX_WORKERS at a
+        time (by default, one at a time for a custom "batch_sys.submit").
+
+        Return a list containing (ret_code, out, err, job_id) for each item,
+        or None for an item without a batch system.
+        """
+        results = [None] * len(items)
+        # {(batch_sys_name, is_many): [(index, job_file_path), ...], ...}
+        groups = {}
+        for i, (job_log_dir, batch_sys_name, submit_opts) in enumerate(items):
+            if not batch_sys_name:
+                continue
+            is_many = (
+                hasattr(self._get_sys(batch_sys_name), "submit_many")
+                and not submit_opts.get("batch_submit_cmd_tmpl"))
+            groups.setdefault((batch_sys_name, is_many), []).append((
+                i, os.path.join(job_log_root, job_log_dir, JOB_LOG_JOB)))
+        for (batch_sys_name, is_many), group in groups.items():
+            batch_sys = self._get_sys(batch_sys_name)
+            if is_many:
+                for _, job_file_path in group:
+                    self._job_submit_prep(job_file_path, batch_sys_name)
+                many_results = list(batch_sys.submit_many(
+                    [job_file_path for _, job_file_path in group],
+                    [items[i][2] for i, _ in group]))
+                # A job without a result is not submitted
+                many_results += [(1, None, "submit_many: no result")] * (
+                    len(group) - len(many_results))
+                group_results = [
+                    self._job_submit_result(
+                        job_file_path, batch_sys, ret_code, out, err)
+                    for (_, job_file_path), (ret_code, out, err) in zip(
+                        group, many_results)]
+            else:
+                args = [
+                    (job_file_path, batch_sys_name, items[i][2])
+                    for i, job_file_path in group]
+                n_workers = getattr(batch_sys, "SUBMIT_MAX_WORKERS", None)
+                if n_workers is None:
+                    # A custom "submit" may not be thread-safe
+                    n_workers = self.SUBMIT_MAX_WORKERS
+                    if hasattr(batch_sys, "submit"):
+                        n_workers = 1
+                n_workers = min(len(args), n_workers)
+                if n_workers > 1:
+                    with ThreadPoolExecutor(n_workers) as executor:
+                        group_results = list(executor.map(
+                            lambda arg: self._job_submit_impl(*arg), args))
+                else:
+                    group_results = [
+                        self._job_submit_impl(*arg) for arg in args]
+            for (i, _), result in zip(group, group_results):
+                results[i] = result
+        return results
+
     def _jobs_submit_prep_by_args(self, job_log_root, job_log_dirs):
         """Prepare job files for submit by reading files in arguments.
 
@@ -0,0 +1,109 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Cache of batch system poll results, shared by suites on a job host.
+
+Without the cache, the `cylc jobs-poll` command of each suite queries the
+batch system for the jobs of that suite only. With the cache, each
+`cylc jobs-poll` command registers its job IDs in a cache file for the batch
+system, in a directory shared by the suites. The first command after the
+cache has expired queries the batch system for the job IDs of all of the
+suites, in one go, and writes the result to the cache. Other commands get the
+result from the cache until it expires. Job IDs not yet in the cache are
+queried at once, and are added to the cache. Access to the cache file is
+serialised with a lock file, so concurrent commands do not query the batch
+system for the same jobs.
+
+"""
+
+import fcntl
+import json
+import os
+from time import time
+
+
+class BatchSysPollCache():
+    """Cache of batch system poll results, for a batch system.
+
+    The cache file contains a JSON object with:
+        "time": time of the last query of all wanted job IDs,
+        "wanted": {job_id: time job ID last registered, ...},
+        "queried": [job IDs queried since "time", ...],
+        "present": [queried job IDs in the batch system, ...]
+    """
+
+    # Stop querying a job ID not registered for this number of TTLs.
+    EXPIRE_TTLS = 10
+
+    def __init__(self, cache_dir, batch_sys_name, ttl):
+        self.path = os.path.join(cache_dir, batch_sys_name + '.json')
+        self.ttl = ttl
+
+    def get_present_ids(self, job_ids, query):
+        """Return the set of job IDs that are in the batch system.
+
+        Arguments:
+            job_ids (list):
+                Job IDs to poll.
+            query (callable):
+                Function to query the batch system. Should have signature:
+                    query(job_ids) -> set
+                returning the set of the job IDs that are in the batch
+                system, or None if the batch system cannot be queried.
+
+        Return None if the batch system cannot be queried.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + '.lock', 'a') as lock_handle:
+            fcntl.flock(lock_handle, fcntl.LOCK_EX)
+            try:
+                with open(self.path) as handle:
+                    data = json.load(handle)
+            except (OSError, ValueError):
+                data = {}
+            now = time()
+            wanted = {
+                id_: wanted_time
+                for id_, wanted_time in data.get('wanted', {}).items()
+                if now - wanted_time < self.ttl * self.EXPIRE_TTLS}
+            for id_ in job_ids:
+                wanted[id_] = now
+            data['wanted'] = wanted
+            if now - data.get('time', 0) >= self.ttl:
+                # Cache expired, query all wanted job IDs
+                data['time'] = now
+                data['queried'] = []
+                data['present'] = []
+                query_ids = sorted(wanted)
+            else:
+                query_ids = sorted(set(job_ids) - set(data['queried']))
+            present_ids = set(data.get('present', []))
+            result = None
+            if query_ids:
+                result = query(query_ids)
+                if result is None:
+                    # Do not cache failures.
+                    data.pop('time', None)
+                else:
+                    data['queried'] += query_ids
+                    present_ids.update(result)
+                    data['present'] = sorted(present_ids)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as handle:
+                json.dump(data, handle)
+            os.replace(tmp_path, self.path)
+        if query_ids and result is None:
+            return None
+        return present_ids.intersection(job_ids)
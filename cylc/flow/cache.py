@@ -0,0 +1,144 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Bounded least recently used caches, with statistics.
+
+Caches with the same name share their statistics, e.g. the caches of each
+cycling sequence object. The statistics of all caches are returned by
+get_cache_stats, for the profiler and the suite server API. That may be
+called in another thread (of the server), so caches and their statistics
+are registered under a lock.
+"""
+
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+from weakref import WeakSet
+
+# Live caches, for their sizes.
+_CACHES = WeakSet()
+# Statistics of caches, by cache name.
+_CACHE_STATS = {}
+# Lock for changes to, and snapshots of, _CACHES and _CACHE_STATS.
+_LOCK = Lock()
+
+
+class CacheStats(object):
+    """Hit, miss and eviction counts of caches of the same name."""
+
+    __slots__ = ('hits', 'misses', 'evictions')
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+class LRUCache(object):
+    """A mapping of at most maxsize items.
+
+    Once full, putting a new item evicts the least recently used item.
+    """
+
+    __slots__ = ('name', 'maxsize', 'stats', '_items', '__weakref__')
+
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        with _LOCK:
+            self.stats = _CACHE_STATS.setdefault(name, CacheStats())
+            _CACHES.add(self)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __reduce__(self):
+        # Pickle (e.g. in a suite config cache) without the items.
+        return (LRUCache, (self.name, self.maxsize))
+
+    def clear(self):
+        """Remove all items."""
+        self._items.clear()
+
+    def discard(self, key):
+        """Remove the item for key, if any."""
+        self._items.pop(key, None)
+
+    def get(self, key, default=None):
+        """Return the value for key (as most recently used), or default."""
+        try:
+            value = self._items[key]
+        except KeyError:
+            self.stats.misses += 1
+            return default
+        self._items.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Set the value for key, evicting the least recently used item if
+        full."""
+        self._items[key] = value
+        self._items.move_to_end(key)
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+            self.stats.evictions += 1
+
+
+def get_cache_stats():
+    """Return the statistics of all caches, by cache name.
+
+    Return a dict {name: {"size": ..., "hits": ..., "misses": ...,
+    "evictions": ...}}, where size is the number of items in all live caches
+    of the name.
+    """
+    with _LOCK:
+        caches = list(_CACHES)
+        all_stats = list(_CACHE_STATS.items())
+    sizes = {}
+    for cache in caches:
+        sizes[cache.name] = sizes.get(cache.name, 0) + len(cache)
+    return {
+        name: {
+            'size': sizes.get(name, 0),
+            'hits': stats.hits,
+            'misses': stats.misses,
+            'evictions': stats.evictions}
+        for name, stats in all_stats}
+
+
+def lru_memoize(maxsize, name=None):
+    """Return a decorator to cache results of a function in an LRUCache.
+
+    The arguments and results of the function must be immutable. Keyword
+    arguments are not allowed. The name of the cache defaults to the
+    qualified name of the function.
+    """
+    def _decorator(function):
+        cache = LRUCache(name or function.__qualname__, maxsize)
+        missing = object()
+
+        @wraps(function)
+        def _wrapper(*args):
+            """Cache results for function(*args)."""
+            result = cache.get(args, missing)
+            if result is missing:
+                result = function(*args)
+                cache.put(args, result)
+            return result
+        _wrapper.cache = cache
+        return _wrapper
+    return _decorator
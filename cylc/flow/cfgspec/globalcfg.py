@@ -38,6 +38,14 @@ SPEC = {
     # suite
     'process pool size': [VDR.V_INTEGER, 4],
     'process pool timeout': [VDR.V_INTERVAL, DurationFloat(600)],
+    # Maximum number of concurrent commands of each type, e.g.
+    # "event-handler = 2", so that they cannot fill up the pool.
+    'process pool limits': {
+        '__MANY__': [VDR.V_INTEGER],
+    },
+    # Number of persistent worker processes to run xtrigger functions in.
+    # If 0, run each xtrigger function call in a new subprocess.
+    'process pool function workers': [VDR.V_INTEGER, 0],
     # client
     'disable interactive command prompts': [VDR.V_BOOLEAN, True],
     # suite
@@ -46,6 +54,11 @@ SPEC = {
     'cylc': {
         'UTC mode': [VDR.V_BOOLEAN],
         'health check interval': [VDR.V_INTERVAL, DurationFloat(600)],
+        'main loop mode': [VDR.V_STRING, 'polling', 'event'],
+        'database write mode': [VDR.V_STRING, 'main loop', 'thread'],
+        'suite config cache': [VDR.V_BOOLEAN, False],
+        'lazy runtime': [VDR.V_BOOLEAN, False],
+        'runtime cache size': [VDR.V_INTEGER, 1000],
         'task event mail interval': [VDR.V_INTERVAL, DurationFloat(300)],
         'events': {
             'handlers': [VDR.V_STRING_LIST],
@@ -162,6 +175,16 @@ SPEC = {
             'ssh command': [
                 VDR.V_STRING, 'ssh -oBatchMode=yes -oConnectTimeout=10'],
             'use login shell': [VDR.V_BOOLEAN, True],
+            # Run ssh commands to the host over a single connection, held
+            # open by the suite server program.
+            'ssh control master': [VDR.V_BOOLEAN, False],
+            # Maximum number of commands to the host to run at the same time.
+            # Defaults to 10, the default "MaxSessions" of sshd, with "ssh
+            # control master", else unlimited.
+            'max concurrent commands': [VDR.V_INTEGER],
+            # Submit jobs via a persistent "cylc jobs-submit-agent", instead
+            # of a new "cylc jobs-submit" command for each batch of jobs.
+            'job submission agent': [VDR.V_BOOLEAN, False],
             'cylc executable': [VDR.V_STRING, 'cylc'],
             'global init-script': [VDR.V_STRING],
             'copyable environment variables': [VDR.V_STRING_LIST],
@@ -172,6 +195,8 @@ SPEC = {
             'task event handler retry delays': [VDR.V_INTERVAL_LIST],
             'tail command template': [
                 VDR.V_STRING, 'tail -n +1 -F %(filename)s'],
+            'batch system poll cache directory': [
+                VDR.V_STRING, '$HOME/.cylc/poll-cache'],
             'batch systems': {
                 '__MANY__': {
                     'err tailer': [VDR.V_STRING],
@@ -181,6 +206,9 @@ SPEC = {
                     'job name length maximum': [VDR.V_INTEGER],
                     'execution time limit polling intervals': [
                         VDR.V_INTERVAL_LIST],
+                    # Share "cylc jobs-poll" batch system queries between
+                    # suites on this job host, for this long.
+                    'poll cache ttl': [VDR.V_INTERVAL],
                 },
             },
         },
@@ -194,6 +222,9 @@ SPEC = {
             'scp command': [VDR.V_STRING],
             'ssh command': [VDR.V_STRING],
             'use login shell': [VDR.V_BOOLEAN],
+            'ssh control master': [VDR.V_BOOLEAN],
+            'max concurrent commands': [VDR.V_INTEGER],
+            'job submission agent': [VDR.V_BOOLEAN],
             'cylc executable': [VDR.V_STRING],
             'global init-script': [VDR.V_STRING],
             'copyable environment variables': [VDR.V_STRING_LIST],
@@ -203,6 +234,7 @@ SPEC = {
             'retrieve job logs retry delays': [VDR.V_INTERVAL_LIST],
             'task event handler retry delays': [VDR.V_INTERVAL_LIST],
             'tail command template': [VDR.V_STRING],
+            'batch system poll cache directory': [VDR.V_STRING],
             'batch systems': {
                 '__MANY__': {
                     'err tailer': [VDR.V_STRING],
@@ -212,6 +244,7 @@ SPEC = {
                     'job name length maximum': [VDR.V_INTEGER],
                     'execution time limit polling intervals': [
                         VDR.V_INTERVAL_LIST],
+                    'poll cache ttl': [VDR.V_INTERVAL],
                 },
             },
         },
@@ -27,18 +27,24 @@ structures.
 """
 
 
+from collections import OrderedDict
 from copy import copy
 from fnmatch import fnmatchcase
+from functools import partial
 import os
 import re
+from time import time
 import traceback
 
 from metomi.isodatetime.data import Calendar
 from metomi.isodatetime.parsers import DurationParser
 from cylc.flow.parsec.OrderedDict import OrderedDictWithDefaults
-from cylc.flow.parsec.util import replicate
+from cylc.flow.parsec.config import get_defaults
+from cylc.flow.parsec.util import (
+    expand_section, layer, pdeepcopy, replicate, un_many)
 
-from cylc.flow import LOG
+from cylc.flow import LOG, config_cache
+from cylc.flow.cache import LRUCache
 from cylc.flow.c3mro import C3
 from cylc.flow.conditional_simplifier import ConditionalSimplifier
 from cylc.flow.exceptions import (
@@ -62,7 +68,7 @@ from cylc.flow.pathutil import (
 )
 from cylc.flow.print_tree import print_tree
 from cylc.flow.subprocctx import SubFuncContext
-from cylc.flow.suite_files import NO_TITLE
+from cylc.flow.suite_files import NO_TITLE, SuiteFiles
 from cylc.flow.taskdef import TaskDef
 from cylc.flow.task_id import TaskID
 from cylc.flow.task_outputs import TASK_OUTPUT_SUCCEEDED
@@ -90,6 +96,50 @@ def check_varnames(env):
             bad.append(varname)
     return bad
 
+
+class LazyRuntimeConfig(OrderedDictWithDefaults):
+    """The [runtime] section of a dense suite config, resolved on access.
+
+    Holds the sparse (inherited) config of each namespace. Getting an item
+    returns the dense config of the namespace, resolved by calling
+    resolve(name, sparse), and kept in a bounded LRU cache; if evicted, it is
+    resolved again on the next access. Changes to a dense namespace config
+    are therefore not kept: setting an item sets its sparse config.
+    """
+
+    def __init__(self, resolve, maxsize):
+        super().__init__()
+        self.resolve = resolve
+        self.cache = LRUCache('runtime config', maxsize)
+
+    def __getitem__(self, name):
+        result = self.cache.get(name)
+        if result is None:
+            result = self.resolve(name, self.get_sparse(name))
+            self.cache.put(name, result)
+        return result
+
+    def __setitem__(self, name, sparse):
+        super().__setitem__(name, sparse)
+        self.cache.discard(name)
+
+    def __reduce__(self):
+        # Pickle (e.g. in a suite config cache) the sparse configs only. The
+        # resolve function must be set again after unpickling.
+        return (
+            LazyRuntimeConfig, (None, self.cache.maxsize), None, None,
+            ((name, self.get_sparse(name)) for name in self))
+
+    def get(self, name, default=None):
+        """Return the dense config of a namespace, or default."""
+        if name not in self:
+            return default
+        return self[name]
+
+    def get_sparse(self, name):
+        """Return the sparse config of a namespace."""
+        return OrderedDict.__getitem__(self, name)
+
 # TODO: separate config for run and non-run purposes?
 
 
@@ -101,6 +151,17 @@ class SuiteConfig(object):
         'event', 'suite', 'suite_uuid', 'point', 'name', 'submit_num', 'id',
         'message', 'batch_sys_name', 'batch_sys_job_id', 'submit_time',
         'start_time', 'finish_time', 'user@host', 'try_num')
+    # Name of the cache file, in the suite service directory.
+    CACHE_FILE_NAME = 'suite.rc.cache'
+    # Name of the cache directory of compiled Jinja2 templates, in the suite
+    # service directory.
+    JINJA2_CACHE_DIRNAME = 'jinja2'
+    # Attributes not stored in the cache, as they are given on load.
+    CACHE_EXCL_ATTRS = ('options', 'mem_log', 'xtrigger_mgr')
+    # Command line options used in processing.
+    CACHE_OPTIONS = (
+        'icp', 'fcp', 'startcp', 'run_mode', 'collapsed', 'vis_initial',
+        'vis_final')
 
     def __init__(
         self,
@@ -122,6 +183,7 @@ class SuiteConfig(object):
         if mem_log_func is None:
             self.mem_log = lambda *a: False
         self.mem_log("config.py:config.py: start init config")
+        start_time = time()
         self.suite = suite  # suite name
         self.fpath = fpath  # suite definition
         self.fdir = os.path.dirname(fpath)
@@ -182,10 +244,26 @@ class SuiteConfig(object):
         # Export local environmental suite context before config parsing.
         self.process_suite_env()
 
+        # Load the processed config from the cache, if it is up to date.
+        cache_key = None
+        if (
+            glbl_cfg().get(['cylc', 'suite config cache']) and
+            not self._is_validate() and
+            os.path.isdir(os.path.dirname(self.get_cache_path()))
+        ):
+            cache_key = self.get_cache_key(template_vars, is_reload)
+            if self.load_cache(cache_key):
+                self.mem_log("config.py: end init config (cached)")
+                LOG.debug(
+                    'Suite config loaded from cache in %.3fs',
+                    time() - start_time)
+                return
+
         # parse, upgrade, validate the suite, but don't expand with default
         # items
         self.mem_log("config.py: before RawSuiteConfig init")
-        self.pcfg = RawSuiteConfig(fpath, output_fname, template_vars)
+        self.pcfg = RawSuiteConfig(
+            fpath, output_fname, template_vars, self.get_jinja2_cache_dir())
         self.mem_log("config.py: after RawSuiteConfig init")
         self.mem_log("config.py: before get(sparse=True")
         self.cfg = self.pcfg.get(sparse=True)
@@ -302,20 +380,35 @@ class SuiteConfig(object):
         # filter task environment variables after inheritance
         self.filter_env()
 
+        # Resolve the dense runtime config of each namespace on demand, if
+        # configured, rather than expanding all namespaces with defaults
+        # below. (Not in validation, which checks every namespace.)
+        self.lazy_runtime = (
+            glbl_cfg().get(['cylc', 'lazy runtime']) and
+            not self._is_validate())
+        if self.lazy_runtime:
+            runtime = self.cfg['runtime']
+            self.cfg['runtime'] = OrderedDictWithDefaults()
+
         # Now add config defaults.  Items added prior to this ends up in the
         # sparse dict (e.g. parameter-expanded namespaces).
         self.mem_log("config.py: before get(sparse=False)")
         self.cfg = self.pcfg.get(sparse=False)
         self.mem_log("config.py: after get(sparse=False)")
 
-        # after the call to init_cyclers, we can start getting proper points.
-        init_cyclers(self.cfg)
+        if self.lazy_runtime:
+            self.pcfg.sparse['runtime'] = runtime
+            self.runtime_defaults = get_defaults(
+                self.pcfg.spec['runtime']['__MANY__'])
+            un_many(self.runtime_defaults)
+            self.cfg['runtime'] = LazyRuntimeConfig(
+                self.resolve_runtime,
+                glbl_cfg().get(['cylc', 'runtime cache size']))
+            for name, sparse in runtime.items():
+                self.cfg['runtime'][name] = sparse
 
-        # Running in UTC time? (else just use the system clock)
-        if self.cfg['cylc']['UTC mode'] is None:
-            set_utc_mode(glbl_cfg().get(['cylc', 'UTC mode']))
-        else:
-            set_utc_mode(self.cfg['cylc']['UTC mode'])
+        # after the call to init_cyclers, we can start getting proper points.
+        self.init_cycling()
 
         # Initial point from suite definition (or CLI override above).
         orig_icp = self.cfg['scheduling']['initial cycle point']
@@ -332,12 +425,15 @@ class SuiteConfig(object):
                 raise SuiteConfigError(str(exc))
         if orig_icp != icp:
             self.options.icp = icp
+            # Relative to the current time, so do not cache.
+            cache_key = None
         self.initial_point = get_point(icp).standardise()
         self.cfg['scheduling']['initial cycle point'] = str(self.initial_point)
         if getattr(self.options, 'startcp', None) is not None:
             # Warm start from a point later than initial point.
             if self.options.startcp == "now":
                 self.options.startcp = get_current_time_string()
+                cache_key = None
             self.start_point = get_point(self.options.startcp).standardise()
         else:
             # Cold start.
@@ -690,21 +786,121 @@ class SuiteConfig(object):
         # back-compat $CYLC_SUITE_NAME:
         self.cfg['meta']['URL'] = RE_SUITE_NAME_VAR.sub(
             self.suite, self.cfg['meta']['URL'])
-        for name, cfg in self.cfg['runtime'].items():
-            cfg['meta']['URL'] = cfg['meta']['URL'] % {
-                'suite_name': self.suite, 'task_name': name}
-            # back-compat $CYLC_SUITE_NAME and $CYLC_TASK_NAME:
-            cfg['meta']['URL'] = RE_SUITE_NAME_VAR.sub(
-                self.suite, cfg['meta']['URL'])
-            cfg['meta']['URL'] = RE_TASK_NAME_VAR.sub(
-                name, cfg['meta']['URL'])
+        if self.lazy_runtime:
+            # Namespaces resolved so far may not have all adjustments.
+            self.cfg['runtime'].cache.clear()
+        else:
+            for name, cfg in self.cfg['runtime'].items():
+                self.configure_urls(name, cfg)
 
         if self._is_validate():
             self.mem_log("config.py: before _check_circular()")
             self._check_circular()
             self.mem_log("config.py: after _check_circular()")
 
+        if cache_key is not None:
+            self.dump_cache(cache_key)
+
         self.mem_log("config.py: end init config")
+        LOG.debug('Suite config loaded in %.3fs', time() - start_time)
+
+    def resolve_runtime(self, name, sparse):
+        """Return the dense runtime config of a namespace, from its sparse
+        (inherited) config, with the adjustments made to all namespaces when
+        not in lazy runtime mode."""
+        rtcfg = expand_section(sparse, self.runtime_defaults)
+        tdef = self.taskdefs.get(name)
+        if tdef is not None:
+            if self.run_mode('simulation', 'dummy', 'dummy-local'):
+                # (Copied, so as not to modify the shared defaults.)
+                rtcfg = pdeepcopy(rtcfg)
+                self.configure_sim_mode(tdef, rtcfg)
+            if name in self.suite_polling_tasks:
+                self.configure_suite_state_polling_task(tdef, rtcfg)
+        self.configure_urls(name, rtcfg)
+        return rtcfg
+
+    def configure_urls(self, name, rtcfg):
+        """Replace suite and task name in the URL of a namespace."""
+        rtcfg['meta']['URL'] = rtcfg['meta']['URL'] % {
+            'suite_name': self.suite, 'task_name': name}
+        # back-compat $CYLC_SUITE_NAME and $CYLC_TASK_NAME:
+        rtcfg['meta']['URL'] = RE_SUITE_NAME_VAR.sub(
+            self.suite, rtcfg['meta']['URL'])
+        rtcfg['meta']['URL'] = RE_TASK_NAME_VAR.sub(
+            name, rtcfg['meta']['URL'])
+
+    def init_cycling(self):
+        """Initialise cycling and UTC mode, from the suite config."""
+        init_cyclers(self.cfg)
+
+        # Running in UTC time? (else just use the system clock)
+        if self.cfg['cylc']['UTC mode'] is None:
+            set_utc_mode(glbl_cfg().get(['cylc', 'UTC mode']))
+        else:
+            set_utc_mode(self.cfg['cylc']['UTC mode'])
+
+    def get_cache_path(self):
+        """Return the path of the cache file of the processed config."""
+        return os.path.join(
+            self.run_dir, SuiteFiles.Service.DIRNAME, self.CACHE_FILE_NAME)
+
+    def get_jinja2_cache_dir(self):
+        """Return the directory of the cache of compiled Jinja2 templates,
+        or None if the suite run directory is not set up."""
+        service_dir = os.path.join(self.run_dir, SuiteFiles.Service.DIRNAME)
+        if not os.path.isdir(service_dir):
+            return None
+        return os.path.join(service_dir, self.JINJA2_CACHE_DIRNAME)
+
+    def get_cache_key(self, template_vars, is_reload):
+        """Return the cache key of the processed config.
+
+        The key is a hash of the suite definition files, and the other
+        inputs of processing.
+        """
+        return config_cache.get_key(self.fdir, self.run_dir, [
+            self.suite, self.fpath, self.run_dir, self.log_dir,
+            self.share_dir, self.work_dir, template_vars, is_reload,
+            {key: getattr(self.options, key, None)
+             for key in self.CACHE_OPTIONS},
+            glbl_cfg().get(['cylc', 'UTC mode']),
+            glbl_cfg().get(['cylc', 'lazy runtime']),
+            glbl_cfg().get(['cylc', 'runtime cache size'])])
+
+    def load_cache(self, cache_key):
+        """Load the processed config from the cache, if up to date.
+
+        Restore the side effects of processing: cycling, environment and
+        xtriggers.
+
+        Return True if loaded.
+        """
+        cached = config_cache.load(self.get_cache_path(), cache_key)
+        if cached is None:
+            return False
+        state, xtriggers = cached
+        self.__dict__.update(state)
+        if self.lazy_runtime:
+            self.cfg['runtime'].resolve = self.resolve_runtime
+        self.init_cycling()
+        self.process_config_env()
+        for label, xtrig in xtriggers.items():
+            self.xtrigger_mgr.add_trig(label, xtrig, self.fdir)
+        LOG.debug('Loaded suite config from cache: %s', self.get_cache_path())
+        return True
+
+    def dump_cache(self, cache_key):
+        """Store the processed config in the cache."""
+        state = {
+            key: value for key, value in self.__dict__.items()
+            if key not in self.CACHE_EXCL_ATTRS}
+        xtriggers = {}
+        for taskdef in self.taskdefs.values():
+            for labels in taskdef.xtrig_labels.values():
+                for label in labels:
+                    xtriggers[label] = self.xtrigger_mgr.functx_map[label]
+        config_cache.dump(self.get_cache_path(), cache_key, (state, xtriggers))
 
     def _check_circular(self):
         """Check for circular dependence in graph."""
@@ -989,42 +1185,41 @@ class SuiteConfig(object):
                     self.runtime['first-parent descendants'][p].append(name)
 
     def compute_inheritance(self):
-        LOG.debug("Parsing the runtime namespace hierarchy")
-
-        # TODO: Note an unused alternative mechanism was removed here
-        # (March 2020). It stored the result of each completed MRO and
-        # re-used these wherever possible. This could be more efficient
-        # for full namespaces in deep hierarchies. We should go back and
-        # look if inheritance computation becomes a problem.
+        """Compute the inherited settings of each runtime namespace.
 
-        results = OrderedDictWithDefaults()
-        # n_reps = 0
-        already_done = {}  # to store already computed namespaces by mro
-
-        # Loop through runtime members, 'root' first.
-        nses = list(self.cfg['runtime'])
-        nses.sort(key=lambda ns: ns != 'root')
-        for ns in nses:
-            # for each namespace ...
-
-            hierarchy = copy(self.runtime['linearized ancestors'][ns])
-            hierarchy.reverse()
-
-            result = OrderedDictWithDefaults()
-
-            # Go up the linearized MRO from root, replicating or
-            # overriding each namespace element as we go.
-            for name in hierarchy:
-                replicate(result, self.cfg['runtime'][name])
-                # n_reps += 1
+        The settings of a namespace are layered over the (already computed)
+        settings of the longest suffix of its linearized ancestors that is
+        itself the linearized MRO of a namespace - for single inheritance,
+        the settings of its parent. Settings not overridden are shared with
+        the ancestor (see parsec.util.layer), not copied.
+        """
+        LOG.debug("Parsing the runtime namespace hierarchy")
 
+        mros = self.runtime['linearized ancestors']
+        results = {}
+        # Ancestors have shorter MROs, so are computed first.
+        for ns in sorted(self.cfg['runtime'], key=lambda ns: len(mros[ns])):
+            hierarchy = mros[ns]
+            # Find the nearest ancestor whose results can be reused.
+            for i, name in enumerate(hierarchy[1:], 1):
+                if mros[name] == hierarchy[i:]:
+                    result = results[name]
+                    break
+            else:
+                i = len(hierarchy)
+                result = OrderedDictWithDefaults()
+            # Go down the rest of the linearized MRO, overriding each
+            # namespace element as we go.
+            for name in reversed(hierarchy[:i]):
+                result = layer(result, self.cfg['runtime'][name])
             results[ns] = result
 
         # replace pre-inheritance namespaces with the post-inheritance result
-        self.cfg['runtime'] = results
-
-        # uncomment this to compare the simple and efficient methods
-        # print '  Number of namespace replications:', n_reps
+        # ('root' first)
+        nses = list(self.cfg['runtime'])
+        nses.sort(key=lambda ns: ns != 'root')
+        self.cfg['runtime'] = OrderedDictWithDefaults(
+            (ns, results[ns]) for ns in nses)
 
     # def print_inheritance(self):
     #     # (use for debugging)
@@ -1173,93 +1368,107 @@ class SuiteConfig(object):
                     raise SuiteConfigError(
                         "script cannot be defined for automatic" +
                         " suite polling task '%s':\n%s" % (l_task, cs))
+        if self.lazy_runtime:
+            # Done on resolving the runtime config of each task.
+            return
         # Generate the automatic scripting.
         for name, tdef in list(self.taskdefs.items()):
-            if name not in self.suite_polling_tasks:
-                continue
-            rtc = tdef.rtconfig
-            comstr = "cylc suite-state" + \
-                     " --task=" + tdef.suite_polling_cfg['task'] + \
-                     " --point=$CYLC_TASK_CYCLE_POINT"
-            for key, fmt in [
-                    ('user', ' --%s=%s'),
-                    ('host', ' --%s=%s'),
-                    ('interval', ' --%s=%d'),
-                    ('max-polls', ' --%s=%s'),
-                    ('run-dir', ' --%s=%s')]:
-                if rtc['suite state polling'][key]:
-                    comstr += fmt % (key, rtc['suite state polling'][key])
-            if rtc['suite state polling']['message']:
-                comstr += " --message='%s'" % (
-                    rtc['suite state polling']['message'])
-            else:
-                comstr += " --status=" + tdef.suite_polling_cfg['status']
-            comstr += " " + tdef.suite_polling_cfg['suite']
-            script = "echo " + comstr + "\n" + comstr
-            rtc['script'] = script
+            if name in self.suite_polling_tasks:
+                self.configure_suite_state_polling_task(tdef, tdef.rtconfig)
+
+    @staticmethod
+    def configure_suite_state_polling_task(tdef, rtc):
+        """Generate the automatic scripting of a suite polling task."""
+        comstr = "cylc suite-state" + \
+                 " --task=" + tdef.suite_polling_cfg['task'] + \
+                 " --point=$CYLC_TASK_CYCLE_POINT"
+        for key, fmt in [
+                ('user', ' --%s=%s'),
+                ('host', ' --%s=%s'),
+                ('interval', ' --%s=%d'),
+                ('max-polls', ' --%s=%s'),
+                ('run-dir', ' --%s=%s')]:
+            if rtc['suite state polling'][key]:
+                comstr += fmt % (key, rtc['suite state polling'][key])
+        if rtc['suite state polling']['message']:
+            comstr += " --message='%s'" % (
+                rtc['suite state polling']['message'])
+        else:
+            comstr += " --status=" + tdef.suite_polling_cfg['status']
+        comstr += " " + tdef.suite_polling_cfg['suite']
+        script = "echo " + comstr + "\n" + comstr
+        rtc['script'] = script
 
     def configure_sim_modes(self):
         """Adjust task defs for simulation mode and dummy modes."""
+        if self.lazy_runtime:
+            # Done on resolving the runtime config of each task.
+            return
         for tdef in self.taskdefs.values():
-            # Compute simulated run time by scaling the execution limit.
-            rtc = tdef.rtconfig
-            limit = rtc['job']['execution time limit']
-            speedup = rtc['simulation']['speedup factor']
-            if limit and speedup:
-                sleep_sec = (DurationParser().parse(
-                    str(limit)).get_seconds() / speedup)
-            else:
-                sleep_sec = DurationParser().parse(
-                    str(rtc['simulation']['default run length'])
-                ).get_seconds()
-            rtc['job']['execution time limit'] = (
-                sleep_sec + DurationParser().parse(str(
-                    rtc['simulation']['time limit buffer'])).get_seconds()
-            )
-            rtc['job']['simulated run length'] = sleep_sec
-
-            # Generate dummy scripting.
-            rtc['init-script'] = ""
-            rtc['env-script'] = ""
-            rtc['pre-script'] = ""
-            rtc['post-script'] = ""
-            scr = "sleep %d" % sleep_sec
-            # Dummy message outputs.
-            for msg in rtc['outputs'].values():
-                scr += "\ncylc message '%s'" % msg
-            if rtc['simulation']['fail try 1 only']:
-                arg1 = "true"
-            else:
-                arg1 = "false"
-            arg2 = " ".join(rtc['simulation']['fail cycle points'])
-            scr += "\ncylc__job__dummy_result %s %s || exit 1" % (arg1, arg2)
-            rtc['script'] = scr
-
-            # Disable batch scheduler in dummy modes.
-            # TODO - to use batch schedulers in dummy mode we need to
-            # identify which resource directives to disable or modify.
-            # (Only execution time limit is automatic at the moment.)
-            rtc['job']['batch system'] = 'background'
-
-            # Disable environment, in case it depends on env-script.
-            rtc['environment'] = {}
-
-            if tdef.run_mode == 'dummy-local':
-                # Run all dummy tasks on the suite host.
-                rtc['remote']['host'] = None
-                rtc['remote']['owner'] = None
-
-            # Simulation mode tasks should fail in which cycle points?
-            f_pts = []
-            f_pts_orig = rtc['simulation']['fail cycle points']
-            if 'all' in f_pts_orig:
-                # None for "fail all points".
-                f_pts = None
-            else:
-                # (And [] for "fail no points".)
-                for point_str in f_pts_orig:
-                    f_pts.append(get_point(point_str).standardise())
-            rtc['simulation']['fail cycle points'] = f_pts
+            self.configure_sim_mode(tdef, tdef.rtconfig)
+
+    @staticmethod
+    def configure_sim_mode(tdef, rtc):
+        """Adjust the runtime config of a task for simulation mode and dummy
+        modes."""
+        # Compute simulated run time by scaling the execution limit.
+        limit = rtc['job']['execution time limit']
+        speedup = rtc['simulation']['speedup factor']
+        if limit and speedup:
+            sleep_sec = (DurationParser().parse(
+                str(limit)).get_seconds() / speedup)
+        else:
+            sleep_sec = DurationParser().parse(
+                str(rtc['simulation']['default run length'])
+            ).get_seconds()
+        rtc['job']['execution time limit'] = (
+            sleep_sec + DurationParser().parse(str(
+                rtc['simulation']['time limit buffer'])).get_seconds()
+        )
+        rtc['job']['simulated run length'] = sleep_sec
+
+        # Generate dummy scripting.
+        rtc['init-script'] = ""
+        rtc['env-script'] = ""
+        rtc['pre-script'] = ""
+        rtc['post-script'] = ""
+        scr = "sleep %d" % sleep_sec
+        # Dummy message outputs.
+        for msg in rtc['outputs'].values():
+            scr += "\ncylc message '%s'" % msg
+        if rtc['simulation']['fail try 1 only']:
+            arg1 = "true"
+        else:
+            arg1 = "false"
+        arg2 = " ".join(rtc['simulation']['fail cycle points'])
+        scr += "\ncylc__job__dummy_result %s %s || exit 1" % (arg1, arg2)
+        rtc['script'] = scr
+
+        # Disable batch scheduler in dummy modes.
+        # TODO - to use batch schedulers in dummy mode we need to
+        # identify which resource directives to disable or modify.
+        # (Only execution time limit is automatic at the moment.)
+        rtc['job']['batch system'] = 'background'
+
+        # Disable environment, in case it depends on env-script.
+        rtc['environment'] = {}
+
+        if tdef.run_mode == 'dummy-local':
+            # Run all dummy tasks on the suite host.
+            rtc['remote']['host'] = None
+            rtc['remote']['owner'] = None
+
+        # Simulation mode tasks should fail in which cycle points?
+        f_pts = []
+        f_pts_orig = rtc['simulation']['fail cycle points']
+        if 'all' in f_pts_orig:
+            # None for "fail all points".
+            f_pts = None
+        else:
+            # (And [] for "fail no points".)
+            for point_str in f_pts_orig:
+                f_pts.append(get_point(point_str).standardise())
+        rtc['simulation']['fail cycle points'] = f_pts
 
     def get_parent_lists(self):
         return self.runtime['parents']
@@ -1533,9 +1742,14 @@ class SuiteConfig(object):
                 self.naked_dummy_tasks.append(name)
                 # These can't just be a reference to root runtime as we have to
                 # make some items task-specific: e.g. subst task name in URLs.
-                self.cfg['runtime'][name] = OrderedDictWithDefaults()
-                replicate(self.cfg['runtime'][name],
-                          self.cfg['runtime']['root'])
+                if self.lazy_runtime:
+                    # (Resolved separately from root.)
+                    self.cfg['runtime'][name] = (
+                        self.cfg['runtime'].get_sparse('root'))
+                else:
+                    self.cfg['runtime'][name] = OrderedDictWithDefaults()
+                    replicate(self.cfg['runtime'][name],
+                              self.cfg['runtime']['root'])
                 if 'root' not in self.runtime['descendants']:
                     # (happens when no runtimes are defined in the suite.rc)
                     self.runtime['descendants']['root'] = []
@@ -1906,6 +2120,9 @@ class SuiteConfig(object):
                 " valid cycle point, not 'NoneType'")
         suite_final_point = get_point(
             self.cfg['scheduling']['final cycle point'])
+        if suite_final_point is not None and suite_final_point < stop_point:
+            # Not beyond suite final cycle point.
+            stop_point = suite_final_point
 
         # Get ICP on-sequence point
         actual_first_point = self.get_actual_first_point(self.start_point)
@@ -1914,15 +2131,7 @@ class SuiteConfig(object):
         start_point_offset_cache = {}
         point_offset_cache = None
         for sequence, edges in self.edges.items():
-            # Get first cycle point for this sequence
-            point = sequence.get_first_point(start_point)
-            while point is not None:
-                if point > stop_point:
-                    # Beyond requested final cycle point.
-                    break
-                if suite_final_point is not None and point > suite_final_point:
-                    # Beyond suite final cycle point.
-                    break
+            for point in sequence.get_points(start_point, stop_point):
                 point_offset_cache = {}
                 for left, right, suicide, cond in edges:
                     if right:
@@ -1969,8 +2178,6 @@ class SuiteConfig(object):
                     # only used to get task ID here
                     lstr, rstr = self._close_families(l_id, r_id, {})
                     gr_edges[point].append((lstr, rstr, None, suicide, cond))
-                # Increment the cycle point.
-                point = sequence.get_next_point_on_sequence(point)
 
         del start_point_offset_cache
         del point_offset_cache
@@ -2166,10 +2373,12 @@ class SuiteConfig(object):
         """Get the dense task runtime."""
         # (TaskDefError caught above)
 
-        try:
-            rtcfg = self.cfg['runtime'][name]
-        except KeyError:
+        if name not in self.cfg['runtime']:
             raise SuiteConfigError("Task not defined: %s" % name)
+        if self.lazy_runtime:
+            rtcfg = partial(self.cfg['runtime'].__getitem__, name)
+        else:
+            rtcfg = self.cfg['runtime'][name]
         # We may want to put in some handling for cases of changing the
         # initial cycle via restart (accidentally or otherwise).
 
@@ -0,0 +1,130 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""On-disk cache of processed suite configurations.
+
+A processed suite configuration is stored with a key: a hash of the content
+of the files of the suite definition directory, the template variables and
+other inputs of the processing. It is only loaded if the key is unchanged.
+
+All files of the suite definition directory (other than the run time
+directories of a suite run directory) are hashed, as files may be included
+by the "%include" directive, by Jinja2 include, import and extends
+statements, or imported as Python modules by Jinja2 filters.
+
+Template processing is assumed to depend only on these files and the
+template variables. (A cached configuration is used even if, for example,
+the environment variables used by a Jinja2 template have changed.)
+"""
+
+from hashlib import sha256
+import json
+import os
+import pickle
+
+from cylc.flow import LOG, __version__ as CYLC_VERSION
+
+# Directories of a suite run directory that are not part of the suite
+# definition, even if the suite definition is in the suite run directory.
+RUN_DIRNAMES = ('log', 'share', 'work')
+# Files written by processing the suite definition.
+PROCESSED_FILE_EXT = '.processed'
+# Directories of Jinja2 filters, tests and globals of the user.
+USER_JINJA2_DIRS = [
+    os.path.join('~', '.cylc', 'Jinja2' + namespace)
+    for namespace in ('Filters', 'Tests', 'Globals')]
+
+
+def get_key(fdir, run_dir, inputs):
+    """Return the cache key of a suite configuration.
+
+    Args:
+        fdir (str): suite definition directory.
+        run_dir (str): suite run directory.
+        inputs: other inputs of processing, serializable as JSON, e.g. the
+            template variables.
+
+    Return:
+        str: the hexadecimal hash of the files of the suite definition
+        directory, the Jinja2 directories of the user and inputs.
+
+    """
+    is_run_dir = os.path.realpath(fdir) == os.path.realpath(run_dir)
+    hash_ = sha256()
+    hash_.update(CYLC_VERSION.encode())
+    hash_.update(
+        json.dumps(inputs, sort_keys=True, default=str).encode())
+    for top_dir in [fdir] + [
+            os.path.expanduser(name) for name in USER_JINJA2_DIRS]:
+        for dirpath, dirnames, filenames in os.walk(top_dir):
+            # Walk in a consistent order, skipping hidden and run directories.
+            dirnames[:] = sorted(
+                name for name in dirnames
+                if not name.startswith('.') and name != '__pycache__' and not (
+                    is_run_dir and dirpath == top_dir and
+                    name in RUN_DIRNAMES))
+            for name in sorted(filenames):
+                if name.endswith(PROCESSED_FILE_EXT):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    with open(path, 'rb') as handle:
+                        content = handle.read()
+                except OSError:
+                    # E.g. a broken symbolic link.
+                    continue
+                hash_.update(os.path.relpath(path, top_dir).encode())
+                hash_.update(sha256(content).digest())
+    return hash_.hexdigest()
+
+
+def load(path, key):
+    """Return the cached state in the file at path, if its key is key.
+
+    Return None if the file does not exist, cannot be read, or is for another
+    key.
+    """
+    try:
+        with open(path, 'rb') as handle:
+            cached_key, state = pickle.load(handle)
+    except FileNotFoundError:
+        return None
+    except Exception as exc:
+        # Corrupted, or from an incompatible version.
+        LOG.debug('%s: cannot load suite config cache: %s', path, exc)
+        return None
+    if cached_key != key:
+        LOG.debug('%s: suite config cache out of date', path)
+        return None
+    return state
+
+
+def dump(path, key, state):
+    """Write state to the cache file at path, with its key.
+
+    The file is replaced atomically. Failures are logged but otherwise
+    ignored, as the cache is an optimisation.
+    """
+    temp_path = '%s.%d' % (path, os.getpid())
+    try:
+        with open(temp_path, 'wb') as handle:
+            pickle.dump((key, state), handle, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except Exception as exc:
+        LOG.warning('%s: cannot write suite config cache: %s', path, exc)
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
@@ -358,6 +358,72 @@ class SequenceBase(object, metaclass=ABCMeta):
         """Return the last point in this sequence, or None if unbounded."""
         pass
 
+    def get_points(self, start_point, stop_point=None, limit=None):
+        """Return the points >= start_point and <= stop_point, in order.
+
+        Return at most limit points, if limit is not None. If the sequence
+        is unbounded, stop_point and limit cannot both be None.
+
+        Subclasses whose points are separated by a fixed interval should
+        provide _get_regular_points, to compute the points arithmetically.
+        Otherwise, or if it returns None, the sequence is iterated one point
+        at a time.
+
+        """
+        if stop_point is None and limit is None:
+            stop_point = self.get_stop_point()
+            if stop_point is None:
+                raise ValueError(
+                    "get_points() requires a stop_point or limit argument"
+                    " for an unbounded sequence")
+        points = []
+        exclusions = getattr(self, 'exclusions', None)
+        while limit is None or len(points) < limit:
+            n_points = None
+            if limit is not None:
+                n_points = limit - len(points)
+            window = self._get_regular_points(
+                start_point, stop_point, n_points)
+            if window is None:
+                return self._get_points_iteratively(
+                    start_point, stop_point, limit)
+            if not window:
+                break
+            if exclusions:
+                excluded = exclusions.get_excluded_points(
+                    window[0], window[-1])
+                points.extend(
+                    point for point in window if point not in excluded)
+            else:
+                points.extend(window)
+            if limit is None or len(window) < n_points:
+                break
+            # Some points were excluded, try the points after the window.
+            start_point = window[-1] + self.get_interval()
+        return points
+
+    def _get_regular_points(self, start_point, stop_point, limit):
+        """Return the points (ignoring exclusions) in bounds, >= start_point
+        and <= stop_point (if not None), at most limit (if not None).
+
+        Return None if the points cannot be computed arithmetically.
+
+        """
+        return None
+
+    def _get_points_iteratively(self, start_point, stop_point, limit):
+        """Implement get_points one point at a time."""
+        points = []
+        point = self.get_first_point(start_point)
+        while (
+            point is not None
+            and (stop_point is None or point <= stop_point)
+            and (limit is None or len(points) < limit)
+        ):
+            points.append(point)
+            point = self.get_next_point_on_sequence(point)
+        return points
+
     @abstractmethod
     def __eq__(self, other):
         # Return True if other (sequence) is equal to self.
@@ -396,6 +462,22 @@ class ExclusionBase(object, metaclass=ABCMeta):
             return True
         return False
 
+    def get_excluded_points(self, start_point, stop_point):
+        """Return the set of excluded points >= start_point and <=
+        stop_point.
+
+        Args:
+            start_point (PointBase): The first cycle point of the window.
+            stop_point (PointBase): The last cycle point of the window.
+
+        """
+        excluded = set(
+            point for point in self.exclusion_points
+            if start_point <= point <= stop_point)
+        for sequence in self.exclusion_sequences:
+            excluded.update(sequence.get_points(start_point, stop_point))
+        return excluded
+
     def __getitem__(self, key):
         """Allows indexing of the exclusion object"""
         return self.exclusion_sequences[key]
@@ -554,6 +554,27 @@ class IntegerSequence(SequenceBase):
             return self.get_next_point_on_sequence(point)
         return point
 
+    def _get_regular_points(self, start_point, stop_point, limit):
+        """Return the points (ignoring exclusions) in bounds, >= start_point
+        and <= stop_point (if not None), at most limit (if not None)."""
+        if not self.i_step or int(self.i_step) <= 0:
+            return None
+        step = int(self.i_step)
+        start = max(int(start_point), int(self.p_start))
+        remainder = (start - int(self.p_start)) % step
+        if remainder:
+            start += step - remainder
+        stops = []
+        if stop_point is not None:
+            stops.append(int(stop_point))
+        if self.p_stop is not None:
+            stops.append(int(self.p_stop))
+        if limit is not None:
+            stops.append(start + step * (limit - 1))
+        return [
+            IntegerPoint(value)
+            for value in range(start, min(stops) + 1, step)]
+
     def get_start_point(self):
         """Return the first point in this sequence, or None."""
         if self.exclusions and self.p_start in self.exclusions:
@@ -16,12 +16,14 @@
 
 """Date-time cycling by point, interval, and sequence classes."""
 
+from collections import deque
 import re
 
 from metomi.isodatetime.data import Calendar, Duration
 from metomi.isodatetime.dumpers import TimePointDumper
 from metomi.isodatetime.timezone import (
     get_local_time_zone, get_local_time_zone_format, TimeZoneFormatMode)
+from cylc.flow.cache import LRUCache, lru_memoize
 from cylc.flow.time_parser import CylcTimeParser
 from cylc.flow.cycling import (
     PointBase, IntervalBase, SequenceBase, ExclusionBase, cmp_to_rich, cmp
@@ -64,43 +66,76 @@ def memoize(function):
     The inputs and results of the function must be immutable.
     Keyword arguments are not allowed.
 
-    To avoid memory leaks, only the first 10000 separate input
+    To avoid memory leaks, only the 10000 most recently used separate input
     permutations are cached for a given function.
 
     """
-    inputs_results = {}
-
-    def _wrapper(*args):
-        """Cache results for function(*args)."""
-        try:
-            return inputs_results[args]
-        except KeyError:
-            results = function(*args)
-            if len(inputs_results) > MEMOIZE_LIMIT:
-                # Full up, no more room.
-                inputs_results.popitem()
-            inputs_results[args] = results
-            return results
-    return _wrapper
+    return lru_memoize(MEMOIZE_LIMIT)(function)
 
 
 class ISO8601Point(PointBase):
 
-    """A single point in an ISO8601 date time sequence."""
+    """A single point in an ISO8601 date time sequence.
+
+    A point is ordered and hashed by its integer number of seconds since the
+    Unix epoch (in the suite calendar). Adding or subtracting an interval of
+    fixed length (weeks, days, hours, minutes, seconds) is integer
+    arithmetic: the string value of the resulting point is only produced
+    when needed, by adding the accumulated seconds to the string value of
+    the original point.
+
+    """
 
     TYPE = CYCLER_TYPE_ISO8601
     TYPE_SORT_KEY = CYCLER_TYPE_SORT_KEY_ISO8601
 
-    __slots__ = ('value')
+    __slots__ = ('_value', '_seconds', '_base')
 
     @classmethod
     def from_nonstandard_string(cls, point_string):
         """Standardise a date-time string."""
         return ISO8601Point(str(point_parse(point_string))).standardise()
 
+    @property
+    def value(self):
+        """The string value of this point."""
+        if self._value is None:
+            # Produce the string value lazily.
+            base_value, seconds = self._base
+            self._value = self._iso_point_add_seconds(base_value, seconds)
+            self._base = None
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+        self._seconds = None
+        self._base = None
+
+    @property
+    def seconds(self):
+        """The number of seconds since the Unix epoch of this point."""
+        if self._seconds is None:
+            self._seconds = self._iso_point_seconds(self._value)
+        return self._seconds
+
     def add(self, other):
         """Add an Interval to self."""
-        return ISO8601Point(self._iso_point_add(self.value, other.value))
+        seconds = other.get_seconds()
+        if seconds is None:
+            return ISO8601Point(self._iso_point_add(self.value, other.value))
+        return self._add_seconds(seconds)
+
+    def _add_seconds(self, seconds):
+        """Return a new point, seconds after self."""
+        point = ISO8601Point.__new__(ISO8601Point)
+        point._value = None
+        point._seconds = self.seconds + seconds
+        if self._value is None:
+            point._base = (self._base[0], self._base[1] + seconds)
+        else:
+            point._base = (self._value, seconds)
+        return point
 
     def __cmp__(self, other):
         # Compare other (point) to self.
@@ -108,9 +143,7 @@ class ISO8601Point(PointBase):
             return -1
         if self.TYPE != other.TYPE:
             return cmp(self.TYPE_SORT_KEY, other.TYPE_SORT_KEY)
-        if self.value == other.value:
-            return 0
-        return self._iso_point_cmp(self.value, other.value)
+        return cmp(self.seconds, other.seconds)
 
     def standardise(self):
         """Reformat self.value into a standard representation."""
@@ -130,11 +163,14 @@ class ISO8601Point(PointBase):
         if isinstance(other, ISO8601Point):
             return ISO8601Interval(
                 self._iso_point_sub_point(self.value, other.value))
-        return ISO8601Point(
-            self._iso_point_sub_interval(self.value, other.value))
+        seconds = other.get_seconds()
+        if seconds is None:
+            return ISO8601Point(
+                self._iso_point_sub_interval(self.value, other.value))
+        return self._add_seconds(-seconds)
 
     def __hash__(self):
-        return hash(self.value)
+        return hash(self.seconds)
 
     @staticmethod
     @memoize
@@ -146,11 +182,15 @@ class ISO8601Point(PointBase):
 
     @staticmethod
     @memoize
-    def _iso_point_cmp(point_string, other_point_string):
-        """Compare the parsed point_string to the other one."""
-        point = point_parse(point_string)
-        other_point = point_parse(other_point_string)
-        return cmp(point, other_point)
+    def _iso_point_add_seconds(point_string, seconds):
+        """Add a number of seconds to the parsed point_string."""
+        return str(point_parse(point_string) + Duration(seconds=seconds))
+
+    @staticmethod
+    @memoize
+    def _iso_point_seconds(point_string):
+        """Return the seconds since the Unix epoch of the parsed point."""
+        return int(point_parse(point_string).get("seconds_since_unix_epoch"))
 
     @staticmethod
     @memoize
@@ -224,6 +264,14 @@ class ISO8601Interval(IntervalBase):
         """Compare another interval with this one."""
         return self._iso_interval_cmp(self.value, other.value)
 
+    def get_seconds(self):
+        """Return the length of this interval in seconds.
+
+        Return None if the length depends on the point it is applied to, i.e.
+        the interval has years or months.
+        """
+        return self._iso_interval_seconds(self.value)
+
     def sub(self, other):
         """Subtract another interval from this one."""
         return ISO8601Interval(
@@ -268,6 +316,18 @@ class ISO8601Interval(IntervalBase):
         other = interval_parse(other_interval_string)
         return cmp(interval, other)
 
+    @staticmethod
+    @memoize
+    def _iso_interval_seconds(interval_string):
+        """Return the parsed interval_string in whole seconds, if fixed."""
+        interval = interval_parse(interval_string)
+        if interval.years or interval.months:
+            return None
+        seconds = interval.get_seconds()
+        if seconds != int(seconds):
+            return None
+        return int(seconds)
+
     @staticmethod
     @memoize
     def _iso_interval_sub(interval_string, other_interval_string):
@@ -331,7 +391,8 @@ class ISO8601Sequence(SequenceBase):
     __slots__ = ('dep_section', 'context_start_point', 'context_end_point',
                  'offset', '_cached_first_point_values',
                  '_cached_next_point_values', '_cached_valid_point_booleans',
-                 '_cached_recent_valid_points', 'spec', 'abbrev_util',
+                 '_cached_recent_valid_points', '_cached_last_point',
+                 'spec', 'abbrev_util',
                  'recurrence', 'exclusions', 'step', 'value')
 
     @classmethod
@@ -365,10 +426,7 @@ class ISO8601Sequence(SequenceBase):
 
         self.offset = ISO8601Interval.get_null()
 
-        self._cached_first_point_values = {}
-        self._cached_next_point_values = {}
-        self._cached_valid_point_booleans = {}
-        self._cached_recent_valid_points = []
+        self._init_caches()
 
         self.spec = dep_section
         self.abbrev_util = CylcTimeParser(self.context_start_point,
@@ -410,6 +468,19 @@ class ISO8601Sequence(SequenceBase):
         if self.exclusions:
             self.value += '!' + str(self.exclusions)
 
+    def _init_caches(self):
+        """Initialise (or reset) the caches of points."""
+        self._cached_first_point_values = LRUCache(
+            'ISO8601Sequence.get_first_point', self._MAX_CACHED_POINTS)
+        self._cached_next_point_values = LRUCache(
+            'ISO8601Sequence.get_next_point', self._MAX_CACHED_POINTS)
+        self._cached_valid_point_booleans = LRUCache(
+            'ISO8601Sequence.is_valid', self._MAX_CACHED_POINTS)
+        self._cached_recent_valid_points = deque(
+            maxlen=self._MAX_CACHED_POINTS)
+        # (last point,) of the recurrence, once computed.
+        self._cached_last_point = None
+
     def get_interval(self):
         """Return the interval between points in this sequence."""
         return self.step
@@ -424,10 +495,7 @@ class ISO8601Sequence(SequenceBase):
             self.recurrence.start_point += interval_parse(str(i_offset))
         if self.recurrence.end_point is not None:
             self.recurrence.end_point += interval_parse(str(i_offset))
-        self._cached_first_point_values = {}
-        self._cached_next_point_values = {}
-        self._cached_valid_point_booleans = {}
-        self._cached_recent_valid_points = []
+        self._init_caches()
         self.value = str(self.recurrence) + '!' + str(self.exclusions)
         if self.exclusions:
             self.value += '!' + str(self.exclusions)
@@ -454,15 +522,11 @@ class ISO8601Sequence(SequenceBase):
 
     def is_valid(self, point):
         """Return True if point is on-sequence and in-bounds."""
-        try:
-            return self._cached_valid_point_booleans[point.value]
-        except KeyError:
+        is_valid = self._cached_valid_point_booleans.get(point.value)
+        if is_valid is None:
             is_valid = self.is_on_sequence(point)
-            if (len(self._cached_valid_point_booleans) >
-                    self._MAX_CACHED_POINTS):
-                self._cached_valid_point_booleans.popitem()
-            self._cached_valid_point_booleans[point.value] = is_valid
-            return is_valid
+            self._cached_valid_point_booleans.put(point.value, is_valid)
+        return is_valid
 
     def get_prev_point(self, point):
         """Return the previous point < point, or None if out of bounds."""
@@ -514,10 +578,9 @@ class ISO8601Sequence(SequenceBase):
 
     def get_next_point(self, point):
         """Return the next point > p, or None if out of bounds."""
-        try:
-            return ISO8601Point(self._cached_next_point_values[point.value])
-        except KeyError:
-            pass
+        next_point_value = self._cached_next_point_values.get(point.value)
+        if next_point_value is not None:
+            return ISO8601Point(next_point_value)
         # Iterate starting at recent valid points, for speed.
         for valid_point in reversed(self._cached_recent_valid_points):
             if valid_point >= point:
@@ -553,15 +616,9 @@ class ISO8601Sequence(SequenceBase):
             )
 
         # Cache the answer for point -> next_point.
-        if (len(self._cached_next_point_values) >
-                self._MAX_CACHED_POINTS):
-            self._cached_next_point_values.popitem()
-        self._cached_next_point_values[point.value] = next_point.value
+        self._cached_next_point_values.put(point.value, next_point.value)
 
         # Cache next_point as a valid starting point for this recurrence.
-        if (len(self._cached_next_point_values) >
-                self._MAX_CACHED_POINTS):
-            self._cached_recent_valid_points.pop(0)
         self._cached_recent_valid_points.append(next_point)
 
     def get_next_point_on_sequence(self, point):
@@ -583,10 +640,9 @@ class ISO8601Sequence(SequenceBase):
 
     def get_first_point(self, point):
         """Return the first point >= to point, or None if out of bounds."""
-        try:
-            return ISO8601Point(self._cached_first_point_values[point.value])
-        except KeyError:
-            pass
+        first_point_value = self._cached_first_point_values.get(point.value)
+        if first_point_value is not None:
+            return ISO8601Point(first_point_value)
         p_iso_point = point_parse(point.value)
         for recurrence_iso_point in self.recurrence:
             if recurrence_iso_point >= p_iso_point:
@@ -595,14 +651,57 @@ class ISO8601Sequence(SequenceBase):
                 # Check multiple exclusions
                 if ret and ret in self.exclusions:
                     return self.get_next_point_on_sequence(ret)
-                if (len(self._cached_first_point_values) >
-                        self._MAX_CACHED_POINTS):
-                    self._cached_first_point_values.popitem()
-                self._cached_first_point_values[point.value] = (
-                    first_point_value)
+                self._cached_first_point_values.put(
+                    point.value, first_point_value)
                 return ret
         return None
 
+    def _get_regular_points(self, start_point, stop_point, limit):
+        """Return the points (ignoring exclusions) in bounds, >= start_point
+        and <= stop_point (if not None), at most limit (if not None).
+
+        Return None if the interval of the sequence is not of fixed length.
+
+        """
+        seconds = self.step.get_seconds()
+        if not seconds or seconds < 0:
+            return None
+        first_point = self.get_first_point(start_point)
+        if first_point is None:
+            return []
+        stops = []
+        if stop_point is not None:
+            stops.append(stop_point.seconds)
+        last_point = self._get_last_point()
+        if last_point is not None:
+            stops.append(last_point.seconds)
+        if stops:
+            n_points = (min(stops) - first_point.seconds) // seconds + 1
+            if limit is not None:
+                n_points = min(n_points, limit)
+        else:
+            n_points = limit
+        return [
+            first_point._add_seconds(i * seconds)
+            for i in range(max(n_points, 0))]
+
+    def _get_last_point(self):
+        """Return the last point of the recurrence (ignoring exclusions), or
+        None if unbounded."""
+        if self._cached_last_point is None:
+            last_point = None
+            if (self.recurrence.repetitions is not None or (
+                    (self.recurrence.start_point is not None or
+                     self.recurrence.min_point is not None) and
+                    (self.recurrence.end_point is not None or
+                     self.recurrence.max_point is not None))):
+                for recurrence_iso_point in self.recurrence:
+                    last_point = recurrence_iso_point
+                if last_point is not None:
+                    last_point = ISO8601Point(str(last_point))
+            self._cached_last_point = (last_point,)
+        return self._cached_last_point[0]
+
     def get_start_point(self):
         """Return the first point in this sequence, or None."""
         for recurrence_iso_point in self.recurrence:
@@ -845,15 +944,27 @@ def init(num_expanded_year_digits=0, custom_dump_format=None, time_zone=None,
 
 def get_point_relative(offset_string, base_point):
     """Create a point from offset_string applied to base_point."""
+    interval_value = _get_relative_interval_value(offset_string)
+    if interval_value is None:
+        return ISO8601Point(
+            _get_point_relative_value(offset_string, base_point.value))
+    return base_point + ISO8601Interval(interval_value)
+
+
+@memoize
+def _get_relative_interval_value(offset_string):
+    """Return offset_string as an interval string, or None if a point."""
     try:
-        interval = ISO8601Interval(str(interval_parse(offset_string)))
+        return str(interval_parse(offset_string))
     except ValueError:
-        return ISO8601Point(str(
-            SuiteSpecifics.abbrev_util.parse_timepoint(
-                offset_string, context_point=_point_parse(base_point.value))
-        ))
-    else:
-        return base_point + interval
+        return None
+
+
+@memoize
+def _get_point_relative_value(offset_string, base_point_string):
+    """Return the point string of offset_string relative to base point."""
+    return str(SuiteSpecifics.abbrev_util.parse_timepoint(
+        offset_string, context_point=_point_parse(base_point_string)))
 
 
 def interval_parse(interval_string):
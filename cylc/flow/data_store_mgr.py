@@ -170,12 +170,216 @@ def apply_delta(key, delta, data):
         del data[key][del_id]
 
 
+def merge_deltas(key, delta, new_delta):
+    """Merge a later deltas message of a type into an earlier one.
+
+    Applying the merged delta gives the same result as applying both in
+    turn (but for an element pruned then re-added, which is merged into any
+    old copy), so unsent deltas can be coalesced. A reloaded later delta
+    replaces the earlier one.
+
+    Args:
+        key (str): Key from DELTAS_MAP dictionary.
+        delta (object): Earlier protobuf (DELTAS_MAP[key]) message, in place.
+        new_delta (object): Later protobuf (DELTAS_MAP[key]) message.
+
+    """
+    if new_delta.reloaded:
+        delta.CopyFrom(new_delta)
+        return
+    if key == WORKFLOW:
+        for field in CLEAR_FIELD_MAP[key]:
+            delta.ClearField(field)
+        delta.MergeFrom(new_delta)
+        delta.is_held_total = new_delta.is_held_total
+        return
+    pruned = list(delta.pruned)
+    elements = {}
+    for element in delta.deltas:
+        if element.id not in pruned:
+            elements[element.id] = MESSAGE_MAP[key]()
+            elements[element.id].CopyFrom(element)
+    for element in new_delta.deltas:
+        if element.id in pruned:
+            # Re-added, so merged into any element the receiver has.
+            pruned.remove(element.id)
+        if element.id not in elements:
+            elements[element.id] = MESSAGE_MAP[key]()
+        else:
+            for field, _ in element.ListFields():
+                if field.name in CLEAR_FIELD_MAP[key]:
+                    elements[element.id].ClearField(field.name)
+        if key in (TASK_PROXIES, FAMILY_PROXIES):
+            if not element.is_held:
+                elements[element.id].is_held = False
+        elements[element.id].MergeFrom(element)
+    for del_id in new_delta.pruned:
+        elements.pop(del_id, None)
+        if del_id not in pruned:
+            pruned.append(del_id)
+    del delta.deltas[:]
+    delta.deltas.extend(elements.values())
+    delta.pruned[:] = pruned
+    delta.time = new_delta.time
+    delta.checksum = new_delta.checksum
+
+
+def _count(counter, key, increment):
+    """Increment a count, removing it on zero."""
+    counter[key] += increment
+    if not counter[key]:
+        del counter[key]
+
+
+def _index_add(index, key, id_):
+    """Add an ID to the set of an index key."""
+    index.setdefault(key, set()).add(id_)
+
+
+def _index_discard(index, key, id_):
+    """Remove an ID from the set of an index key."""
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(id_)
+        if not ids:
+            del index[key]
+
+
+def _index_lookup(index, pattern):
+    """Return IDs of index keys matching a glob pattern.
+
+    Only exact and prefix (``foo*``) patterns are looked up, other patterns
+    return None.
+
+    """
+    if not any(char in pattern for char in '*?['):
+        return set(index.get(pattern, ()))
+    prefix = pattern[:-1]
+    if (pattern.endswith('*') and prefix and
+            not any(char in prefix for char in '*?[')):
+        ids = set()
+        for key, key_ids in index.items():
+            if key.startswith(prefix):
+                ids.update(key_ids)
+        return ids
+    return None
+
+
+class NodeIndex:
+    """Secondary indexes of task or family proxies, for filtering queries.
+
+    Maintained as deltas are applied to the data store.
+
+    Attributes:
+        .held (set):
+            IDs of held nodes.
+        .keys (dict):
+            Indexed (cycle point, names, state, is_held) by ID.
+        .names (dict):
+            Set of IDs by name, of the node or its namespaces.
+        .points (dict):
+            Set of IDs by cycle point.
+        .states (dict):
+            Set of IDs by state.
+
+    """
+
+    __slots__ = ['held', 'keys', 'names', 'points', 'states']
+
+    def __init__(self):
+        self.held = set()
+        self.keys = {}
+        self.names = {}
+        self.points = {}
+        self.states = {}
+
+    def update(self, id_, element=None):
+        """Index an element by ID, or remove the ID if element is None."""
+        old = self.keys.pop(id_, None)
+        if old is not None:
+            point, names, state, _ = old
+            _index_discard(self.points, point, id_)
+            for name in names:
+                _index_discard(self.names, name, id_)
+            _index_discard(self.states, state, id_)
+            self.held.discard(id_)
+        if element is None:
+            return
+        # Names as matched by resolvers.node_ids_filter.
+        names = tuple(getattr(element, 'namespace', [element.name]))
+        self.keys[id_] = (
+            element.cycle_point, names, element.state, element.is_held)
+        _index_add(self.points, element.cycle_point, id_)
+        for name in names:
+            _index_add(self.names, name, id_)
+        _index_add(self.states, element.state, id_)
+        if element.is_held:
+            self.held.add(id_)
+
+    def apply_delta(self, delta, elements):
+        """Update the index for an applied delta.
+
+        Args:
+            delta (object): Applied protobuf (DELTAS_MAP) message.
+            elements (dict): Data-store elements of the delta type.
+
+        """
+        for element in delta.deltas:
+            self.update(element.id, elements.get(element.id))
+        for del_id in delta.pruned:
+            self.update(del_id)
+
+    def get_candidates(self, args):
+        """Return IDs of the nodes that may match filter arguments.
+
+        Args:
+            args (dict): Query arguments, as for resolvers.node_filter.
+
+        Returns:
+            set: A superset of the IDs of matching nodes, or None if the
+            arguments are not selective, so all nodes must be scanned.
+
+        """
+        selections = []
+        if args.get('states'):
+            selections.append(set().union(
+                *(self.states.get(state, ()) for state in args['states'])))
+        if args.get('is_held'):
+            selections.append(self.held)
+        if args.get('ids'):
+            ids = set()
+            for _, _, cycle, name, _, state in args['ids']:
+                item_selections = []
+                for index, pattern in (
+                        (self.points, cycle), (self.names, name)):
+                    if pattern:
+                        item_ids = _index_lookup(index, pattern)
+                        if item_ids is not None:
+                            item_selections.append(item_ids)
+                if not name:
+                    item_selections.append(set())
+                if state:
+                    item_selections.append(self.states.get(state, set()))
+                if not item_selections:
+                    ids = None
+                    break
+                ids.update(set.intersection(*item_selections))
+            if ids is not None:
+                selections.append(ids)
+        if not selections:
+            return None
+        return set.intersection(*selections)
+
+
 class DataStoreMgr:
     """Manage the workflow data store.
 
     Attributes:
         .ancestors (dict):
             Local store of config.get_first_parent_ancestors()
+        .changed_families (dict):
+            Set of families with changed state counts, for each cycle
+            point key.
         .cycle_states (dict):
             Contains dict of task and tuple (state, is_held) pairs
             for each cycle point key.
@@ -199,6 +403,15 @@ class DataStoreMgr:
             Local store of config.get_first_parent_descendants()
         .edge_points (dict):
             Source point keys of target points lists.
+        .family_held (dict):
+            Counter of held child tasks by family, for each cycle point key.
+        .family_states (dict):
+            Dict of Counter of child task states by family, for each cycle
+            point key.
+        .held_total (int):
+            Number of held task proxies.
+        .indexes (dict):
+            NodeIndex of task_proxies and family_proxies, by workflow ID.
         .max_point (cylc.flow.cycling.PointBase):
             Maximum cycle point in the pool.
         .min_point (cylc.flow.cycling.PointBase):
@@ -209,6 +422,8 @@ class DataStoreMgr:
             Cycle point objects in the task pool.
         .schd (cylc.flow.scheduler.Scheduler):
             Workflow scheduler object.
+        .state_totals (collections.Counter):
+            Number of task proxies by state.
         .workflow_id (str):
             ID of the workflow service containing owner and name.
 
@@ -220,16 +435,22 @@ class DataStoreMgr:
     # Memory optimization - constrain possible attributes to this list.
     __slots__ = [
         'ancestors',
+        'changed_families',
         'cycle_states',
         'data',
         'deltas',
         'descendants',
         'edge_points',
+        'family_held',
+        'family_states',
+        'held_total',
+        'indexes',
         'max_point',
         'min_point',
         'parents',
         'pool_points',
         'schd',
+        'state_totals',
         'updates',
         'updates_pending',
         'workflow_id',
@@ -246,6 +467,11 @@ class DataStoreMgr:
         self.min_point = None
         self.edge_points = {}
         self.cycle_states = {}
+        self.changed_families = {}
+        self.family_held = {}
+        self.family_states = {}
+        self.held_total = 0
+        self.state_totals = Counter()
         # Managed data types
         self.data = {
             self.workflow_id: {
@@ -258,6 +484,12 @@ class DataStoreMgr:
                 WORKFLOW: PbWorkflow(),
             }
         }
+        self.indexes = {
+            self.workflow_id: {
+                FAMILY_PROXIES: NodeIndex(),
+                TASK_PROXIES: NodeIndex(),
+            }
+        }
         self.deltas = {
             EDGES: EDeltas(),
             FAMILIES: FDeltas(),
@@ -454,9 +686,13 @@ class DataStoreMgr:
         update_time = time()
 
         name, point_string = TaskID.split(task_id)
-        self.cycle_states.setdefault(point_string, {})[name] = (None, False)
         t_id = f'{self.workflow_id}{ID_DELIM}{name}'
         tp_id = f'{self.workflow_id}{ID_DELIM}{point_string}{ID_DELIM}{name}'
+        # Only a new proxy is counted as a ghost, an existing one keeps
+        # its state in the counts.
+        if (tp_id not in self.data[self.workflow_id][TASK_PROXIES] and
+                tp_id not in self.updates[TASK_PROXIES]):
+            self.update_state_counts(point_string, name, None, False)
         tp_stamp = f'{tp_id}@{update_time}'
         taskdef = self.data[self.workflow_id][TASKS].get(
             t_id,
@@ -550,6 +786,7 @@ class DataStoreMgr:
                             elif child_name in self.schd.config.taskdefs:
                                 fp_delta.child_tasks.append(ch_id)
                 self.updates[FAMILY_PROXIES][fp_id] = fp_delta
+                self.changed_families.setdefault(point_string, set()).add(fam)
 
                 # Add ref ID to family element
                 f_delta = PbFamily(
@@ -607,7 +844,7 @@ class DataStoreMgr:
             if t_valid:
                 t_name, t_point = TaskID.split(t_node)
                 t_point_cls = get_point(t_point)
-                t_pool_point = get_point(t_point) in self.pool_points
+                t_pool_point = t_point_cls in self.pool_points
             # Proceed if either source or target cycle points
             # are in the task pool.
             if not s_pool_point and not t_pool_point:
@@ -789,9 +1026,52 @@ class DataStoreMgr:
 
         for point_string in point_strings:
             try:
-                del self.cycle_states[point_string]
+                c_task_states = self.cycle_states.pop(point_string)
             except KeyError:
                 continue
+            for state, is_held in c_task_states.values():
+                if state is not None:
+                    _count(self.state_totals, state, -1)
+                    self.held_total -= is_held
+            for store in (
+                    self.changed_families, self.family_held,
+                    self.family_states):
+                store.pop(point_string, None)
+
+    def update_state_counts(self, point_string, name, state, is_held):
+        """Set the state of a task, and update the state counts.
+
+        The state counts of the families of the task, and the workflow
+        state totals, are updated incrementally, so a task state change
+        costs in proportion to the depth of the family tree.
+
+        Args:
+            point_string (str): Cycle point of the task.
+            name (str): Task name.
+            state (str): Task state, or None for a ghost task.
+            is_held (bool): Whether the task is held.
+
+        """
+        c_task_states = self.cycle_states.setdefault(point_string, {})
+        old = c_task_states.get(name, (None, False))
+        c_task_states[name] = (state, is_held)
+        if old == (state, is_held):
+            return
+        fam_states = self.family_states.setdefault(point_string, {})
+        fam_held = self.family_held.setdefault(point_string, Counter())
+        changed = self.changed_families.setdefault(point_string, set())
+        for (t_state, t_is_held), sign in (old, -1), ((state, is_held), 1):
+            if t_state is None:
+                continue
+            _count(self.state_totals, t_state, sign)
+            self.held_total += sign * t_is_held
+            for parent in self.ancestors.get(name, []):
+                if parent == name:
+                    continue
+                _count(fam_states.setdefault(parent, Counter()), t_state, sign)
+                if t_is_held:
+                    _count(fam_held, parent, sign)
+                changed.add(parent)
 
     def update_task_proxies(self, updated_tasks=None):
         """Update dynamic fields of task nodes/proxies.
@@ -817,8 +1097,8 @@ class DataStoreMgr:
             if (tp_id not in task_proxies and
                     tp_id not in self.updates[TASK_PROXIES]):
                 continue
-            self.cycle_states.setdefault(point_string, {})[name] = (
-                itask.state.status, itask.state.is_held)
+            self.update_state_counts(
+                point_string, name, itask.state.status, itask.state.is_held)
             # Gather task definitions for elapsed time recalculation.
             if name not in task_defs:
                 task_defs[name] = itask.tdef
@@ -867,46 +1147,32 @@ class DataStoreMgr:
                 tasks[t_id].MergeFrom(t_delta)
 
     def update_family_proxies(self, cycle_points=None):
-        """Update state of family proxies.
+        """Update state of family proxies with changed child task states.
 
         Args:
             cycle_points (list):
                 Update family-node state from given list of
-                valid cycle point strings.
+                valid cycle point strings (default all).
 
         """
         family_proxies = self.data[self.workflow_id][FAMILY_PROXIES]
         if cycle_points is None:
-            cycle_points = self.cycle_states.keys()
+            cycle_points = list(self.changed_families)
         if not cycle_points:
             return
         update_time = time()
 
         for point_string in cycle_points:
-            # For each cycle point, construct a family state tree
-            # based on the first-parent single-inheritance tree
-            c_task_states = self.cycle_states.get(point_string, None)
-            if c_task_states is None:
+            # Families with changed child task state counts,
+            # from the first-parent single-inheritance tree.
+            changed = self.changed_families.pop(point_string, None)
+            if not changed:
                 continue
-            c_fam_task_states = {}
-            c_fam_task_is_held = {}
-
-            for key in c_task_states:
-                state, is_held = c_task_states[key]
-                if state is None:
-                    continue
+            fam_states = self.family_states.get(point_string, {})
+            fam_held = self.family_held.get(point_string, {})
 
-                for parent in self.ancestors.get(key, []):
-                    if parent == key:
-                        continue
-                    c_fam_task_states.setdefault(parent, set())
-                    c_fam_task_states[parent].add(state)
-                    c_fam_task_is_held.setdefault(parent, False)
-                    if is_held:
-                        c_fam_task_is_held[parent] = is_held
-
-            for fam, child_states in c_fam_task_states.items():
-                state = extract_group_state(child_states)
+            for fam in changed:
+                state = extract_group_state(fam_states.get(fam, ()))
                 fp_id = (
                     f'{self.workflow_id}{ID_DELIM}'
                     f'{point_string}{ID_DELIM}{fam}')
@@ -920,7 +1186,7 @@ class DataStoreMgr:
                     id=fp_id,
                     stamp=f'{fp_id}@{update_time}',
                     state=state,
-                    is_held=c_fam_task_is_held[fam]
+                    is_held=bool(fam_held.get(fam))
                 )
                 self.updates[FAMILY_PROXIES].setdefault(
                     fp_id, PbFamilyProxy()).MergeFrom(fp_delta)
@@ -932,31 +1198,12 @@ class DataStoreMgr:
         workflow = self.deltas[WORKFLOW]
         workflow.last_updated = update_time
 
-        data = self.data[self.workflow_id]
-
-        # new updates/deltas not applied yet
-        # so need to search/use updated states if available.
-        counter = Counter(
-            [t.state
-             for t in data[TASK_PROXIES].values()
-             if t.state and t.id not in self.updates[TASK_PROXIES]] +
-            [t.state
-             for t in self.updates[TASK_PROXIES].values()
-             if t.state]
-        )
-
-        workflow.states[:] = counter.keys()
-        for state, state_cnt in counter.items():
+        # Totals are kept up to date as task states change.
+        workflow.states[:] = self.state_totals.keys()
+        for state, state_cnt in self.state_totals.items():
             workflow.state_totals[state] = state_cnt
 
-        workflow.is_held_total = len(
-            [t.is_held
-             for t in data[TASK_PROXIES].values()
-             if t.is_held and t.id not in self.updates[TASK_PROXIES]] +
-            [t.is_held
-             for t in self.updates[TASK_PROXIES].values()
-             if t.is_held]
-        )
+        workflow.is_held_total = self.held_total
 
         # Construct a workflow status string for use by monitoring clients.
         workflow.status, workflow.status_msg = map(
@@ -1003,9 +1250,12 @@ class DataStoreMgr:
 
         # Apply deltas to local data-store
         data = self.data[self.workflow_id]
+        indexes = self.indexes[self.workflow_id]
         for key, delta in self.deltas.items():
             delta.reloaded = reloaded
             apply_delta(key, delta, data)
+            if key in indexes:
+                indexes[key].apply_delta(delta, data[key])
 
         # Construct checksum on deltas for export
         update_time = time()
@@ -0,0 +1,289 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Persistent job submission agents.
+
+A job submission agent is a long-lived `cylc jobs-submit-agent` process on a
+job host (run locally, or on a remote host over a single ssh connection). It
+submits batches of task jobs exactly as `cylc jobs-submit` does, but saves
+the cost of starting a new `cylc jobs-submit` process (and ssh connection)
+for each batch.
+
+The suite server program talks to the agent via its STDIN and STDOUT. Each
+message is a frame, which is the length of its payload in bytes (in ASCII
+decimal) and a newline, followed by the payload, which is a JSON object.
+
+A request is the equivalent of a `cylc jobs-submit` command:
+
+    {"job_log_root": str, "job_log_dirs": [str, ...],
+     "remote_mode": bool, "utc_mode": bool, "stdin": str}
+
+where "stdin" is the content of the job files in remote mode. The agent
+replies to each request in turn with:
+
+    {"ret_code": int, "out": str, "err": str}
+
+where "out" has the same format as the STDOUT of `cylc jobs-submit`.
+The agent exits at end of file on its STDIN.
+
+"""
+
+from collections import deque
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+import json
+import os
+from subprocess import PIPE  # nosec
+import sys
+import traceback
+
+from cylc.flow.cylc_subproc import procopen
+
+
+MAX_FRAME_SIZE = 1 << 30
+
+
+def get_frame(data):
+    """Return a frame for the JSON-serialisable data."""
+    payload = json.dumps(data).encode()
+    return b'%d\n%s' % (len(payload), payload)
+
+
+def read_frame(handle):
+    """Read a frame from a binary file handle, blocking.
+
+    Return the data of the frame, or None at end of file.
+    """
+    header = handle.readline()
+    if not header:
+        return None
+    size = int(header)
+    payload = b''
+    while len(payload) < size:
+        data = handle.read(size - len(payload))
+        if not data:
+            raise EOFError('incomplete frame')
+        payload += data
+    return json.loads(payload.decode())
+
+
+def write_frame(handle, data):
+    """Write a frame for the data to a binary file handle, and flush."""
+    handle.write(get_frame(data))
+    handle.flush()
+
+
+class FrameDecoder():
+    """Incremental decoder of frames, for non-blocking reads."""
+
+    __slots__ = ('buf', 'size')
+
+    def __init__(self):
+        self.buf = b''
+        self.size = None
+
+    def decode(self, data):
+        """Add data, and return a list of the data of complete frames."""
+        self.buf += data
+        results = []
+        while True:
+            if self.size is None:
+                header, sep, rest = self.buf.partition(b'\n')
+                if not sep:
+                    break
+                self.size = int(header)
+                if self.size > MAX_FRAME_SIZE:
+                    raise ValueError('frame too large: %d' % self.size)
+                self.buf = rest
+            if len(self.buf) < self.size:
+                break
+            payload, self.buf = self.buf[:self.size], self.buf[self.size:]
+            self.size = None
+            results.append(json.loads(payload.decode()))
+        return results
+
+
+def get_request(ctx):
+    """Return an agent request for a "cylc jobs-submit" command context.
+
+    The command is expected to be in the form:
+        cylc jobs-submit [OPTIONS] -- JOB-LOG-ROOT [JOB-LOG-DIR ...]
+    """
+    index = ctx.cmd.index('--')
+    opts = ctx.cmd[2:index]
+    stdin = ''
+    for file_ in ctx.cmd_kwargs.get('stdin_files') or []:
+        if hasattr(file_, 'read'):
+            data = file_.read()
+        else:
+            with open(file_, 'rb') as handle:
+                data = handle.read()
+        stdin += data.decode()
+    return {
+        'job_log_root': ctx.cmd[index + 1],
+        'job_log_dirs': ctx.cmd[index + 2:],
+        'remote_mode': '--remote-mode' in opts,
+        'utc_mode': '--utc-mode' in opts,
+        'stdin': stdin,
+    }
+
+
+def submit(batch_sys_mgr, request):
+    """Serve a request with a BatchSysManager, and return the response."""
+    out = StringIO()
+    err = StringIO()
+    ret_code = 0
+    sys_stdin = sys.stdin
+    sys.stdin = StringIO(request.get('stdin') or '')
+    try:
+        with redirect_stdout(out), redirect_stderr(err):
+            batch_sys_mgr.jobs_submit(
+                request['job_log_root'],
+                request['job_log_dirs'],
+                remote_mode=request.get('remote_mode', False),
+                utc_mode=request.get('utc_mode', False))
+    except Exception:
+        traceback.print_exc(file=err)
+        ret_code = 1
+    finally:
+        sys.stdin = sys_stdin
+    return {'ret_code': ret_code, 'out': out.getvalue(), 'err': err.getvalue()}
+
+
+def run_agent():
+    """Serve requests on STDIN, and write responses to STDOUT, until EOF."""
+    from cylc.flow.batch_sys_manager import BatchSysManager
+    # Keep the requests and responses away from the file descriptors
+    # inherited by the job submission commands.
+    sys.stdout.flush()
+    requests = os.fdopen(os.dup(0), 'rb')
+    responses = os.fdopen(os.dup(1), 'wb')
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    os.dup2(2, 1)
+    batch_sys_mgr = BatchSysManager()
+    while True:
+        request = read_frame(requests)
+        if request is None:
+            break
+        write_frame(responses, submit(batch_sys_mgr, request))
+
+
+class JobSubmitAgent():
+    """A job submission agent, as seen by the suite server program.
+
+    Requests are sent to the agent one at a time, so the agent is always
+    ready to read the next request in full before it writes the response.
+    The agent's STDIN is non-blocking, so a request too large for the pipe
+    is written in parts, as the pipe becomes ready, by "write".
+
+    Attributes:
+        .host (str):
+            Job host, None for localhost.
+        .user (str):
+            Job owner, None for the suite owner.
+        .proc (subprocess.Popen):
+            The agent process.
+        .queuings (collections.deque):
+            Requests waiting to be sent to the agent. Each item is a list
+            [ctx, callback, callback_args].
+        .running (list):
+            The request sent to the agent, awaiting its response, or None.
+        .sendbuf (bytes):
+            Frame of the running request not yet written to the agent.
+        .n_dones (int):
+            Number of requests served.
+        .err (str):
+            STDERR of the agent process (not of the requests).
+    """
+
+    # Maximum length of STDERR of the agent process to keep
+    MAX_ERR_LEN = 65536
+
+    def __init__(self, host=None, user=None):
+        self.host = host
+        self.user = user
+        self.proc = None
+        self.queuings = deque()
+        self.running = None
+        self.sendbuf = b''
+        self.n_dones = 0
+        self.err = ''
+        self.decoder = FrameDecoder()
+
+    def get_cmd(self):
+        """Return the command to launch the agent."""
+        cmd = ['cylc', 'jobs-submit-agent']
+        if self.host:
+            cmd.append('--host=%s' % self.host)
+        if self.user:
+            cmd.append('--user=%s' % self.user)
+        return cmd
+
+    def start(self):
+        """Launch the agent process."""
+        self.proc = procopen(
+            self.get_cmd(), stdin=PIPE, stdoutpipe=True, stderrpipe=True,
+            # Execute agent as a process group leader,
+            # so we can use "os.killpg" to kill the whole group.
+            preexec_fn=os.setpgrp)
+        os.set_blocking(self.proc.stdin.fileno(), False)
+
+    def send(self):
+        """Send the next queued request to the agent, and return it.
+
+        Write as much of the request as the pipe takes without blocking, the
+        rest is written by "write".
+        """
+        self.running = self.queuings.popleft()
+        self.sendbuf = get_frame(get_request(self.running[0]))
+        self.write()
+        return self.running
+
+    def write(self):
+        """Write some of the running request to the agent, without blocking.
+
+        Return True if the request is written in full.
+        """
+        try:
+            size = os.write(self.proc.stdin.fileno(), self.sendbuf)
+        except BlockingIOError:
+            size = 0
+        self.sendbuf = self.sendbuf[size:]
+        return not self.sendbuf
+
+    def feed(self, data):
+        """Add data read from the agent's STDOUT.
+
+        Return the running request [ctx, callback, callback_args] with its
+        ret_code, out and err set, if its response is complete, else None.
+        """
+        responses = self.decoder.decode(data)
+        if not responses:
+            return None
+        if self.running is None or len(responses) > 1:
+            raise ValueError('unexpected response')
+        ctx = self.running[0]
+        ctx.ret_code = responses[0]['ret_code']
+        ctx.out = responses[0]['out'] or None
+        ctx.err = responses[0]['err'] or None
+        done, self.running = self.running, None
+        self.n_dones += 1
+        return done
+
+    def add_err(self, data):
+        """Add data read from the agent's STDERR."""
+        self.err = (self.err + data)[-self.MAX_ERR_LEN:]
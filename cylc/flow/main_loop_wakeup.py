@@ -0,0 +1,117 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Wake up the suite server program main loop on events.
+
+In the "event" main loop mode, the main loop waits on a MainLoopWakeup
+instead of sleeping for a fixed interval. It is woken up when:
+* An item is put in a WakeupQueue, e.g. incoming task messages and commands.
+* A child process exits (SIGCHLD), e.g. job submission or xtrigger commands.
+* A file object registered with the selector is ready for reading.
+"""
+
+import os
+from queue import Queue
+import selectors
+import signal
+from time import time
+
+
+class MainLoopWakeup(object):
+    """Wake up the main loop, using a self-pipe.
+
+    The self-pipe allows events from other threads and signal handlers to be
+    waited on together with file objects in a selector.
+    """
+
+    def __init__(self):
+        self._read_fd, self._write_fd = os.pipe()
+        os.set_blocking(self._read_fd, False)
+        os.set_blocking(self._write_fd, False)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self._read_fd, selectors.EVENT_READ)
+        self._prev_sigchld_handler = None
+
+    def close(self):
+        """Restore signal handling, and close the self-pipe."""
+        if self._prev_sigchld_handler is not None:
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGCHLD, self._prev_sigchld_handler)
+            self._prev_sigchld_handler = None
+        if self.selector is not None:
+            self.selector.close()
+            self.selector = None
+            os.close(self._read_fd)
+            os.close(self._write_fd)
+
+    def install_sigchld(self):
+        """Wake up on exit of child processes.
+
+        Must be called from the main thread.
+        """
+        self._prev_sigchld_handler = signal.signal(
+            signal.SIGCHLD, self._handle_sigchld)
+        signal.set_wakeup_fd(self._write_fd)
+
+    def register(self, fileobj):
+        """Wake up when fileobj is ready for reading."""
+        self.selector.register(fileobj, selectors.EVENT_READ)
+
+    @staticmethod
+    def _handle_sigchld(*_):
+        """Do nothing - the signal wakeup fd does the work."""
+
+    def set(self):
+        """Wake up the main loop. Can be called from any thread."""
+        try:
+            os.write(self._write_fd, b'\0')
+        except (BlockingIOError, OSError):
+            # Pipe full (so already set) or closed.
+            pass
+
+    def clear(self):
+        """Drain the self-pipe."""
+        try:
+            while os.read(self._read_fd, 4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def wait(self, timeout):
+        """Wait until woken up or timeout (in seconds).
+
+        Return True if woken up, or False on timeout.
+        """
+        return bool(self.selector.select(max(timeout, 0.0)))
+
+
+class WakeupQueue(Queue):
+    """A queue that wakes up the main loop when an item is put in it.
+
+    Attributes:
+        .time_put (float):
+            Time of the oldest item in the queue, if the queue is not empty.
+    """
+
+    def __init__(self, wakeup, maxsize=0):
+        Queue.__init__(self, maxsize)
+        self.wakeup = wakeup
+        self.time_put = None
+
+    def _put(self, item):
+        if not self.queue:
+            self.time_put = time()
+        Queue._put(self, item)
+        self.wakeup.set()
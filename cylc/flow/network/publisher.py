@@ -13,15 +13,56 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
-"""Publisher for workflow runtime API."""
+"""Publisher for workflow runtime API.
+
+Subscribers receive the data-store deltas of the topics (element types) they
+subscribe to. A subscriber can instead subscribe to a filter topic, from
+``get_filter_topic``, to receive only the elements of a type in a range of
+cycle points, matching a namespace glob, and/or in some states. Filters are
+evaluated here, and their deltas serialised once for all subscribers of the
+same filter.
+
+Deltas are not dropped for a subscriber that falls behind (i.e. whose queue
+is at the high water mark); instead unsent deltas of the topic are merged
+with the next ones, so the subscriber receives the latest state once it
+catches up. If a subscriber of a topic is still behind after
+MAX_PENDING_TIME, deltas of the topic are sent to the others, and dropped
+for those behind, until all have caught up, so a stalled subscriber holds
+back the others only once, and only on its topics. Other messages (e.g.
+shutdown) are never held back, nor dropped but for subscribers behind.
+
+Deltas carry a checksum of the elements they cover, for subscribers to
+detect dropped deltas. Filter deltas cover the elements matching the filter.
+On each subscription to a filter topic, a snapshot of the matching elements,
+with reloaded set, is sent to the topic. So a subscriber of a filter topic
+resyncs by subscribing to it again; of a plain topic, by requesting its data
+elements from the server.
+
+"""
 
 import asyncio
+from fnmatch import fnmatchcase
+import inspect
+from time import time
+from urllib.parse import parse_qsl, urlencode
 
 import zmq
 
 from cylc.flow import LOG
+from cylc.flow.cycling.loader import get_point
+from cylc.flow.data_store_mgr import (
+    DELTAS_MAP, EDGES, FAMILIES, FAMILY_PROXIES, ID_DELIM, JOBS, TASKS,
+    TASK_PROXIES, WORKFLOW, generate_checksum, merge_deltas)
+from cylc.flow.exceptions import PointParsingError
 from cylc.flow.network import ZMQSocketBase
 
+# Prefix of filter topics, which plain topics do not start with.
+FILTER_PREFIX = 'filter:'
+# Filter settings, in the order they appear in filter topics.
+FILTER_KEYS = ('min_point', 'max_point', 'namespace', 'state')
+# Deltas of a topic are dropped for subscribers behind for this long (s).
+MAX_PENDING_TIME = 5.0
+
 
 async def gather_coros(coro_func, items):
     """Gather multi-part send coroutines"""
@@ -31,6 +72,13 @@ async def gather_coros(coro_func, items):
     await asyncio.gather(*gathers)
 
 
+async def maybe_await(result):
+    """Return the result of a socket call, on sync or asyncio sockets."""
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
 def serialize_data(data, serializer, *args, **kwargs):
     """Serialize by specified method."""
     if callable(serializer):
@@ -40,6 +88,219 @@ def serialize_data(data, serializer, *args, **kwargs):
     return data
 
 
+def get_filter_topic(element_type, min_point=None, max_point=None,
+                     namespace=None, states=None):
+    """Return the topic to subscribe to for filtered deltas.
+
+    Args:
+        element_type (str): Key from DELTAS_MAP, other than WORKFLOW.
+        min_point (str, optional): Minimum cycle point of elements.
+        max_point (str, optional): Maximum cycle point of elements.
+        namespace (str, optional): Glob matching the name of elements or
+            of their (first parent) ancestors.
+        states (iterable, optional): States of elements.
+
+    Returns:
+        bytes: The filter topic, which is also the topic of its messages.
+
+    """
+    if element_type not in DELTAS_MAP or element_type == WORKFLOW:
+        raise ValueError(f'cannot filter {element_type}')
+    values = (
+        min_point, max_point, namespace, ','.join(sorted(set(states or ()))))
+    query = urlencode(
+        [(key, value) for key, value in zip(FILTER_KEYS, values) if value])
+    # Terminated, so no filter topic is a prefix of another.
+    return f'{FILTER_PREFIX}{element_type}?{query};'.encode('utf-8')
+
+
+def get_element_type(topic):
+    """Return the element type (DELTAS_MAP key) of a plain or filter topic."""
+    if topic.startswith(FILTER_PREFIX):
+        return topic[len(FILTER_PREFIX):].split('?', 1)[0]
+    return topic
+
+
+class DeltaFilter:
+    """Filter deltas of an element type for the subscribers of a topic.
+
+    Args:
+        topic (bytes): Filter topic, from get_filter_topic.
+
+    Attributes:
+        .ids (set):
+            IDs of the elements matching the filter, as sent to subscribers.
+            Those no longer matching are sent as pruned.
+
+    """
+
+    __slots__ = (
+        'element_type', 'ids', 'max_point', 'min_point', 'namespace',
+        'states', '_points')
+
+    def __init__(self, topic):
+        try:
+            element_type, query = (
+                topic.decode('utf-8')[len(FILTER_PREFIX):-1].split('?', 1))
+            settings = dict(parse_qsl(query, strict_parsing=bool(query)))
+            if not set(settings).issubset(FILTER_KEYS):
+                raise ValueError(f'unknown setting in {query}')
+            states = settings.get('state', '').split(',')
+            canonical = get_filter_topic(
+                element_type, settings.get('min_point'),
+                settings.get('max_point'), settings.get('namespace'),
+                [state for state in states if state])
+            if canonical != topic:
+                raise ValueError(f'expected {canonical}')
+            self.min_point = None
+            self.max_point = None
+            if settings.get('min_point'):
+                self.min_point = get_point(settings['min_point']).standardise()
+            if settings.get('max_point'):
+                self.max_point = get_point(settings['max_point']).standardise()
+        except (PointParsingError, UnicodeDecodeError, ValueError) as exc:
+            raise ValueError(f'bad filter topic {topic}: {exc}')
+        self.element_type = element_type
+        self.namespace = settings.get('namespace')
+        self.states = set(state for state in states if state)
+        self.ids = set()
+        self._points = {}
+
+    def _get_point(self, point_string):
+        """Return a cycle point object, cached per filter call."""
+        try:
+            return self._points[point_string]
+        except KeyError:
+            point = get_point(point_string).standardise()
+            self._points[point_string] = point
+            return point
+
+    def _match_subject(self, point_string, names, state):
+        """Return True if a point, list of names and state match."""
+        if point_string and (self.min_point or self.max_point):
+            point = self._get_point(point_string)
+            if self.min_point and point < self.min_point:
+                return False
+            if self.max_point and point > self.max_point:
+                return False
+        if self.namespace and not any(
+                fnmatchcase(name, self.namespace) for name in names):
+            return False
+        return not (state is not None and self.states and
+                    state not in self.states)
+
+    def match(self, element, data=None):
+        """Return True if an element matches the filter.
+
+        Settings which do not apply to the element type (e.g. cycle point
+        for task definitions) are ignored. Edges match if either of their
+        nodes match.
+
+        Args:
+            element (object): Full protobuf data element.
+            data (dict, optional): Data-store workflow, for the task
+                proxies of jobs and edges.
+
+        """
+        proxies = data[TASK_PROXIES] if data else {}
+        if self.element_type == TASK_PROXIES:
+            subjects = [
+                (element.cycle_point, element.namespace, element.state)]
+        elif self.element_type == FAMILY_PROXIES:
+            names = [element.name] + [
+                ancestor.rsplit(ID_DELIM, 1)[-1]
+                for ancestor in element.ancestors]
+            subjects = [(element.cycle_point, names, element.state)]
+        elif self.element_type == JOBS:
+            tproxy = proxies.get(element.task_proxy)
+            names = tproxy.namespace if tproxy else [element.name]
+            subjects = [(element.cycle_point, names, element.state)]
+        elif self.element_type == TASKS:
+            subjects = [(None, element.namespace, None)]
+        elif self.element_type == FAMILIES:
+            subjects = [(None, [element.name], None)]
+        else:  # EDGES
+            subjects = []
+            for node_id in (element.source, element.target):
+                tproxy = proxies.get(node_id)
+                if tproxy:
+                    subjects.append(
+                        (tproxy.cycle_point, tproxy.namespace, tproxy.state))
+                elif node_id:
+                    point_string, name = node_id.split(ID_DELIM)[-2:]
+                    subjects.append((point_string, [name], None))
+        return any(self._match_subject(*subject) for subject in subjects)
+
+    def reset(self, data):
+        """Set the matching elements from the data-store workflow."""
+        self.ids = set(
+            id_ for id_, element in data[self.element_type].items()
+            if self.match(element, data))
+        self._points.clear()
+
+    def get_checksum(self, data):
+        """Return the checksum of the matching elements, as for deltas."""
+        elements = data[self.element_type]
+        attr = 'id' if self.element_type == EDGES else 'stamp'
+        return generate_checksum(
+            [getattr(elements[id_], attr) for id_ in self.ids
+             if id_ in elements])
+
+    def snapshot(self, data):
+        """Reset from the data-store workflow, and return a reloaded delta
+        of all the matching elements in full."""
+        self.reset(data)
+        elements = data[self.element_type]
+        snapshot = DELTAS_MAP[self.element_type]()
+        snapshot.deltas.extend(
+            elements[id_] for id_ in sorted(self.ids))
+        snapshot.time = data[WORKFLOW].last_updated
+        snapshot.checksum = self.get_checksum(data)
+        snapshot.reloaded = True
+        return snapshot
+
+    def filter(self, delta, data=None):
+        """Return the delta for the subscribers of the filter, or None.
+
+        Elements which start to match are sent in full, and those which
+        stop matching are sent as pruned. The checksum covers the matching
+        elements, if data is given.
+
+        Args:
+            delta (object): Protobuf (DELTAS_MAP[element_type]) message.
+            data (dict, optional): Data-store workflow, with the delta
+                applied. If not given, elements of the delta are matched.
+
+        """
+        if delta.reloaded:
+            self.ids.clear()
+        elements = data[self.element_type] if data else {}
+        filtered = DELTAS_MAP[self.element_type]()
+        for element in delta.deltas:
+            full = elements.get(element.id, element)
+            if self.match(full, data):
+                if element.id in self.ids:
+                    filtered.deltas.append(element)
+                else:
+                    self.ids.add(element.id)
+                    filtered.deltas.append(full)
+            elif element.id in self.ids:
+                self.ids.remove(element.id)
+                filtered.pruned.append(element.id)
+        for del_id in delta.pruned:
+            if del_id in self.ids:
+                self.ids.remove(del_id)
+                filtered.pruned.append(del_id)
+        self._points.clear()
+        if not (filtered.deltas or filtered.pruned or delta.reloaded):
+            return None
+        filtered.time = delta.time
+        filtered.reloaded = delta.reloaded
+        if data:
+            filtered.checksum = self.get_checksum(data)
+        return filtered
+
+
 class WorkflowPublisher(ZMQSocketBase):
     """Initiate the PUB part of a ZMQ PUB-SUB pair.
 
@@ -47,17 +308,30 @@ class WorkflowPublisher(ZMQSocketBase):
 
     Note: Security TODO
 
+    Args:
+        data_store_mgr (cylc.flow.data_store_mgr.DataStoreMgr, optional):
+            Data store of the published deltas, used to evaluate filters.
+
     Usage:
         * Define ...
 
     """
 
     def __init__(self, suite, context=None, barrier=None,
-                 threaded=True, daemon=False):
-        super().__init__(zmq.PUB, bind=True, context=context,
+                 threaded=True, daemon=False, data_store_mgr=None):
+        super().__init__(zmq.XPUB, bind=True, context=context,
                          barrier=barrier, threaded=threaded, daemon=daemon)
         self.suite = suite
+        self.data_store_mgr = data_store_mgr
         self.topics = set()
+        # {topic: DeltaFilter} of subscribed filter topics.
+        self.filters = {}
+        # {topic: delta} of unsent deltas.
+        self.pending = {}
+        # {topic: time} since when subscribers of a topic are behind.
+        self.lagging = {}
+        # Topics of deltas dropped for subscribers behind.
+        self.dropping = set()
 
     def _socket_options(self):
         """Set socket options after socket instantiation and before bind.
@@ -68,15 +342,134 @@ class WorkflowPublisher(ZMQSocketBase):
         # this limit on messages in queue is more than enough,
         # as messages correspond to scheduler loops (*messages/loop):
         self.socket.sndhwm = 1000
+        # pass on every subscription, to send snapshots of filter topics.
+        self.socket.setsockopt(zmq.XPUB_VERBOSE, 1)
 
     def _bespoke_stop(self):
         """Bespoke stop items."""
         LOG.debug('stopping zmq publisher...')
         self.stopping = True
 
+    def _get_data(self):
+        """Return the data-store workflow, if there is one."""
+        if self.data_store_mgr is None:
+            return None
+        return self.data_store_mgr.data.get(self.data_store_mgr.workflow_id)
+
+    async def update_subscriptions(self):
+        """Add or remove filters, on (un)subscription messages.
+
+        The XPUB socket passes every subscription to, but only the last
+        unsubscription from, a topic. A snapshot of the matching elements is
+        sent on each subscription to a filter topic.
+
+        """
+        while await maybe_await(self.socket.poll(0)):
+            msg = await maybe_await(self.socket.recv())
+            topic = msg[1:]
+            if not topic.startswith(FILTER_PREFIX.encode('utf-8')):
+                continue
+            if msg[0] != 1:
+                self.filters.pop(topic, None)
+                self.pending.pop(topic, None)
+                self.lagging.pop(topic, None)
+                self.dropping.discard(topic)
+                continue
+            delta_filter = self.filters.get(topic)
+            if delta_filter is None:
+                try:
+                    delta_filter = DeltaFilter(topic)
+                except ValueError as exc:
+                    LOG.warning('publish: %s', exc)
+                    continue
+                self.filters[topic] = delta_filter
+            data = self._get_data()
+            if data:
+                await self.send_delta(
+                    topic, delta_filter.element_type,
+                    delta_filter.snapshot(data))
+
+    async def _send(self, topic, msg, nodrop=False):
+        """Send a message without blocking.
+
+        If nodrop, raise zmq.Again if any subscriber of the topic is behind,
+        else drop the message for those subscribers.
+
+        """
+        self.socket.setsockopt(zmq.XPUB_NODROP, int(nodrop))
+        try:
+            await maybe_await(self.socket.send_multipart(
+                [topic, msg], flags=zmq.NOBLOCK))
+        finally:
+            if nodrop:
+                self.socket.setsockopt(zmq.XPUB_NODROP, 0)
+
+    async def send_delta(self, topic, element_type, delta=None):
+        """Send a deltas message, merged with any unsent on the topic.
+
+        If subscribers of the topic are behind, the merged delta is kept to
+        send later, unless they have been behind for over MAX_PENDING_TIME,
+        in which case it is sent to the others.
+
+        Args:
+            topic (bytes): The topic of the message.
+            element_type (str): Key from DELTAS_MAP dictionary.
+            delta (object, optional): Protobuf (DELTAS_MAP[element_type])
+                message, or None to resend unsent deltas only.
+
+        """
+        pending = self.pending.pop(topic, None)
+        if pending is not None:
+            if delta is not None:
+                merge_deltas(element_type, pending, delta)
+            delta = pending
+        elif delta is None:
+            return
+        msg = delta.SerializeToString()
+        try:
+            await self._send(topic, msg, nodrop=True)
+        except zmq.Again:
+            since = self.lagging.setdefault(topic, time())
+            if time() - since <= MAX_PENDING_TIME:
+                if pending is None:
+                    pending = DELTAS_MAP[element_type]()
+                    pending.CopyFrom(delta)
+                self.pending[topic] = pending
+                return
+            if topic not in self.dropping:
+                self.dropping.add(topic)
+                LOG.warning(
+                    'publish: %s subscriber(s) behind for over %ss,'
+                    ' dropping deltas for them',
+                    topic.decode('utf-8'), MAX_PENDING_TIME)
+            await self._send(topic, msg)
+        else:
+            self.lagging.pop(topic, None)
+            if topic in self.dropping:
+                self.dropping.remove(topic)
+                LOG.info('publish: %s subscribers caught up',
+                         topic.decode('utf-8'))
+
+    async def send_pending(self, force=False):
+        """Resend unsent deltas; if force, drop them for those behind."""
+        for topic, delta in list(self.pending.items()):
+            if force:
+                del self.pending[topic]
+                await self._send(topic, delta.SerializeToString())
+            else:
+                if topic in self.filters:
+                    element_type = self.filters[topic].element_type
+                else:
+                    element_type = topic.decode('utf-8')
+                await self.send_delta(topic, element_type)
+
     async def send_multi(self, topic, data, serializer=None):
         """Send multi part message.
 
+        Data-store deltas are also sent to the filter topics of their type,
+        and merged with any unsent (see send_delta). Unsent deltas are sent
+        before other messages.
+
         Args:
             topic (bytes): The topic of the message.
             data (object): Data element/message to serialise and send.
@@ -84,9 +477,26 @@ class WorkflowPublisher(ZMQSocketBase):
 
         """
         self.topics.add(topic)
-        self.socket.send_multipart(
-            [topic, serialize_data(data, serializer)]
-        )
+        element_type = topic.decode('utf-8')
+        if element_type in DELTAS_MAP and element_type != WORKFLOW:
+            workflow = self._get_data()
+            for filter_topic, delta_filter in list(self.filters.items()):
+                if delta_filter.element_type == element_type:
+                    filtered = delta_filter.filter(data, workflow)
+                    if filtered is not None:
+                        await self.send_delta(
+                            filter_topic, element_type, filtered)
+        if element_type in DELTAS_MAP:
+            await self.send_delta(topic, element_type, data)
+            return
+        await self.send_pending(force=True)
+        await self._send(topic, serialize_data(data, serializer))
+
+    async def publish_coros(self, items):
+        """Update subscriptions, resend unsent deltas, then send items."""
+        await self.update_subscriptions()
+        await self.send_pending()
+        await gather_coros(self.send_multi, items)
 
     def publish(self, items):
         """Publish topics.
@@ -96,6 +506,6 @@ class WorkflowPublisher(ZMQSocketBase):
 
         """
         try:
-            self.loop.run_until_complete(gather_coros(self.send_multi, items))
+            self.loop.run_until_complete(self.publish_coros(items))
         except Exception as exc:
             LOG.error('publish: %s', exc)
@@ -160,8 +160,10 @@ def sort_elements(elements, args):
 class BaseResolvers:
     """Data access methods for resolving GraphQL queries."""
 
-    def __init__(self, data):
+    def __init__(self, data, indexes=None):
         self.data = data
+        # {workflow ID: {node type: NodeIndex}}, see DataStoreMgr.indexes.
+        self.indexes = indexes
 
     # Query resolvers
     async def get_workflows_data(self, args):
@@ -184,10 +186,26 @@ class BaseResolvers:
         return sort_elements(
             [n
              for flow in await self.get_workflows_data(args)
-             for n in flow.get(node_type).values()
+             for n in self.get_candidate_nodes(flow, node_type, args)
              if node_filter(n, args)],
             args)
 
+    def get_candidate_nodes(self, flow, node_type, args):
+        """Return nodes of a workflow that may match args.
+
+        Uses the workflow indexes, if there are any for the node type and
+        the args are selective, otherwise returns all nodes.
+
+        """
+        nodes = flow.get(node_type)
+        index = (self.indexes or {}).get(flow[WORKFLOW].id, {}).get(node_type)
+        if index is None:
+            return nodes.values()
+        ids = index.get_candidates(args)
+        if ids is None:
+            return nodes.values()
+        return [nodes[n_id] for n_id in sorted(ids) if n_id in nodes]
+
     async def get_nodes_by_ids(self, node_type, args):
         """Return protobuf node objects for given id."""
         nat_ids = set(args.get('native_ids', []))
@@ -141,6 +141,7 @@ class SuiteRuntimeServer(ZMQSocketBase):
         self.queue = None
         self.resolvers = Resolvers(
             self.schd.data_store_mgr.data,
+            indexes=self.schd.data_store_mgr.indexes,
             schd=self.schd)
 
     def _socket_options(self):
@@ -459,6 +460,18 @@ class SuiteRuntimeServer(ZMQSocketBase):
         """
         return self.schd.task_events_mgr.broadcast_mgr.get_broadcast(task_id)
 
+    @authorise(Priv.READ)
+    @expose
+    def get_cache_stats(self):
+        """Return statistics of the caches of the suite server program.
+
+        Returns:
+            dict: ``{name: {"size": ..., "hits": ..., "misses": ...,
+            "evictions": ...}, ...}``, e.g. for caches of cycling objects.
+
+        """
+        return self.schd.info_get_cache_stats()
+
     @authorise(Priv.IDENTITY)
     @expose
     def get_cylc_version(self):
@@ -23,14 +23,19 @@ from typing import Iterable, Union
 import zmq
 
 from cylc.flow.network import ZMQSocketBase, get_location
+from cylc.flow.network.publisher import get_element_type
 from cylc.flow.data_store_mgr import DELTAS_MAP
 
 
 def process_delta_msg(btopic, delta_msg, func, *args, **kwargs):
-    """Utility for processing serialised data-store deltas."""
+    """Utility for processing serialised data-store deltas.
+
+    Deltas of filter topics are of the type of the filtered elements.
+
+    """
     topic = btopic.decode('utf-8')
     try:
-        delta = DELTAS_MAP[topic]()
+        delta = DELTAS_MAP[get_element_type(topic)]()
         delta.ParseFromString(delta_msg)
     except KeyError:
         delta = delta_msg
@@ -15,6 +15,9 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import re
+from time import time
+
+from cylc.flow import LOG
 from cylc.flow.parsec.exceptions import (
     ParsecError, ItemNotFoundError, NotSingleItemError)
 from cylc.flow.parsec.fileparse import parse
@@ -24,16 +27,43 @@ from cylc.flow.parsec.OrderedDict import OrderedDictWithDefaults
 from cylc.flow.parsec.util import itemstr, m_override, replicate, un_many
 
 
+def get_defaults(spec):
+    """Return a new pdict of the default values of the items in spec.
+
+    Sections of the result include any "__MANY__" placeholders of spec.
+    """
+    defaults = OrderedDictWithDefaults()
+    # Populate dict with default values from the spec
+    stack = [[defaults, spec]]
+    while stack:
+        defs, spec = stack.pop()
+        for key, val in spec.items():
+            if isinstance(val, dict):
+                if key not in defs:
+                    defs[key] = OrderedDictWithDefaults()
+                stack.append((defs[key], spec[key]))
+            else:
+                try:
+                    defs[key] = spec[key][1]
+                except IndexError:
+                    if spec[key][0].endswith('_LIST'):
+                        defs[key] = []
+                    else:
+                        defs[key] = None
+    return defaults
+
+
 class ParsecConfig(object):
     """Object wrapper for parsec functions."""
 
     def __init__(self, spec, upgrader=None, output_fname=None, tvars=None,
-                 validator=None):
+                 validator=None, cache_dir=None):
         self.sparse = OrderedDictWithDefaults()
         self.dense = OrderedDictWithDefaults()
         self.upgrader = upgrader
         self.tvars = tvars
         self.output_fname = output_fname
+        self.cache_dir = cache_dir
         self.spec = spec
         if validator is None:
             validator = parsec_validate
@@ -44,12 +74,17 @@ class ParsecConfig(object):
         validate it against the spec, and if this is not the first load,
         combine/override with the existing loaded config."""
 
-        sparse = parse(rcfile, self.output_fname, self.tvars)
+        sparse = parse(rcfile, self.output_fname, self.tvars, self.cache_dir)
 
+        start_time = time()
         if self.upgrader is not None:
             self.upgrader(sparse, title)
+        upgrade_time = time()
 
         self.validate(sparse)
+        LOG.debug(
+            '%s: upgraded in %.3fs, validated in %.3fs', rcfile,
+            upgrade_time - start_time, time() - upgrade_time)
 
         if not self.sparse:
             self.sparse = sparse
@@ -64,24 +99,7 @@ class ParsecConfig(object):
     def expand(self):
         """Flesh out undefined items with defaults, if any, from the spec."""
         if not self.dense:
-            dense = OrderedDictWithDefaults()
-            # Populate dict with default values from the spec
-            stack = [[dense, self.spec]]
-            while stack:
-                defs, spec = stack.pop()
-                for key, val in spec.items():
-                    if isinstance(val, dict):
-                        if key not in defs:
-                            defs[key] = OrderedDictWithDefaults()
-                        stack.append((defs[key], spec[key]))
-                    else:
-                        try:
-                            defs[key] = spec[key][1]
-                        except IndexError:
-                            if spec[key][0].endswith('_LIST'):
-                                defs[key] = []
-                            else:
-                                defs[key] = None
+            dense = get_defaults(self.spec)
             # override defaults with sparse values
             m_override(dense, self.sparse)
             un_many(dense)
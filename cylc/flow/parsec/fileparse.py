@@ -33,6 +33,7 @@ parsec config file parsing:
 import os
 import sys
 import re
+from time import time
 
 from cylc.flow import LOG
 from cylc.flow.parsec.exceptions import ParsecError, FileParseError
@@ -200,12 +201,14 @@ def multiline(flines, value, index, maxline):
     return quot + newvalue + line, index
 
 
-def read_and_proc(fpath, template_vars=None, viewcfg=None, asedit=False):
+def read_and_proc(fpath, template_vars=None, viewcfg=None, asedit=False,
+                  cache_dir=None):
     """
     Read a cylc parsec config file (at fpath), inline any include files,
     process with Jinja2, and concatenate continuation lines.
     Jinja2 processing must be done before concatenation - it could be
     used to generate continuation lines.
+    If cache_dir is specified, cache compiled Jinja2 templates in it.
     """
     fdir = os.path.dirname(fpath)
 
@@ -259,7 +262,7 @@ def read_and_proc(fpath, template_vars=None, viewcfg=None, asedit=False):
             except (ImportError, ModuleNotFoundError):
                 raise ParsecError('Jinja2 Python package must be installed '
                                   'to process file: ' + fpath)
-            flines = jinja2process(flines, fdir, template_vars)
+            flines = jinja2process(flines, fdir, template_vars, cache_dir)
 
     # concatenate continuation lines
     if do_contin:
@@ -269,11 +272,17 @@ def read_and_proc(fpath, template_vars=None, viewcfg=None, asedit=False):
     return [fl.rstrip() for fl in flines]
 
 
-def parse(fpath, output_fname=None, template_vars=None):
-    """Parse file items line-by-line into a corresponding nested dict."""
+def parse(fpath, output_fname=None, template_vars=None, cache_dir=None):
+    """Parse file items line-by-line into a corresponding nested dict.
+
+    If cache_dir is specified, cache compiled Jinja2 templates in it.
+    """
 
     # read and process the file (jinja2, include-files, line continuation)
-    flines = read_and_proc(fpath, template_vars)
+    start_time = time()
+    flines = read_and_proc(fpath, template_vars, cache_dir=cache_dir)
+    proc_time = time()
+    LOG.debug('%s: read and processed in %.3fs', fpath, proc_time - start_time)
     if output_fname:
         with open(output_fname, 'w') as handle:
             handle.write('\n'.join(flines) + '\n')
@@ -335,4 +344,5 @@ def parse(fpath, output_fname=None, template_vars=None):
                 raise FileParseError(
                     'Invalid line', index=index, line=line)
 
+    LOG.debug('%s: parsed in %.3fs', fpath, time() - proc_time)
     return config
@@ -23,6 +23,7 @@ import os
 import pkgutil
 import re
 import sys
+from time import time
 import traceback
 from glob import glob
 
@@ -30,6 +31,7 @@ from jinja2 import (
     BaseLoader,
     ChoiceLoader,
     Environment,
+    FileSystemBytecodeCache,
     FileSystemLoader,
     StrictUndefined,
     TemplateNotFound,
@@ -41,6 +43,11 @@ from cylc.flow.parsec.exceptions import Jinja2Error
 TRACEBACK_LINENO = re.compile(r'(\s+)?File "<template>", line (\d+)')
 CONTEXT_LINES = 3
 
+# Jinja2 environments by (template directory, bytecode cache directory),
+# reused by subsequent processing in the same process (e.g. on reload).
+# Values are (plugin files signature, environment), see _get_plugin_files.
+_ENVIRONMENTS = {}
+
 
 class PyModuleLoader(BaseLoader):
     """Load python module as Jinja2 template.
@@ -84,6 +91,36 @@ class PyModuleLoader(BaseLoader):
         return templ
 
 
+class BytecodeCache(FileSystemBytecodeCache):
+    """Cache of compiled templates in a directory, safe for concurrent use.
+
+    Cache files are replaced atomically, and unreadable cache files are
+    ignored (the template is compiled again).
+    """
+
+    def load_bytecode(self, bucket):
+        try:
+            super().load_bytecode(bucket)
+        except Exception as exc:
+            LOG.debug('Cannot load Jinja2 bytecode cache: %s', exc)
+            bucket.reset()
+
+    def dump_bytecode(self, bucket):
+        path = self._get_cache_filename(bucket)
+        temp_path = '%s.%d' % (path, os.getpid())
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, 'wb') as handle:
+                bucket.write_bytecode(handle)
+            os.replace(temp_path, path)
+        except OSError as exc:
+            LOG.warning('Cannot write Jinja2 bytecode cache: %s', exc)
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+
 def raise_helper(message, error_type='Error'):
     """Provides a Jinja2 function for raising exceptions."""
     # TODO - this more nicely
@@ -137,17 +174,55 @@ def _load_jinja2_extensions():
     return jinja2_extensions
 
 
-def jinja2environment(dir_=None):
-    """Set up and return Jinja2 environment."""
+def _get_plugin_dirs(dir_):
+    """Return [(namespace, directory), ...] for custom Jinja2 plugins."""
+    items = []
+    for namespace in ['filters', 'tests', 'globals']:
+        nspdir = 'Jinja2' + namespace.capitalize()
+        for fdir in [
+            os.path.join(dir_, nspdir),
+            os.path.join(os.environ['HOME'], '.cylc', nspdir)
+        ]:
+            items.append((namespace, fdir))
+    return items
+
+
+def _get_plugin_files(dir_):
+    """Return a signature of the custom Jinja2 plugin files for dir_.
+
+    The signature is a tuple of (path, modification time) of the files, so
+    an environment is not reused after plugins are added, removed or
+    modified.
+    """
+    items = []
+    for _, fdir in _get_plugin_dirs(dir_):
+        for name in sorted(glob(os.path.join(fdir, '*.py'))):
+            try:
+                items.append((name, os.stat(name).st_mtime))
+            except OSError:
+                pass
+    return tuple(items)
+
+
+def jinja2environment(dir_=None, cache_dir=None):
+    """Set up and return Jinja2 environment.
+
+    If cache_dir is specified, cache compiled templates in it.
+    """
     if dir_ is None:
         dir_ = os.getcwd()
 
+    bytecode_cache = None
+    if cache_dir is not None:
+        bytecode_cache = BytecodeCache(cache_dir)
+
     # Ignore bandit false positive: B701:jinja2_autoescape_false
     # This env is not used to render content that is vulnerable to XSS.
     env = Environment(  # nosec
         loader=ChoiceLoader([FileSystemLoader(dir_), PyModuleLoader()]),
         undefined=StrictUndefined,
-        extensions=['jinja2.ext.do'])
+        extensions=['jinja2.ext.do'],
+        bytecode_cache=bytecode_cache)
 
     # Load Jinja2 filters using setuptools
     for scope, extensions in _load_jinja2_extensions().items():
@@ -161,21 +236,15 @@ def jinja2environment(dir_=None):
     # |  #!/usr/bin/env python3
     # |  def foo( value, length, fillchar ):
     # |     return str(value).rjust( int(length), str(fillchar) )
-    for namespace in ['filters', 'tests', 'globals']:
-        nspdir = 'Jinja2' + namespace.capitalize()
-        fdirs = [
-            os.path.join(dir_, nspdir),
-            os.path.join(os.environ['HOME'], '.cylc', nspdir)
-        ]
-        for fdir in fdirs:
-            if os.path.isdir(fdir):
-                sys.path.insert(1, os.path.abspath(fdir))
-                for name in glob(os.path.join(fdir, '*.py')):
-                    fname = os.path.splitext(os.path.basename(name))[0]
-                    # TODO - EXCEPTION HANDLING FOR LOADING CUSTOM FILTERS
-                    module = __import__(fname)
-                    envnsp = getattr(env, namespace)
-                    envnsp[fname] = getattr(module, fname)
+    for namespace, fdir in _get_plugin_dirs(dir_):
+        if os.path.isdir(fdir):
+            sys.path.insert(1, os.path.abspath(fdir))
+            for name in glob(os.path.join(fdir, '*.py')):
+                fname = os.path.splitext(os.path.basename(name))[0]
+                # TODO - EXCEPTION HANDLING FOR LOADING CUSTOM FILTERS
+                module = __import__(fname)
+                envnsp = getattr(env, namespace)
+                envnsp[fname] = getattr(module, fname)
 
     # Import SUITE HOST USER ENVIRONMENT into template:
     # (usage e.g.: {{environ['HOME']}}).
@@ -185,6 +254,23 @@ def jinja2environment(dir_=None):
     return env
 
 
+def get_template(env, source, name):
+    """Return a template of source, compiled or from the bytecode cache.
+
+    The bytecode cache of env, if any, stores the compiled source by name (as
+    env.from_string does not use the cache).
+    """
+    bcc = env.bytecode_cache
+    if bcc is None:
+        return env.from_string(source)
+    bucket = bcc.get_bucket(env, name, None, source)
+    if bucket.code is None:
+        bucket.code = env.compile(source)
+        bcc.set_bucket(bucket)
+    return env.template_class.from_code(
+        env, bucket.code, env.make_globals(None), None)
+
+
 def get_error_location():
     """Extract template line number from end of traceback.
 
@@ -199,8 +285,13 @@ def get_error_location():
     return None
 
 
-def jinja2process(flines, dir_, template_vars=None):
-    """Pass configure file through Jinja2 processor."""
+def jinja2process(flines, dir_, template_vars=None, cache_dir=None):
+    """Pass configure file through Jinja2 processor.
+
+    If cache_dir is specified, cache compiled templates in it. The Jinja2
+    environment is reused by subsequent calls for the same dir_ and
+    cache_dir, unless the custom Jinja2 plugin files have changed.
+    """
     # Load file lines into a template, excluding '#!jinja2' so that
     # '#!cylc-x.y.z' rises to the top. Callers should handle jinja2
     # TemplateSyntaxerror and TemplateError.
@@ -219,9 +310,21 @@ def jinja2process(flines, dir_, template_vars=None):
     # Convert unicode to plain str, ToDo - still needed for parsec?)
 
     try:
-        env = jinja2environment(dir_)
-        template = env.from_string('\n'.join(flines[1:]))
+        start_time = time()
+        plugin_files = _get_plugin_files(dir_)
+        try:
+            env_plugin_files, env = _ENVIRONMENTS[(dir_, cache_dir)]
+        except KeyError:
+            env_plugin_files = None
+        if env_plugin_files != plugin_files:
+            env = jinja2environment(dir_, cache_dir)
+            _ENVIRONMENTS[(dir_, cache_dir)] = (plugin_files, env)
+        template = get_template(env, '\n'.join(flines[1:]), dir_)
+        compile_time = time()
         lines = str(template.render(template_vars)).splitlines()
+        LOG.debug(
+            'Jinja2 template loaded in %.3fs, rendered in %.3fs',
+            compile_time - start_time, time() - compile_time)
     except TemplateSyntaxError as exc:
         filename = None
         # extract source lines
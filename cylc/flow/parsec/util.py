@@ -199,6 +199,43 @@ def replicate(target, source):
             target[key] = val
 
 
+def layer(base, source):
+    """Return a new pdict of source replicated over base.
+
+    The result is equal to replicating source into a deep copy of base, but
+    items of base that source does not override (including whole sub-dicts)
+    are shared with base, not copied. Neither the result nor base should be
+    modified in place afterwards.
+    """
+    target = OrderedDictWithDefaults()
+    if hasattr(source, "defaults_"):
+        target.defaults_ = pdeepcopy(source.defaults_)
+    elif hasattr(base, "defaults_"):
+        target.defaults_ = base.defaults_
+    for key, val in base.items():
+        if key not in source:
+            target[key] = val
+        elif isinstance(source[key], dict):
+            if isinstance(val, dict):
+                target[key] = layer(val, source[key])
+            else:
+                target[key] = layer(OrderedDictWithDefaults(), source[key])
+        elif isinstance(source[key], list):
+            target[key] = source[key][:]
+        else:
+            target[key] = source[key]
+    for key, val in source.items():
+        if key in base:
+            continue
+        if isinstance(val, dict):
+            target[key] = layer(OrderedDictWithDefaults(), val)
+        elif isinstance(val, list):
+            target[key] = val[:]
+        else:
+            target[key] = val
+    return target
+
+
 def pdeepcopy(source):
     """Make a deep copy of a pdict source"""
     target = OrderedDictWithDefaults()
@@ -297,6 +334,30 @@ def m_override(target, sparse):
         dest_dict.defaults_ = defaults
 
 
+def expand_section(sparse, defaults):
+    """Return a new dense pdict of the items of sparse over defaults.
+
+    The result is equal to the section of a dense config expanded by
+    m_override with defaults as its "__MANY__" placeholder (after un_many):
+    defaults, and the corresponding sub-dicts of defaults, are the defaults_
+    of the result and its sub-dicts, so are shared, not copied.
+    """
+    target = OrderedDictWithDefaults()
+    if defaults:
+        target.defaults_ = defaults
+    for key, val in sparse.items():
+        if isinstance(val, dict):
+            if key in defaults and isinstance(defaults[key], dict):
+                target[key] = expand_section(val, defaults[key])
+            else:
+                target[key] = expand_section(val, OrderedDictWithDefaults())
+        elif isinstance(val, list):
+            target[key] = val[:]
+        else:
+            target[key] = val
+    return target
+
+
 def un_many(cfig):
     """Remove any '__MANY__' items from a nested dict, in-place."""
     if not cfig:
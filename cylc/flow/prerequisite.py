@@ -17,6 +17,7 @@
 """Functionality for expressing and evaluating logical triggers."""
 
 import math
+import sys
 
 from cylc.flow.conditional_simplifier import ConditionalSimplifier
 from cylc.flow.cycling.loader import get_point
@@ -24,16 +25,22 @@ from cylc.flow.exceptions import TriggerExpressionError
 from cylc.flow.data_messages_pb2 import PbPrerequisite, PbCondition
 
 
+# Compiled conditional expressions, shared by all prerequisites.
+# {'s[0]|s[1]&s[2]': <function>, ...}
+_COMPILED_CONDITIONS = {}
+
+
 class Prerequisite(object):
     """The concrete result of an abstract logical trigger expression."""
 
     # Memory optimization - constrain possible attributes to this list.
     __slots__ = ["satisfied", "_all_satisfied",
                  "target_point_strings", "start_point",
-                 "pre_initial_messages", "conditional_expression", "point"]
+                 "pre_initial_messages", "conditional_expression", "point",
+                 "_conditional_messages", "_conditional_shape"]
 
-    # Extracts T from "foo.T succeeded" etc.
-    SATISFIED_TEMPLATE = 'bool(self.satisfied[("%s", "%s", "%s")])'
+    # Positional reference to message N in the compiled expression.
+    SATISFIED_TEMPLATE = 's[%d]'
     MESSAGE_TEMPLATE = '%s.%s %s'
 
     DEP_STATE_SATISFIED = 'satisfied naturally'
@@ -64,6 +71,15 @@ class Prerequisite(object):
         # 'foo.1 failed & bar.1 succeeded'
         self.conditional_expression = None
 
+        # Messages in the order referenced by self._conditional_shape.
+        # (('foo', '1', 'failed'), ('bar', '1', 'succeeded'))
+        self._conditional_messages = None
+
+        # The expression in terms of message positions, independent of
+        # cycle point, so shared by prerequisites of the same dependency.
+        # 's[0]&s[1]'
+        self._conditional_shape = None
+
         # The cached state of this prerequisite:
         # * `None` (no cached state)
         # * `True` (prerequisite satisfied)
@@ -98,13 +114,7 @@ class Prerequisite(object):
         Returns None if this prerequisite is not a conditional one.
 
         """
-        expr = self.conditional_expression
-        if not expr:
-            return None
-        for message in self.satisfied:
-            expr = expr.replace(self.SATISFIED_TEMPLATE % message,
-                                self.MESSAGE_TEMPLATE % message)
-        return expr
+        return self.conditional_expression or None
 
     def set_condition(self, expr):
         """Set the conditional expression for this prerequisite.
@@ -139,11 +149,13 @@ class Prerequisite(object):
                 simpler = ConditionalSimplifier(
                     expr, [self.MESSAGE_TEMPLATE % m for m in drop_these])
                 expr = simpler.get_cleaned()
-            # Make a Python expression so we can eval() the logic.
-            for message in self.satisfied:
-                expr = expr.replace(self.MESSAGE_TEMPLATE % message,
-                                    self.SATISFIED_TEMPLATE % message)
             self.conditional_expression = expr
+            # Make a positional Python expression, compiled on first use.
+            self._conditional_messages = tuple(self.satisfied)
+            for ind, message in enumerate(self._conditional_messages):
+                expr = expr.replace(self.MESSAGE_TEMPLATE % message,
+                                    self.SATISFIED_TEMPLATE % ind)
+            self._conditional_shape = sys.intern(expr)
 
     def is_satisfied(self):
         """Return True if prerequisite is satisfied.
@@ -159,7 +171,7 @@ class Prerequisite(object):
                 # No prerequisites left after pre-initial simplification.
                 return True
             if self.conditional_expression:
-                # Trigger expression with at least one '|': use eval.
+                # Trigger expression with at least one '|': evaluate it.
                 self._all_satisfied = self._conditional_is_satisfied()
             else:
                 self._all_satisfied = all(self.satisfied.values())
@@ -168,19 +180,32 @@ class Prerequisite(object):
     def _conditional_is_satisfied(self):
         """Evaluate the prerequisite's condition expression.
 
+        The expression is compiled once, on first use, and shared by all
+        prerequisites with the same positional expression.
+
         Does not cache the result.
 
         """
         try:
-            res = eval(self.conditional_expression)
-        except (SyntaxError, ValueError) as exc:
-            err_msg = str(exc)
-            if str(exc).find("unexpected EOF") != -1:
-                err_msg += (
-                    " (could be unmatched parentheses in the graph string?)")
-            raise TriggerExpressionError(
-                '"%s":\n%s' % (self.get_raw_conditional_expression(), err_msg))
-        return res
+            func = _COMPILED_CONDITIONS[self._conditional_shape]
+        except KeyError:
+            try:
+                func = eval(
+                    'lambda s: %s' % self._conditional_shape,
+                    {'__builtins__': {}})
+            except (SyntaxError, ValueError) as exc:
+                err_msg = str(exc)
+                if str(exc).find("unexpected EOF") != -1:
+                    err_msg += (
+                        " (could be unmatched parentheses in the graph"
+                        " string?)")
+                raise TriggerExpressionError(
+                    '"%s":\n%s' % (
+                        self.get_raw_conditional_expression(), err_msg))
+            _COMPILED_CONDITIONS[self._conditional_shape] = func
+        return func([
+            bool(self.satisfied[message])
+            for message in self._conditional_messages])
 
     def satisfy_me(self, all_task_outputs):
         """Evaluate pre-requisite against known outputs.
@@ -191,6 +216,7 @@ class Prerequisite(object):
         relevant_messages = all_task_outputs & set(self.satisfied)
         for message in relevant_messages:
             self.satisfied[message] = self.DEP_STATE_SATISFIED
+        if relevant_messages:
             if self.conditional_expression is None:
                 self._all_satisfied = all(self.satisfied.values())
             else:
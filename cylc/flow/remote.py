@@ -24,9 +24,10 @@ import signal
 #   Consider possible security implications associated with Popen module.
 # REASON IGNORED:
 #   Subprocess is needed, but we use it with security in mind.
-from subprocess import Popen, PIPE, DEVNULL
+from subprocess import Popen, PIPE, DEVNULL, TimeoutExpired
 import sys
-from time import sleep
+from tempfile import TemporaryFile
+from time import sleep, time
 
 from cylc.flow import LOG
 from cylc.flow.cfgspec.glbl_cfg import glbl_cfg
@@ -35,6 +36,11 @@ from cylc.flow.hostuserutil import is_remote
 from cylc.flow import __version__ as CYLC_VERSION
 
 
+# Directory of the SSH control sockets of the suite server program, passed to
+# its child processes in the environment.
+SSH_CONTROL_DIR_ENV = 'CYLC_SSH_CONTROL_DIR'
+
+
 def get_proc_ancestors():
     """Return list of parent PIDs back to init."""
     pid = os.getpid()
@@ -126,6 +132,35 @@ def run_cmd(command, stdin=None, capture_process=False, capture_status=False,
             return True
 
 
+def get_user_at_host(user=None, host=None):
+    """Return "[user@]host" for the ssh command line."""
+    user_at_host = ''
+    if user:
+        user_at_host = user + '@'
+    if host:
+        user_at_host += host
+    else:
+        user_at_host += 'localhost'
+    return user_at_host
+
+
+def get_ssh_control_opts(user=None, host=None):
+    """Return ssh options to connect via an SSH control master.
+
+    Return an empty list unless "ssh control master" is set for the host and
+    the suite server program has a directory for its control sockets (see
+    SSHControlMaster). Commands never start a control master of their own, and
+    connect directly to the host if the control master is not running.
+    """
+    ctrl_dir = os.getenv(SSH_CONTROL_DIR_ENV)
+    if not ctrl_dir or not glbl_cfg().get_host_item(
+            'ssh control master', host, user):
+        return []
+    return [
+        '-oControlMaster=no',
+        '-oControlPath=%s' % os.path.join(ctrl_dir, '%C')]
+
+
 def construct_ssh_cmd(raw_cmd, user=None, host=None, forward_x11=False,
                       stdin=False, ssh_login_shell=None, ssh_cylc=None,
                       set_UTC=False, allow_flag_opts=False):
@@ -154,20 +189,14 @@ def construct_ssh_cmd(raw_cmd, user=None, host=None, forward_x11=False,
         necessary to directly execute the bare command on a given host via ssh.
     """
     command = shlex.split(glbl_cfg().get_host_item('ssh command', host, user))
+    command += get_ssh_control_opts(user, host)
 
     if forward_x11:
         command.append('-Y')
     if stdin is None:
         command.append('-n')
 
-    user_at_host = ''
-    if user:
-        user_at_host = user + '@'
-    if host:
-        user_at_host += host
-    else:
-        user_at_host += 'localhost'
-    command.append(user_at_host)
+    command.append(get_user_at_host(user, host))
 
     # Pass CYLC_VERSION and optionally, CYLC_CONF_PATH & CYLC_UTC through.
     command += ['env', quote(r'CYLC_VERSION=%s' % CYLC_VERSION)]
@@ -336,3 +365,93 @@ class RemoteRunner(object):
             return command
         else:
             return run_cmd(command)
+
+
+class SSHControlMaster(object):
+    """An SSH control master to a remote [user@]host.
+
+    The control master is a long-lived "ssh -N" process owned by the suite
+    server program. Commands to the host built by "construct_ssh_cmd" open
+    their sessions over its connection, which saves the cost of setting up a
+    new SSH connection for each command.
+
+    Attributes:
+        .host (str):
+            Remote host name.
+        .user (str):
+            Remote user name, None for the suite owner.
+        .ctrl_dir (str):
+            Directory of the control socket.
+        .proc (subprocess.Popen):
+            The control master process.
+        .start_time (float):
+            Time when the control master was (re)started.
+    """
+
+    def __init__(self, host, user, ctrl_dir):
+        self.host = host
+        self.user = user
+        self.ctrl_dir = ctrl_dir
+        self.proc = None
+        self.start_time = None
+        self.errhandle = None
+
+    def _get_ssh_cmd(self):
+        """Return the ssh command with the control path option."""
+        return shlex.split(glbl_cfg().get_host_item(
+            'ssh command', self.host, self.user)) + [
+            '-oControlPath=%s' % os.path.join(self.ctrl_dir, '%C')]
+
+    def get_cmd(self):
+        """Return the command to launch the control master."""
+        return self._get_ssh_cmd() + [
+            '-N', '-oControlMaster=yes', '-oControlPersist=no',
+            get_user_at_host(self.user, self.host)]
+
+    def get_check_cmd(self):
+        """Return the command to check that the control master is running."""
+        return self._get_ssh_cmd() + [
+            '-O', 'check', get_user_at_host(self.user, self.host)]
+
+    def is_alive(self):
+        """Return True if the control master process is running."""
+        return self.proc is not None and self.proc.poll() is None
+
+    def get_err(self):
+        """Return the STDERR of the control master process so far."""
+        if self.errhandle is None:
+            return ''
+        self.errhandle.seek(0)
+        return self.errhandle.read().decode(errors='replace')
+
+    def start(self):
+        """Launch the control master process.
+
+        Raise OSError if the command cannot be launched.
+        """
+        self.stop()
+        self.errhandle = TemporaryFile()
+        self.start_time = time()
+        self.proc = Popen(  # nosec
+            self.get_cmd(), stdin=DEVNULL, stdout=DEVNULL,
+            stderr=self.errhandle,
+            # Execute as a process group leader, so it is not killed by a
+            # terminal interrupt of the suite server program.
+            preexec_fn=os.setpgrp)
+
+    def stop(self, timeout=5.0):
+        """Terminate the control master process, and wait for it to exit."""
+        if self.proc is not None:
+            if self.proc.poll() is None:
+                try:
+                    self.proc.terminate()
+                    self.proc.wait(timeout)
+                except OSError:
+                    pass
+                except TimeoutExpired:
+                    self.proc.kill()
+                    self.proc.wait()
+            self.proc = None
+        if self.errhandle is not None:
+            self.errhandle.close()
+            self.errhandle = None
@@ -15,8 +15,10 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Provide data access object for the suite runtime database."""
 
+from queue import Empty, Queue
 import re
 import sqlite3
+from threading import Thread
 import traceback
 
 from cylc.flow import LOG
@@ -164,12 +166,131 @@ class CylcSuiteDAOTable(object):
         self.update_queues[stmt].append(stmt_args)
 
 
+class CylcSuiteDAOWriter(Thread):
+    """Execute statements for a CylcSuiteDAO in a background thread.
+
+    The thread holds a persistent connection to the database, in WAL journal
+    mode for the private database. Batches of statements queued while the
+    thread is busy are executed in a single transaction, so that the cost of
+    each commit is shared. The queue is bounded, so the main loop waits if
+    the thread falls behind.
+    """
+
+    # Seconds to wait before retrying failed writes to the public database.
+    RETRY_DELAY = 1.0
+
+    def __init__(self, dao, max_queue_size):
+        Thread.__init__(self, name='db-writer', daemon=True)
+        self.dao = dao
+        self.queue = Queue(max_queue_size)
+        self.conn = None
+        self.conn_timeout = dao.CONN_TIMEOUT
+        # Error writing to the private database, to re-raise in main thread.
+        self.exception = None
+
+    def put(self, stmts):
+        """Queue a list of (stmt, stmt_args_list) to execute.
+
+        Wait if the queue is full.
+        """
+        self._raise_exception()
+        self.queue.put(stmts)
+
+    def flush(self):
+        """Wait until all queued statements are executed (or failed)."""
+        self.queue.join()
+        self._raise_exception()
+
+    def stop(self):
+        """Execute outstanding statements, and stop the thread."""
+        self.queue.put(None)
+        self.join()
+
+    def _raise_exception(self):
+        """Raise any error from writing to the private database."""
+        if self.exception is not None:
+            exc, self.exception = self.exception, None
+            raise exc
+
+    def run(self):
+        """Execute queued statements until stopped."""
+        pending = []
+        is_stopping = False
+        while not is_stopping:
+            items = []
+            try:
+                items.append(self.queue.get(
+                    timeout=self.RETRY_DELAY if pending else None))
+                while True:
+                    items.append(self.queue.get_nowait())
+            except Empty:
+                pass
+            for item in items:
+                if item is None:
+                    is_stopping = True
+                else:
+                    pending.extend(item)
+            if pending and (self._execute(pending) or is_stopping):
+                pending = []
+            for _ in items:
+                self.queue.task_done()
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def _execute(self, stmts):
+        """Execute stmts in a transaction.
+
+        Return False if the public database could not be written to, so the
+        statements should be retried, else True.
+        """
+        try:
+            if self.conn is None:
+                self.conn = sqlite3.connect(
+                    self.dao.db_file_name, self.conn_timeout)
+                if not self.dao.is_public:
+                    self.conn.execute("PRAGMA journal_mode=WAL")
+                    # Only sync to disk on WAL checkpoints.
+                    self.conn.execute("PRAGMA synchronous=NORMAL")
+            for stmt, stmt_args_list in stmts:
+                self.conn.executemany(stmt, stmt_args_list)
+            self.conn.commit()
+        except sqlite3.Error as exc:
+            if not self.dao.is_public:
+                self.exception = exc
+                return True
+            if cylc.flow.flags.debug:
+                traceback.print_exc()
+            self.dao.n_tries += 1
+            LOG.warning(
+                "%(file)s: write attempt (%(attempt)d) did not complete\n" % {
+                    "file": self.dao.db_file_name,
+                    "attempt": self.dao.n_tries})
+            if self.conn is not None:
+                try:
+                    self.conn.rollback()
+                    self.conn.close()
+                except sqlite3.Error:
+                    pass
+                self.conn = None
+            return False
+        if self.dao.n_tries:
+            LOG.warning(
+                "%(file)s: recovered after (%(attempt)d) attempt(s)\n" % {
+                    "file": self.dao.db_file_name,
+                    "attempt": self.dao.n_tries})
+            self.dao.n_tries = 0
+        return True
+
+
 class CylcSuiteDAO(object):
     """Data access object for the suite runtime database."""
 
     CONN_TIMEOUT = 0.2
+    RECOVERY_CONN_TIMEOUT = 10.0
     DB_FILE_BASE_NAME = "db"
     MAX_TRIES = 100
+    MAX_WRITER_QUEUE_SIZE = 100
     CHECKPOINT_LATEST_ID = 0
     CHECKPOINT_LATEST_EVENT = "latest"
     TABLE_BROADCAST_EVENTS = "broadcast_events"
@@ -325,6 +446,9 @@ class CylcSuiteDAO(object):
         self.is_public = is_public
         self.conn = None
         self.n_tries = 0
+        self.writer = None
+        # Statements not yet written to the public database, in order.
+        self.pending_stmts = []
 
         self.tables = {}
         for name, attrs in sorted(self.TABLES_ATTRS.items()):
@@ -365,8 +489,26 @@ class CylcSuiteDAO(object):
         """
         self.tables[table_name].add_update_item(set_args, where_args)
 
+    def start_writer(self):
+        """Execute queued items in a background thread from now on."""
+        if self.writer is None:
+            self.writer = CylcSuiteDAOWriter(self, self.MAX_WRITER_QUEUE_SIZE)
+            self.writer.start()
+
+    def flush(self):
+        """Wait for queued items to be written by the background thread."""
+        if self.writer is not None:
+            self.writer.flush()
+
     def close(self):
-        """Explicitly close the connection."""
+        """Explicitly close the connection.
+
+        Stop the background writer thread, if any, after it has executed
+        queued items.
+        """
+        if self.writer is not None:
+            writer, self.writer = self.writer, None
+            writer.stop()
         if self.conn is not None:
             try:
                 self.conn.close()
@@ -374,8 +516,48 @@ class CylcSuiteDAO(object):
                 pass
             self.conn = None
 
+    def retry_queued_items(self, timeout=RECOVERY_CONN_TIMEOUT):
+        """Retry writing queued items, waiting up to timeout for locks.
+
+        The queued items are the statements not yet written since the last
+        successful commit, so the cost of this scales with the lag of the
+        database, not its size. They are written in the order they were
+        queued, so the result is the same as if no write had failed.
+
+        Return True on success.
+        """
+        writer = self.writer
+        if writer is not None:
+            # Let the writer thread make a last attempt before it stops.
+            self.writer = None
+            writer.conn_timeout = timeout
+            writer.stop()
+            self.start_writer()
+        else:
+            self.close()
+            try:
+                self.conn = sqlite3.connect(self.db_file_name, timeout)
+            except sqlite3.Error:
+                return False
+            self.execute_queued_items()
+        return self.n_tries == 0
+
+    def discard_queued_items(self):
+        """Discard items not yet written, e.g. after replacing the database.
+
+        Stop the background writer thread, if any, after its last attempt.
+        """
+        self.close()
+        self._pop_queued_stmts()
+        self.pending_stmts = []
+
     def connect(self):
-        """Connect to the database."""
+        """Connect to the database.
+
+        With a background writer thread, wait for queued items to be written
+        first, so reads see them.
+        """
+        self.flush()
         if self.conn is None:
             self.conn = sqlite3.connect(self.db_file_name, self.CONN_TIMEOUT)
         return self.conn
@@ -394,24 +576,48 @@ class CylcSuiteDAO(object):
         if cur is not None:
             self.conn.commit()
 
+    def _pop_queued_stmts(self):
+        """Return queued items as a list of (stmt, stmt_args_list).
+
+        The queues are cleared. The statements of each table are in the
+        order: DELETE, INSERT, UPDATE.
+        """
+        stmts = []
+        for table in self.tables.values():
+            # DELETE statements may have varying number of WHERE args so we
+            # can only executemany for each identical template statement.
+            stmts.extend(table.delete_queues.items())
+            # INSERT statements are uniform for each table, so all INSERT
+            # statements can be executed using a single "executemany" call.
+            if table.insert_queue:
+                stmts.append(
+                    (table.get_insert_stmt(), list(table.insert_queue)))
+            # UPDATE statements can have varying number of SET and WHERE
+            # args so we can only executemany for each identical template
+            # statement.
+            stmts.extend(table.update_queues.items())
+            table.delete_queues.clear()
+            table.insert_queue.clear()
+            table.update_queues.clear()
+        return stmts
+
     def execute_queued_items(self):
-        """Execute queued items for each table."""
+        """Execute queued items for each table.
+
+        With a background writer thread, hand the items over to the thread.
+
+        If a write to the public database fails, its statements are kept, and
+        retried before those queued later, so they are written in order.
+        """
+        stmts = self._pop_queued_stmts()
+        if self.writer is not None:
+            if stmts:
+                self.writer.put(stmts)
+            return
+        self.pending_stmts.extend(stmts)
         try:
-            for table in self.tables.values():
-                # DELETE statements may have varying number of WHERE args so we
-                # can only executemany for each identical template statement.
-                for stmt, stmt_args_list in table.delete_queues.items():
-                    self._execute_stmt(stmt, stmt_args_list)
-                # INSERT statements are uniform for each table, so all INSERT
-                # statements can be executed using a single "executemany" call.
-                if table.insert_queue:
-                    self._execute_stmt(
-                        table.get_insert_stmt(), table.insert_queue)
-                # UPDATE statements can have varying number of SET and WHERE
-                # args so we can only executemany for each identical template
-                # statement.
-                for stmt, stmt_args_list in table.update_queues.items():
-                    self._execute_stmt(stmt, stmt_args_list)
+            for stmt, stmt_args_list in self.pending_stmts:
+                self._execute_stmt(stmt, stmt_args_list)
             # Connection should only be opened if we have executed something.
             if self.conn is None:
                 return
@@ -430,11 +636,7 @@ class CylcSuiteDAO(object):
                     pass
             return
         else:
-            # Clear the queues
-            for table in self.tables.values():
-                table.delete_queues.clear()
-                table.insert_queue.clear()
-                table.update_queues.clear()
+            self.pending_stmts = []
             # Report public database retry recovery if necessary
             if self.n_tries:
                 LOG.warning(
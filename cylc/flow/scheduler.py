@@ -21,7 +21,7 @@ from itertools import zip_longest
 import logging
 import os
 from shlex import quote
-from queue import Empty, Queue
+from queue import Empty
 from shutil import copytree, rmtree
 from subprocess import Popen, PIPE, DEVNULL
 import sys
@@ -36,6 +36,7 @@ from metomi.isodatetime.parsers import TimePointParser
 
 from cylc.flow import LOG
 from cylc.flow.broadcast_mgr import BroadcastMgr
+from cylc.flow.cache import get_cache_stats
 from cylc.flow.cfgspec.glbl_cfg import glbl_cfg
 from cylc.flow.config import SuiteConfig
 from cylc.flow.cycling.loader import get_point, standardise_point_string
@@ -54,6 +55,7 @@ from cylc.flow.loggingutil import (
     TimestampRotatingFileHandler,
     ReferenceLogFileHandler
 )
+from cylc.flow.main_loop_wakeup import MainLoopWakeup, WakeupQueue
 from cylc.flow.network import API
 from cylc.flow.network.server import SuiteRuntimeServer
 from cylc.flow.network.publisher import WorkflowPublisher
@@ -130,6 +132,10 @@ class Scheduler(object):
     EVENT_INACTIVITY_TIMEOUT = SuiteEventHandler.EVENT_INACTIVITY_TIMEOUT
     EVENT_STALLED = SuiteEventHandler.EVENT_STALLED
 
+    # Main loop modes
+    MAIN_LOOP_MODE_POLLING = 'polling'
+    MAIN_LOOP_MODE_EVENT = 'event'
+
     # Intervals in seconds
     INTERVAL_MAIN_LOOP = 1.0
     INTERVAL_MAIN_LOOP_QUICK = 0.5
@@ -206,6 +212,8 @@ class Scheduler(object):
         self.command_queue = None
         self.message_queue = None
         self.ext_trigger_queue = None
+        self.main_loop_wakeup = None
+        self.main_loop_mode = self.MAIN_LOOP_MODE_POLLING
         self.data_store_mgr = None
         self.job_pool = None
 
@@ -234,6 +242,9 @@ class Scheduler(object):
 
         # Last 10 durations (in seconds) of the main loop
         self.main_loop_intervals = deque(maxlen=10)
+        # Arrival time of the oldest task message processed since the last
+        # task processing, for profiling message to job submit latency.
+        self.time_task_messages = None
 
         self.can_auto_stop = True
         self.previous_profile_point = 0
@@ -289,7 +300,8 @@ class Scheduler(object):
                 self, context=self.zmq_context, barrier=barrier)
             self.server.start(port_range[0], port_range[-1])
             self.publisher = WorkflowPublisher(
-                self.suite, context=self.zmq_context, barrier=barrier)
+                self.suite, context=self.zmq_context, barrier=barrier,
+                data_store_mgr=self.data_store_mgr)
             self.publisher.start(port_range[0], port_range[-1])
             # wait for threads to setup socket ports before continuing
             barrier.wait()
@@ -395,9 +407,10 @@ see `COPYING' in the Cylc source distribution.
         # Start up essential services
         self.proc_pool = SubProcPool()
         self.state_summary_mgr = StateSummaryMgr()
-        self.command_queue = Queue()
-        self.message_queue = Queue()
-        self.ext_trigger_queue = Queue()
+        self.main_loop_wakeup = MainLoopWakeup()
+        self.command_queue = WakeupQueue(self.main_loop_wakeup)
+        self.message_queue = WakeupQueue(self.main_loop_wakeup)
+        self.ext_trigger_queue = WakeupQueue(self.main_loop_wakeup)
         self.suite_event_handler = SuiteEventHandler(self.proc_pool)
         self.job_pool = JobPool(self.suite, self.owner)
         self.task_events_mgr = TaskEventsManager(
@@ -452,7 +465,11 @@ see `COPYING' in the Cylc source distribution.
         self.load_suiterc()
         self.profiler.log_memory("scheduler.py: after load_suiterc")
 
-        self.suite_db_mgr.on_suite_start(self.is_restart)
+        self.suite_db_mgr.on_suite_start(
+            self.is_restart,
+            self._get_cylc_conf(
+                'database write mode',
+                self.suite_db_mgr.WRITE_MODE_MAIN_LOOP))
 
         reqmode = self.config.cfg['cylc']['required run mode']
         if reqmode and not self.config.run_mode(reqmode):
@@ -612,6 +629,8 @@ see `COPYING' in the Cylc source distribution.
 
     def process_queued_task_messages(self):
         """Handle incoming task messages for each task proxy."""
+        if self.time_task_messages is None and self.message_queue.qsize():
+            self.time_task_messages = self.message_queue.time_put
         messages = {}
         while self.message_queue.qsize():
             try:
@@ -687,6 +706,7 @@ see `COPYING' in the Cylc source distribution.
                 self.is_updated = True
                 if name in self.PROC_CMDS:
                     self.task_events_mgr.pflag = True
+                    self.pool.set_ready_check_all()
             self.command_queue.task_done()
         LOG.info(log_msg)
 
@@ -727,6 +747,11 @@ see `COPYING' in the Cylc source distribution.
         return get_task_job_log(
             self.suite, point, name, suffix=JOB_LOG_JOB)
 
+    @staticmethod
+    def info_get_cache_stats():
+        """Return the statistics of caches (e.g. of cycling objects)."""
+        return get_cache_stats()
+
     def info_get_suite_info(self):
         """Return a dict containing the suite title and description."""
         return self.config.cfg['meta']
@@ -1289,10 +1314,16 @@ see `COPYING' in the Cylc source distribution.
         if self._get_events_conf(self.EVENT_INACTIVITY_TIMEOUT):
             self.set_suite_inactivity_timer()
         self.pool.match_dependencies()
+        time_task_messages, self.time_task_messages = (
+            self.time_task_messages, None)
         if self.stop_mode is None and self.auto_restart_time is None:
             itasks = self.pool.get_ready_tasks()
             if itasks:
                 self.is_updated = True
+                if self.options.profile_mode and time_task_messages:
+                    self._update_profile_info(
+                        "task message to job submit latency (s)",
+                        time() - time_task_messages, amount_format="%.3f")
             for itask in self.task_job_mgr.submit_task_jobs(
                 self.suite, itasks, self.config.run_mode('simulation')
             ):
@@ -1307,6 +1338,7 @@ see `COPYING' in the Cylc source distribution.
                 self.is_updated = True
 
         self.broadcast_mgr.expire_broadcast(self.pool.get_min_point())
+        self.xtrigger_mgr.collate(self.pool.get_tasks())
         self.xtrigger_mgr.housekeep()
         self.suite_db_mgr.put_xtriggers(self.xtrigger_mgr.sat_xtrig)
         LOG.debug("END TASK PROCESSING (took %s seconds)" % (time() - time0))
@@ -1628,6 +1660,12 @@ see `COPYING' in the Cylc source distribution.
             self.previous_profile_point = now
             self.profiler.log_memory("scheduler.py: loop #%d: %s" % (
                 self.count, get_current_time_string()))
+            for name, stats in sorted(get_cache_stats().items()):
+                LOG.info(
+                    "PROFILE: cache %s: size=%d hits=%d misses=%d"
+                    " evictions=%d",
+                    name, stats['size'], stats['hits'], stats['misses'],
+                    stats['evictions'])
         self.count += 1
 
     def run(self):
@@ -1635,6 +1673,15 @@ see `COPYING' in the Cylc source distribution.
         self.initialise_scheduler()
         self.data_store_mgr.initiate_data_model()
         self.publisher.publish(self.data_store_mgr.get_publish_deltas())
+        self.main_loop_mode = self._get_cylc_conf(
+            'main loop mode', self.MAIN_LOOP_MODE_POLLING)
+        if self.main_loop_mode == self.MAIN_LOOP_MODE_EVENT:
+            LOG.info('Main loop mode: %s', self.main_loop_mode)
+            self.main_loop_wakeup.install_sigchld()
+            # Wake up on output from commands in the process pool.
+            proc_pool_fileno = self.proc_pool.fileno()
+            if proc_pool_fileno is not None:
+                self.main_loop_wakeup.register(proc_pool_fileno)
         while True:  # MAIN LOOP
             tinit = time()
             has_reloaded = False
@@ -1676,6 +1723,9 @@ see `COPYING' in the Cylc source distribution.
             # of the private database into it.
             self.database_health_check()
 
+            # Restart SSH control masters to job hosts that have failed
+            self.task_job_mgr.task_remote_mgr.check_ssh_masters()
+
             # Shutdown suite if timeouts have occurred
             self.timeout_check()
 
@@ -1688,6 +1738,11 @@ see `COPYING' in the Cylc source distribution.
             if self.options.profile_mode:
                 self.update_profiler_logs(tinit)
 
+            if self.main_loop_mode == self.MAIN_LOOP_MODE_EVENT:
+                self.wait_for_events(tinit)
+                self.main_loop_intervals.append(time() - tinit)
+                continue
+
             # Sleep a bit for things to catch up.
             # Quick sleep if there are items pending in process pool.
             # (Should probably use quick sleep logic for other queues?)
@@ -1706,6 +1761,33 @@ see `COPYING' in the Cylc source distribution.
             self.main_loop_intervals.append(time() - tinit)
             # END MAIN LOOP
 
+    def wait_for_events(self, tinit):
+        """Wait for something to happen, in the "event" main loop mode.
+
+        Return immediately if there is something to do already, else wait
+        until woken up by a task message, command, external trigger or child
+        process exit, or until the (quick) main loop interval since tinit has
+        elapsed, to do the time-based checks.
+        """
+        # Clear before checking, so nothing is missed in between.
+        self.main_loop_wakeup.clear()
+        if (
+                self.task_events_mgr.pflag
+                or self.xtrigger_mgr.pflag
+                or self.message_queue.qsize()
+                or self.command_queue.qsize()
+                or self.ext_trigger_queue.qsize()
+                or self.proc_pool.is_process_due()
+        ):
+            # Still yield control to other threads by sleep(0.0)
+            sleep(0.0)
+            return
+        if self.proc_pool.is_not_done():
+            interval = self.INTERVAL_MAIN_LOOP_QUICK
+        else:
+            interval = self.INTERVAL_MAIN_LOOP
+        self.main_loop_wakeup.wait(interval - (time() - tinit))
+
     def update_data_structure(self):
         """Update DB, UIS, Summary data elements"""
         updated_tasks = [
@@ -1786,22 +1868,15 @@ see `COPYING' in the Cylc source distribution.
                 self.set_suite_timer()
 
     def should_process_tasks(self):
-        """Return True if waiting tasks are ready."""
+        """Return True if waiting tasks are ready.
+
+        Only tasks that have changed, or are due a time-based check (retry
+        delay, clock trigger, expiry, xtrigger), are examined - see
+        TaskPool.get_ready_check_tasks.
+        """
         # do we need to do a pass through the main task processing loop?
         process = False
 
-        # New-style xtriggers.
-        self.xtrigger_mgr.check_xtriggers(self.pool.get_tasks())
-        if self.xtrigger_mgr.pflag:
-            process = True
-            self.xtrigger_mgr.pflag = False  # reset
-        # Old-style external triggers.
-        self.broadcast_mgr.add_ext_triggers(self.ext_trigger_queue)
-        for itask in self.pool.get_tasks():
-            if (itask.state.external_triggers and
-                    self.broadcast_mgr.match_ext_trigger(itask)):
-                process = True
-
         if self.task_events_mgr.pflag:
             # This flag is turned on by commands that change task state
             process = True
@@ -1812,10 +1887,26 @@ see `COPYING' in the Cylc source distribution.
             process = True
             self.task_job_mgr.task_remote_mgr.ready = False  # reset
 
-        broadcast_mgr = self.task_events_mgr.broadcast_mgr
-        broadcast_mgr.add_ext_triggers(self.ext_trigger_queue)
+        # Old-style external triggers: new ones may match any task.
+        if not self.ext_trigger_queue.empty():
+            self.broadcast_mgr.add_ext_triggers(self.ext_trigger_queue)
+            self.pool.set_ready_check_all()
+
         now = time()
-        for itask in self.pool.get_tasks():
+        itasks = self.pool.get_ready_check_tasks(
+            now, self.xtrigger_mgr.get_callback_tasks())
+        if self.options.profile_mode:
+            self._update_profile_info(
+                "tasks examined for readiness", self.pool.n_ready_check_tasks)
+
+        # New-style xtriggers.
+        xtrigger_check_times = self.xtrigger_mgr.check_xtriggers(itasks)
+        if self.xtrigger_mgr.pflag:
+            process = True
+            self.xtrigger_mgr.pflag = False  # reset
+
+        broadcast_mgr = self.task_events_mgr.broadcast_mgr
+        for itask in itasks:
             # External trigger matching and task expiry must be done
             # regardless, so they need to be in separate "if ..." blocks.
             if broadcast_mgr.match_ext_trigger(itask):
@@ -1824,6 +1915,11 @@ see `COPYING' in the Cylc source distribution.
                 process = True
             if itask.is_ready(now):
                 process = True
+            else:
+                self.pool.set_ready_check_time(
+                    itask, itask.get_ready_check_time(now))
+            self.pool.set_ready_check_time(
+                itask, xtrigger_check_times.get(itask.identity))
         if (
             self.config.run_mode('simulation') and
             self.pool.sim_time_check(self.message_queue)
@@ -1886,6 +1982,9 @@ see `COPYING' in the Cylc source distribution.
         except Exception as exc:
             LOG.exception(exc)
 
+        if self.main_loop_wakeup:
+            self.main_loop_wakeup.close()
+
         # The getattr() calls and if tests below are used in case the
         # suite is not fully configured before the shutdown is called.
         if getattr(self, "config", None) is not None:
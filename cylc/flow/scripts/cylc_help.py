@@ -288,6 +288,7 @@ task_commands['message'] = ['message', 'task-message']
 task_commands['jobs-kill'] = ['jobs-kill']
 task_commands['jobs-poll'] = ['jobs-poll']
 task_commands['jobs-submit'] = ['jobs-submit']
+task_commands['jobs-submit-agent'] = ['jobs-submit-agent']
 task_commands['remote-init'] = ['remote-init']
 task_commands['remote-tidy'] = ['remote-tidy']
 
@@ -375,6 +376,7 @@ comsum['message'] = 'Report task messages'
 comsum['jobs-kill'] = '(Internal) Kill task jobs'
 comsum['jobs-poll'] = '(Internal) Retrieve status for task jobs'
 comsum['jobs-submit'] = '(Internal) Submit task jobs'
+comsum['jobs-submit-agent'] = '(Internal) Run a job submission agent'
 comsum['remote-init'] = '(Internal) Initialise a task remote'
 comsum['remote-tidy'] = '(Internal) Tidy a task remote'
 
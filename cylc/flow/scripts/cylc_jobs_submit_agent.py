@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""cylc [control] jobs-submit-agent
+
+(This command is for internal use.) Run a job submission agent, which submits
+task jobs as "cylc jobs-submit" does, for requests read from STDIN, until end
+of file. The suite server program keeps an agent running on each job host with
+"job submission agent = True" in the global config, instead of running a new
+"cylc jobs-submit" command for each batch of jobs.
+
+"""
+from cylc.flow.option_parsers import CylcOptionParser as COP
+from cylc.flow.remote import remrun
+from cylc.flow.terminal import cli_function
+
+
+def get_option_parser():
+    return COP(__doc__, argdoc=[])
+
+
+@cli_function(get_option_parser)
+def main_cli(parser, opts):
+    """CLI main."""
+    from cylc.flow.job_submit_agent import run_agent
+
+    run_agent()
+
+
+def main():
+    if not remrun():
+        main_cli()
+
+
+if __name__ == "__main__":
+    main()
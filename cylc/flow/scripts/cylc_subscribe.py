@@ -74,7 +74,9 @@ def get_option_parser():
     parser.add_option(
         "-T", "--topics",
         help="Specify a comma delimited list of subscription topics. "
-        + pb_topics,
+        + pb_topics + " Filter topics, e.g. "
+        "'filter:task_proxies?namespace=foo%2A&state=running;', "
+        "receive only matching elements.",
         action="store", dest="topics", default='workflow')
 
     parser.add_option(
@@ -40,6 +40,8 @@ class StateSummaryMgr(object):
         self.update_time = None
         self.state_count_totals = {}
         self.state_count_cycles = {}
+        self.suite_urls = {}
+        self.suite_urls_config = None
 
     def update(self, schd):
         """Update."""
@@ -127,11 +129,15 @@ class StateSummaryMgr(object):
             schd.config.ns_defn_order)
         global_summary['reloading'] = schd.pool.do_reload
         global_summary['state totals'] = state_count_totals
-        # Extract suite and task URLs from config.
-        global_summary['suite_urls'] = dict(
-            (i, j['meta']['URL'])
-            for (i, j) in schd.config.cfg['runtime'].items())
-        global_summary['suite_urls']['suite'] = schd.config.cfg['meta']['URL']
+        # Extract suite and task URLs from config, once per config (in lazy
+        # runtime mode, each namespace config is resolved on access).
+        if self.suite_urls_config is not schd.config:
+            self.suite_urls = dict(
+                (i, j['meta']['URL'])
+                for (i, j) in schd.config.cfg['runtime'].items())
+            self.suite_urls['suite'] = schd.config.cfg['meta']['URL']
+            self.suite_urls_config = schd.config
+        global_summary['suite_urls'] = self.suite_urls
 
         # Construct a suite status string for use by monitoring clients.
         status, status_msg = get_suite_status(schd)
@@ -39,6 +39,9 @@ class SubProcContext(object):
                     Specify extra environment variables for command.
                 err (str):
                     Default STDERR content.
+                host (str):
+                    Remote host of the command, for the limit of concurrent
+                    commands to the host.
                 out (str):
                     Default STDOUT content.
                 ret_code (int):
@@ -15,20 +15,29 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """Manage queueing and pooling of subprocesses for the suite server program."""
 
+from codecs import getincrementaldecoder
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
 import json
+import multiprocessing
 import os
-import select
+import re
+import selectors
 from signal import SIGKILL
 import sys
 from tempfile import SpooledTemporaryFile
 from threading import RLock
 from time import time
 from subprocess import DEVNULL  # nosec
+import traceback
 
 from cylc.flow import LOG
 from cylc.flow.cfgspec.glbl_cfg import glbl_cfg
 from cylc.flow.cylc_subproc import procopen
+from cylc.flow.job_submit_agent import JobSubmitAgent
+from cylc.flow.subprocctx import SubFuncContext
 from cylc.flow.wallclock import get_current_time_string
 
 _XTRIG_FUNCS = {}
@@ -88,6 +97,23 @@ def run_function(func_name, json_args, json_kwargs, src_dir):
     sys.stdout.write(json.dumps(res))
 
 
+def run_function_in_worker(func_name, json_args, json_kwargs, src_dir):
+    """Run a Python function in a function worker process of the pool.
+
+    As run_function, but return the function return value as a JSON string
+    and any function stdout/stderr, instead of writing them out. Functions
+    and their modules stay imported in the worker between calls.
+
+    """
+    func_args = json.loads(json_args)
+    func_kwargs = json.loads(json_kwargs)
+    func = get_func(func_name, src_dir)
+    err = StringIO()
+    with redirect_stdout(err), redirect_stderr(err):
+        res = func(*func_args, **func_kwargs)
+    return json.dumps(res), err.getvalue()
+
+
 class SubProcPool(object):
     """Manage queueing and pooling of subprocesses.
 
@@ -106,6 +132,39 @@ class SubProcPool(object):
     SubProcContext object as they are read. STDIN can also be specified for the
     command. This is currently fed into the command using a temporary file.
 
+    The STDOUT and STDERR pipes of running commands are registered with a
+    selector, so only the pipes that are ready are read. A command is only
+    polled for exit once both of its pipes reach end of file, i.e. the
+    command has (most likely) exited. In the "event" main loop mode, the main
+    loop is woken up by the exit of child processes (SIGCHLD) and by pipes
+    becoming ready, via the file descriptor of the selector (if supported).
+
+    The number of concurrent commands is limited by the "process pool size"
+    and, for each type of command (see SubProcPool.get_cmd_type), by the
+    "process pool limits" global settings. Queued commands of a type at its
+    limit do not hold up queued commands of other types.
+
+    If "process pool function workers" is set, Python functions (in a
+    cylc.flow.subprocctx.SubFuncContext, i.e. xtrigger functions) are run in
+    that number of persistent worker processes, instead of in a new
+    `cylc function-run` subprocess for each call. A function call that times
+    out kills all the workers, so calls still running in them fail, and new
+    workers are started for further calls.
+
+    If "job submission agent" is set for a job host, "cylc jobs-submit"
+    commands for the host are sent as requests to a persistent
+    `cylc jobs-submit-agent` process for the host (see
+    cylc.flow.job_submit_agent), instead of being run as new subprocesses.
+    The agent serves one request at a time, does not take up a place in the
+    pool, and is killed on a timeout. Requests are written to the agent via
+    the selector too, so a large request does not block the main loop. If an
+    agent cannot be started, or exits before serving any request, commands
+    for the host are run as normal.
+
+    Commands with a "host" in their context are also limited by the "max
+    concurrent commands" setting of the host, so a remote host (or its SSH
+    control master) is not flooded with sessions.
+
     Note: For a cylc command that uses
     `cylc.flow.option_parsers.CylcOptionParser`, the default logging handler
     writes to the STDERR via a StreamHandler. Therefore, log messages will
@@ -116,22 +175,39 @@ class SubProcPool(object):
 
     ERR_SUITE_STOPPING = 'suite stopping, command not run'
     JOBS_SUBMIT = 'jobs-submit'
-    POLLREAD = select.POLLIN | select.POLLPRI
     RET_CODE_SUITE_STOPPING = 999
+    # Numbered command keys, e.g. "event-handler-00" for the first handler.
+    REC_CMD_KEY_NUM = re.compile(r'-\d+$')
+    # Default "MaxSessions" of sshd, i.e. sessions per SSH connection.
+    SSH_MAX_SESSIONS = 10
 
     def __init__(self):
         self.size = glbl_cfg().get(['process pool size'])
         self.proc_pool_timeout = glbl_cfg().get(['process pool timeout'])
+        self.limits = dict(glbl_cfg().get(['process pool limits']))
+        # Number of running commands of each type
+        self.n_runnings_by_type = {}
+        # Number of running commands to each remote host
+        self.n_runnings_by_host = {}
+        # Maximum number of running commands to each remote host
+        self.host_limits = {}
         self.closed = False  # Close queue
         self.stopping = False  # No more job submit if True
         # .stopping may be set by an API command in a different thread
         self.stopping_lock = RLock()
         self.queuings = deque()
         self.runnings = []
-        try:
-            self.pipepoller = select.poll()
-        except AttributeError:  # select.poll not implemented for this OS
-            self.pipepoller = None
+        self.selector = selectors.DefaultSelector()
+        self.func_workers = glbl_cfg().get(['process pool function workers'])
+        self.func_executor = None
+        self.func_queuings = deque()
+        self.func_runnings = []
+        # Self-pipe to wake up on completion of function calls
+        self.func_done_pipe = None
+        # Job submission agents, {(host, user): JobSubmitAgent, ...}
+        self.agents = {}
+        # (host, user) of failed job submission agents
+        self.bad_agents = set()
 
     def close(self):
         """Close pool."""
@@ -145,7 +221,106 @@ class SubProcPool(object):
 
     def is_not_done(self):
         """Return True if queuings or runnings not empty."""
-        return self.queuings or self.runnings
+        return (
+            self.queuings or self.runnings
+            or self.func_queuings or self.func_runnings
+            or any(
+                agent.queuings or agent.running
+                for agent in self.agents.values()))
+
+    def fileno(self):
+        """Return a file descriptor that is readable when pipes are ready.
+
+        Return None if not supported by the selector on this OS.
+        """
+        try:
+            return self.selector.fileno()
+        except AttributeError:
+            return None
+
+    @classmethod
+    def get_cmd_type(cls, cmd_key):
+        """Return the type of command for a cmd_key, for "process pool limits".
+
+        E.g. "jobs-submit", "event-handler", "event-mail",
+        "suite-event-handler", "xtrigger-func".
+        """
+        # Task event handler keys are ((type, event), submit_num), and task
+        # event contexts are named tuples with a ctx_type.
+        while isinstance(cmd_key, tuple):
+            cmd_key = getattr(cmd_key, 'ctx_type', cmd_key[0])
+        return cls.REC_CMD_KEY_NUM.sub('', str(cmd_key))
+
+    def is_process_due(self):
+        """Return True if "process" has something to do now.
+
+        I.e. queued commands can be launched, pipes of running commands are
+        ready to read, or running commands have exited or timed out.
+        """
+        if len(self.runnings) < self.size and any(
+                self._can_run(ctx) for ctx, _, _ in self.queuings):
+            return True
+        if self.func_queuings and len(self.func_runnings) < self.func_workers:
+            return True
+        if any(
+                agent.queuings and agent.running is None
+                for agent in self.agents.values()):
+            return True
+        if (
+                (self.runnings or self.func_runnings or self.agents)
+                and self.selector.select(0.0)):
+            return True
+        now = time()
+        return any(
+            self._is_exited(proc) or now > ctx.timeout
+            for proc, ctx, _, _ in self.runnings
+        ) or any(
+            future.done() or now > ctx.timeout
+            for future, ctx, _, _ in self.func_runnings
+        ) or any(
+            agent.running and now > agent.running[0].timeout
+            for agent in self.agents.values())
+
+    def _can_run(self, ctx):
+        """Return True if the limits of ctx's command type and host are not
+        reached."""
+        host = ctx.cmd_kwargs.get('host')
+        if host is not None:
+            limit = self._get_host_limit(host)
+            if (
+                    limit is not None
+                    and self.n_runnings_by_host.get(host, 0) >= limit):
+                return False
+        if not self.limits:
+            return True
+        cmd_type = self.get_cmd_type(ctx.cmd_key)
+        return (
+            cmd_type not in self.limits
+            or self.n_runnings_by_type.get(cmd_type, 0)
+            < self.limits[cmd_type])
+
+    def _get_host_limit(self, host):
+        """Return the maximum number of running commands to host.
+
+        Return None if there is no limit.
+        """
+        try:
+            return self.host_limits[host]
+        except KeyError:
+            pass
+        limit = glbl_cfg().get_host_item('max concurrent commands', host)
+        if limit is None and glbl_cfg().get_host_item(
+                'ssh control master', host):
+            limit = self.SSH_MAX_SESSIONS
+        self.host_limits[host] = limit
+        return limit
+
+    @staticmethod
+    def _is_exited(proc):
+        """Return True if proc has closed its pipes and exited."""
+        return (
+            proc.stdout.closed and proc.stderr.closed
+            and proc.poll() is not None)
 
     def _is_stopping(self):
         """Return whether .stopping is True or not.
@@ -158,6 +333,14 @@ class SubProcPool(object):
 
     def _proc_exit(self, proc, err_xtra, ctx, callback, callback_args):
         """Get ret_code, out, err of exited command, and call its callback."""
+        for handle in (proc.stdout, proc.stderr):
+            if not handle.closed:
+                self.selector.unregister(handle)
+        cmd_type = self.get_cmd_type(ctx.cmd_key)
+        self.n_runnings_by_type[cmd_type] -= 1
+        host = ctx.cmd_kwargs.get('host')
+        if host is not None:
+            self.n_runnings_by_host[host] -= 1
         ctx.ret_code = proc.wait()
         out, err = (f.decode() for f in proc.communicate())
         if out:
@@ -172,15 +355,19 @@ class SubProcPool(object):
 
     def process(self):
         """Process done child processes and submit more."""
+        # Read from STDOUT/STDERR of running commands where possible.
+        # Otherwise, a full STDOUT or STDERR may stop command from proceeding.
+        self._read_proc_pipes()
         # Handle child processes that are done
         runnings = []
+        now = time()
         for proc, ctx, callback, callback_args in self.runnings:
             # Command completed/exited
-            if proc.poll() is not None:
+            if self._is_exited(proc):
                 self._proc_exit(proc, "", ctx, callback, callback_args)
                 continue
             # Command timed out, kill it
-            if time() > ctx.timeout:
+            if now > ctx.timeout:
                 try:
                     os.killpg(proc.pid, SIGKILL)  # kill process group
                 except OSError:
@@ -191,27 +378,288 @@ class SubProcPool(object):
                         self.proc_pool_timeout)
                 self._proc_exit(proc, err_xtra, ctx, callback, callback_args)
                 continue
-            # Command still running, see if STDOUT/STDERR are readable or not
+            # Command still running
             runnings.append([proc, ctx, callback, callback_args])
-            # Unblock proc's STDOUT/STDERR if necessary. Otherwise, a full
-            # STDOUT or STDERR may stop command from proceeding.
-            self._poll_proc_pipes(proc, ctx)
 
         # Update list of running items
         self.runnings[:] = runnings
+        # Job submission agent timed out, kill it
+        for agent in list(self.agents.values()):
+            if agent.running and now > agent.running[0].timeout:
+                self._agent_exit(
+                    agent,
+                    "\nkilled on timeout (%s)" % self.proc_pool_timeout,
+                    killed=True)
         # Create more child processes, if items in queue and space in pool
         stopping = self._is_stopping()
+        # Commands of types at their limits, to put back in the queue
+        blockeds = []
         while self.queuings and len(self.runnings) < self.size:
             ctx, callback, callback_args = self.queuings.popleft()
-            if stopping and ctx.cmd_key == self.JOBS_SUBMIT:
+            if not self._can_run(ctx):
+                blockeds.append([ctx, callback, callback_args])
+            elif stopping and ctx.cmd_key == self.JOBS_SUBMIT:
                 ctx.err = self.ERR_SUITE_STOPPING
                 ctx.ret_code = self.RET_CODE_SUITE_STOPPING
                 self._run_command_exit(ctx)
+            elif self._use_agent(ctx):
+                self._agent_put(ctx, callback, callback_args)
             else:
                 proc = self._run_command_init(ctx, callback, callback_args)
                 if proc is not None:
                     ctx.timeout = time() + self.proc_pool_timeout
                     self.runnings.append([proc, ctx, callback, callback_args])
+                    cmd_type = self.get_cmd_type(ctx.cmd_key)
+                    self.n_runnings_by_type.setdefault(cmd_type, 0)
+                    self.n_runnings_by_type[cmd_type] += 1
+                    host = ctx.cmd_kwargs.get('host')
+                    if host is not None:
+                        self.n_runnings_by_host.setdefault(host, 0)
+                        self.n_runnings_by_host[host] += 1
+                    for handle, attr in (
+                            (proc.stdout, 'out'), (proc.stderr, 'err')):
+                        self.selector.register(
+                            handle, selectors.EVENT_READ,
+                            (ctx, attr, getincrementaldecoder('utf-8')()))
+        self.queuings.extendleft(reversed(blockeds))
+        if self.agents:
+            self._process_agents()
+        if self.func_workers:
+            self._process_funcs()
+
+    def _use_agent(self, ctx):
+        """Return True if ctx should be run by a job submission agent."""
+        if ctx.cmd_key != self.JOBS_SUBMIT or '--' not in ctx.cmd:
+            return False
+        key = (ctx.cmd_kwargs.get('host'), ctx.cmd_kwargs.get('user'))
+        return key not in self.bad_agents and glbl_cfg().get_host_item(
+            'job submission agent', *key)
+
+    def _agent_put(self, ctx, callback, callback_args):
+        """Queue a "cylc jobs-submit" command for a job submission agent.
+
+        Start the agent if necessary. If the agent cannot be started, put the
+        command back in the pool queue, to run as normal.
+        """
+        key = (ctx.cmd_kwargs.get('host'), ctx.cmd_kwargs.get('user'))
+        agent = self.agents.get(key)
+        if agent is None:
+            agent = JobSubmitAgent(*key)
+            try:
+                agent.start()
+            except OSError as exc:
+                LOG.warning(
+                    '%s: cannot start job submission agent: %s',
+                    ' '.join(agent.get_cmd()), exc)
+                self.bad_agents.add(key)
+                self.queuings.append([ctx, callback, callback_args])
+                return
+            LOG.debug(agent.get_cmd())
+            self.agents[key] = agent
+            for handle in (agent.proc.stdout, agent.proc.stderr):
+                self.selector.register(handle, selectors.EVENT_READ, agent)
+        agent.queuings.append([ctx, callback, callback_args])
+
+    def _process_agents(self):
+        """Send queued requests to idle job submission agents.
+
+        Stop idle agents if the pool is closed.
+        """
+        for agent in list(self.agents.values()):
+            if agent.running is not None:
+                continue
+            if agent.queuings:
+                try:
+                    ctx = agent.send()[0]
+                except (IOError, OSError) as exc:
+                    self._agent_exit(agent, '\n%s' % exc)
+                    continue
+                LOG.debug(ctx.cmd)
+                ctx.timeout = time() + self.proc_pool_timeout
+                if agent.sendbuf:
+                    # Pipe full, write the rest when it is ready.
+                    self.selector.register(
+                        agent.proc.stdin, selectors.EVENT_WRITE, agent)
+            elif self.closed:
+                self._agent_exit(agent, '', killed=True)
+
+    def _read_agent(self, key):
+        """Read some data from STDOUT/ERR of a job submission agent, or
+        write some of the running request to its STDIN.
+
+        Call the callback of the running request if its response is complete.
+        """
+        agent = key.data
+        if key.fileobj is agent.proc.stdin:
+            try:
+                if agent.write():
+                    self.selector.unregister(key.fileobj)
+            except (IOError, OSError) as exc:
+                self._agent_exit(agent, '\n%s' % exc)
+            return
+        try:
+            data = os.read(key.fd, 65536)
+        except OSError:
+            return
+        if not data:
+            self.selector.unregister(key.fileobj)
+            key.fileobj.close()
+            if key.fileobj is agent.proc.stdout:
+                self._agent_exit(agent, '')
+        elif key.fileobj is agent.proc.stderr:
+            agent.add_err(data.decode(errors='replace'))
+        else:
+            try:
+                done = agent.feed(data)
+            except ValueError as exc:
+                self._agent_exit(agent, '\n%s' % exc)
+            else:
+                if done is not None:
+                    self._run_command_exit(*done)
+
+    def _agent_exit(self, agent, err_xtra, killed=False):
+        """Kill a job submission agent, and deal with its requests.
+
+        The running request, if any, fails. Requests not yet sent are put
+        back in the pool queue. If the agent has not served any request (e.g.
+        the command does not exist on the job host), and is not killed
+        deliberately (e.g. on a timeout), the running request is put back in
+        the pool queue too, and commands for the host are run as normal from
+        now on.
+        """
+        key = (agent.host, agent.user)
+        self.agents.pop(key, None)
+        for handle in (
+                agent.proc.stdin, agent.proc.stdout, agent.proc.stderr):
+            try:
+                self.selector.unregister(handle)
+            except (KeyError, ValueError):
+                pass
+        proc = agent.proc
+        for handle in (proc.stdin, proc.stdout, proc.stderr):
+            try:
+                handle.close()
+            except (IOError, OSError):
+                pass
+        try:
+            os.killpg(agent.proc.pid, SIGKILL)
+        except OSError:
+            pass
+        agent.proc.wait()
+        if agent.err:
+            LOG.debug(agent.err)
+        items = list(agent.queuings)
+        agent.queuings.clear()
+        if agent.running is not None:
+            if agent.n_dones or killed:
+                ctx = agent.running[0]
+                ctx.ret_code = 1
+                ctx.err = 'job submission agent exited\n%s%s' % (
+                    agent.err, err_xtra)
+                self._run_command_exit(*agent.running)
+            else:
+                items.insert(0, agent.running)
+            agent.running = None
+        if not agent.n_dones and not killed:
+            LOG.warning(
+                '%s: job submission agent failed, use "cylc jobs-submit"'
+                ' instead:\n%s%s',
+                ' '.join(agent.get_cmd()), agent.err, err_xtra)
+            self.bad_agents.add(key)
+        self.queuings.extendleft(reversed(items))
+
+    def _process_funcs(self):
+        """Process done function calls and submit more to the workers."""
+        func_runnings = []
+        now = time()
+        for future, ctx, callback, callback_args in self.func_runnings:
+            if future.done():
+                self._func_exit(future, "", ctx, callback, callback_args)
+            elif now > ctx.timeout:
+                self._kill_func_workers()
+                self._func_exit(
+                    future,
+                    "\nkilled on timeout (%s)" % self.proc_pool_timeout,
+                    ctx, callback, callback_args)
+            else:
+                func_runnings.append([future, ctx, callback, callback_args])
+        self.func_runnings[:] = func_runnings
+        while (
+                self.func_queuings
+                and len(self.func_runnings) < self.func_workers):
+            ctx, callback, callback_args = self.func_queuings.popleft()
+            if self.func_executor is None:
+                self._start_func_workers()
+            try:
+                future = self.func_executor.submit(
+                    run_function_in_worker, *ctx.cmd[1:])
+            except RuntimeError as exc:
+                # E.g. workers broken (by a timeout kill)
+                ctx.ret_code = 1
+                ctx.err = str(exc)
+                self._run_command_exit(ctx, callback, callback_args)
+                self.func_executor = None
+                continue
+            LOG.debug(ctx.cmd)
+            future.add_done_callback(self._func_done)
+            ctx.timeout = time() + self.proc_pool_timeout
+            self.func_runnings.append([future, ctx, callback, callback_args])
+        if (
+                self.closed and self.func_executor is not None
+                and not self.func_runnings):
+            self.func_executor.shutdown()
+            self.func_executor = None
+
+    def _start_func_workers(self):
+        """Start function worker processes."""
+        if self.func_done_pipe is None:
+            self.func_done_pipe = os.pipe()
+            os.set_blocking(self.func_done_pipe[0], False)
+            os.set_blocking(self.func_done_pipe[1], False)
+            self.selector.register(
+                self.func_done_pipe[0], selectors.EVENT_READ, None)
+        # Do not fork the (multi-threaded) suite server program itself.
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context('forkserver')
+        else:
+            mp_context = multiprocessing.get_context('spawn')
+        self.func_executor = ProcessPoolExecutor(
+            self.func_workers, mp_context=mp_context)
+
+    def _kill_func_workers(self):
+        """Kill the function worker processes, e.g. on a timeout."""
+        executor, self.func_executor = self.func_executor, None
+        if executor is None:
+            return
+        # No public API to kill the workers.
+        for proc in list(getattr(executor, '_processes', {}).values()):
+            proc.kill()
+        executor.shutdown(wait=False)
+
+    def _func_done(self, _):
+        """Wake up on completion of a function call, in any thread."""
+        try:
+            os.write(self.func_done_pipe[1], b'\0')
+        except OSError:
+            # Pipe full (so already woken up)
+            pass
+
+    def _func_exit(self, future, err_xtra, ctx, callback, callback_args):
+        """Get ret_code, out, err of function call, and call its callback."""
+        if future.done() and future.exception() is None:
+            ctx.ret_code = 0
+            ctx.out, err = future.result()
+        else:
+            ctx.ret_code = 1
+            future.cancel()
+            err = ''
+            if future.done() and not future.cancelled():
+                exc = future.exception()
+                err = ''.join(traceback.format_exception(
+                    type(exc), exc, exc.__traceback__))
+        if err + err_xtra:
+            ctx.err = err + err_xtra
+        self._run_command_exit(ctx, callback, callback_args)
 
     def put_command(self, ctx, callback=None, callback_args=None):
         """Queue a new shell command to execute.
@@ -231,6 +679,8 @@ class SubProcPool(object):
             ctx.err = self.ERR_SUITE_STOPPING
             ctx.ret_code = self.RET_CODE_SUITE_STOPPING
             self._run_command_exit(ctx, callback, callback_args)
+        elif self.func_workers and isinstance(ctx, SubFuncContext):
+            self.func_queuings.append([ctx, callback, callback_args])
         else:
             self.queuings.append([ctx, callback, callback_args])
 
@@ -257,59 +707,73 @@ class SubProcPool(object):
         """Drain queue, and kill and process remaining child processes."""
         self.close()
         # Drain queue
-        while self.queuings:
-            ctx = self.queuings.popleft()[0]
-            ctx.err = self.ERR_SUITE_STOPPING
-            ctx.ret_code = self.RET_CODE_SUITE_STOPPING
-            self._run_command_exit(ctx)
+        for queuings in self.queuings, self.func_queuings:
+            while queuings:
+                ctx = queuings.popleft()[0]
+                ctx.err = self.ERR_SUITE_STOPPING
+                ctx.ret_code = self.RET_CODE_SUITE_STOPPING
+                self._run_command_exit(ctx)
         # Kill remaining processes
         for value in self.runnings:
             proc = value[0]
             if proc:
                 os.killpg(proc.pid, SIGKILL)
+        if self.func_runnings:
+            self._kill_func_workers()
+        for agent in list(self.agents.values()):
+            for ctx, _, _ in agent.queuings:
+                ctx.err = self.ERR_SUITE_STOPPING
+                ctx.ret_code = self.RET_CODE_SUITE_STOPPING
+                self._run_command_exit(ctx)
+            agent.queuings.clear()
+            self._agent_exit(
+                agent, '\nkilled on suite stopping', killed=True)
         # Wait for child processes
         self.process()
 
-    def _poll_proc_pipes(self, proc, ctx):
-        """Poll STDOUT/ERR of proc and read some data if possible.
+    def _read_proc_pipes(self):
+        """Read some data from STDOUT/ERR of running commands, if ready.
 
-        This helps to unblock the command by unblocking its pipes.
+        Add results into the command context object's `.out` or `.err`,
+        whichever is relevant. Close and unregister a pipe at end of file.
         """
-        if self.pipepoller is None:
-            return  # select.poll not supported on this OS
-        for handle in [proc.stdout, proc.stderr]:
-            if not handle.closed:
-                self.pipepoller.register(handle.fileno(), self.POLLREAD)
         while True:
-            fileno_list = [
-                fileno
-                for fileno, event in self.pipepoller.poll(0.0)
-                if event & self.POLLREAD]
-            if not fileno_list:
+            events = self.selector.select(0.0)
+            if not events:
                 # Nothing readable
                 break
-            for fileno in fileno_list:
-                # If a file handle is readable, read something from it, add
-                # results into the command context object's `.out` or `.err`,
-                # whichever is relevant. To avoid blocking:
+            for key, _ in events:
+                # To avoid blocking:
                 # 1. Use `os.read` here instead of `file.read` to avoid any
                 #    buffering that may cause the file handle to block.
-                # 2. Call os.read only once after a poll. Poll again before
-                #    another read - otherwise the os.read call may block.
+                # 2. Call os.read only once after a select. Select again
+                #    before another read - otherwise os.read may block.
+                if key.data is None:
+                    # Function call done: drain the self-pipe
+                    try:
+                        os.read(key.fd, 65536)
+                    except OSError:
+                        pass
+                    continue
+                if isinstance(key.data, JobSubmitAgent):
+                    self._read_agent(key)
+                    continue
+                ctx, attr, decoder = key.data
                 try:
-                    data = os.read(fileno, 65536).decode()  # 64K
+                    data = os.read(key.fd, 65536)  # 64K
                 except OSError:
                     continue
-                if fileno == proc.stdout.fileno():
-                    if ctx.out is None:
-                        ctx.out = ''
-                    ctx.out += data
-                elif fileno == proc.stderr.fileno():
-                    if ctx.err is None:
-                        ctx.err = ''
-                    ctx.err += data
-        self.pipepoller.unregister(proc.stdout.fileno())
-        self.pipepoller.unregister(proc.stderr.fileno())
+                if data:
+                    if getattr(ctx, attr) is None:
+                        setattr(ctx, attr, '')
+                    setattr(
+                        ctx, attr, getattr(ctx, attr) + decoder.decode(data))
+                else:
+                    self.selector.unregister(key.fileobj)
+                    key.fileobj.close()
+                    data = decoder.decode(b'', final=True)
+                    if data:
+                        setattr(ctx, attr, (getattr(ctx, attr) or '') + data)
 
     @classmethod
     def _run_command_init(cls, ctx, callback=None, callback_args=None):
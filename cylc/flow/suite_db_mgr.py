@@ -25,7 +25,8 @@ This module provides the logic to:
 
 import json
 import os
-from shutil import copy, rmtree
+from shutil import rmtree
+import sqlite3
 from tempfile import mkstemp
 
 
@@ -56,6 +57,13 @@ class SuiteDatabaseManager(object):
     KEY_STOP_CLOCK_TIME = 'stop_clock_time'
     KEY_STOP_TASK = 'stop_task'
 
+    # Number of pages to copy at a time in copy_pri_to_pub.
+    COPY_PAGES = 1024
+
+    # Write modes: write in the main loop, or in background threads.
+    WRITE_MODE_MAIN_LOOP = 'main loop'
+    WRITE_MODE_THREAD = 'thread'
+
     TABLE_BROADCAST_EVENTS = CylcSuiteDAO.TABLE_BROADCAST_EVENTS
     TABLE_BROADCAST_STATES = CylcSuiteDAO.TABLE_BROADCAST_STATES
     TABLE_CHECKPOINT_ID = CylcSuiteDAO.TABLE_CHECKPOINT_ID
@@ -78,6 +86,7 @@ class SuiteDatabaseManager(object):
             self.pub_path = os.path.join(pub_d, CylcSuiteDAO.DB_FILE_BASE_NAME)
         self.pri_dao = None
         self.pub_dao = None
+        self.write_mode = self.WRITE_MODE_MAIN_LOOP
 
         self.db_deletes_map = {
             self.TABLE_BROADCAST_STATES: [],
@@ -100,6 +109,12 @@ class SuiteDatabaseManager(object):
             self.TABLE_TASK_TIMEOUT_TIMERS: [],
             self.TABLE_XTRIGGERS: []}
         self.db_updates_map = {}
+        # Rows last written to the task_pool and timer tables, by primary key,
+        # so that only changes need to be written. None if not yet written.
+        self.task_pool_rows = None
+        self.task_timeout_timer_rows = None
+        self.task_action_timer_rows = None
+        self.task_event_timer_rows = None
 
     def checkpoint(self, name):
         """Checkpoint the task pool, etc."""
@@ -109,10 +124,16 @@ class SuiteDatabaseManager(object):
         """Copy content of primary database file to public database file.
 
         Use temporary file to ensure that we do not end up with a partial file.
+        The content is copied with the SQLite online backup API, a number of
+        pages at a time, so the copy is consistent even if the primary
+        database is in WAL journal mode.
 
         """
         temp_pub_db_file_name = None
-        self.pub_dao.close()
+        # Items not yet written to the public database are in the copy.
+        self.pub_dao.discard_queued_items()
+        # Include items queued for any writer thread.
+        self.pri_dao.flush()
         try:
             self.pub_dao.conn = None  # reset connection
             open(self.pub_dao.db_file_name, "a").close()  # touch
@@ -120,13 +141,35 @@ class SuiteDatabaseManager(object):
             temp_pub_db_file_name = mkstemp(
                 prefix=self.pub_dao.DB_FILE_BASE_NAME,
                 dir=os.path.dirname(self.pub_dao.db_file_name))[1]
-            copy(self.pri_dao.db_file_name, temp_pub_db_file_name)
+            pri_conn = sqlite3.connect(self.pri_dao.db_file_name)
+            temp_pub_conn = sqlite3.connect(temp_pub_db_file_name)
+            try:
+                pri_conn.backup(
+                    temp_pub_conn,
+                    pages=self.COPY_PAGES,
+                    progress=self._report_copy_progress)
+                # The public database may be read from other hosts, so it
+                # must not be in WAL journal mode.
+                temp_pub_conn.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                temp_pub_conn.close()
+                pri_conn.close()
             os.rename(temp_pub_db_file_name, self.pub_dao.db_file_name)
             os.chmod(self.pub_dao.db_file_name, st_mode)
-        except (IOError, OSError):
+        except (IOError, OSError, sqlite3.Error):
             if temp_pub_db_file_name:
                 os.unlink(temp_pub_db_file_name)
             raise
+        if self.write_mode == self.WRITE_MODE_THREAD:
+            self.pub_dao.start_writer()
+
+    def _report_copy_progress(self, _, remaining, total):
+        """Report progress of copy_pri_to_pub."""
+        LOG.debug(
+            "%(pub_db_name)s: copied %(done)d/%(total)d pages" % {
+                "pub_db_name": self.pub_dao.db_file_name,
+                "done": total - remaining,
+                "total": total})
 
     def delete_suite_params(self, *keys):
         """Schedule deletion of rows from suite_params table by keys."""
@@ -168,12 +211,15 @@ class SuiteDatabaseManager(object):
         else:
             return json.dumps([type(obj).__name__, obj.__getnewargs__()])
 
-    def on_suite_start(self, is_restart):
+    def on_suite_start(self, is_restart, write_mode=WRITE_MODE_MAIN_LOOP):
         """Initialise data access objects.
 
         Ensure that:
         * private database file is private
         * public database is in sync with private database
+
+        If write_mode is WRITE_MODE_THREAD, database writes are done in
+        background threads.
         """
         if not is_restart:
             try:
@@ -181,10 +227,19 @@ class SuiteDatabaseManager(object):
             except OSError:
                 # Just in case the path is a directory!
                 rmtree(self.pri_path, ignore_errors=True)
+            # Remove any WAL journal files of the old database.
+            for suffix in ('-wal', '-shm'):
+                try:
+                    os.unlink(self.pri_path + suffix)
+                except OSError:
+                    pass
+        self.write_mode = write_mode
         self.pri_dao = self.get_pri_dao()
         os.chmod(self.pri_path, 0o600)
         self.pub_dao = CylcSuiteDAO(self.pub_path, is_public=True)
         self.copy_pri_to_pub()
+        if self.write_mode == self.WRITE_MODE_THREAD:
+            self.pri_dao.start_writer()
 
     def on_suite_shutdown(self):
         """Close data access objects."""
@@ -226,14 +281,9 @@ class SuiteDatabaseManager(object):
                     self.pub_dao.add_update_item(
                         table_name, set_args, where_args)
 
-        # Previously, we used a separate thread for database writes. This has
-        # now been removed. For the private database, there is no real
-        # advantage in using a separate thread as it needs to be always in sync
-        # with what is current. For the public database, which does not need to
-        # be fully in sync, there is some advantage of using a separate
-        # thread/process, if writing to it becomes a bottleneck. At the moment,
-        # there is no evidence that this is a bottleneck, so it is better to
-        # keep the logic simple.
+        # In the "thread" write mode, the items are handed over to a writer
+        # thread for each database. Reads from the private database wait for
+        # its writer thread, so it is always in sync with what is current.
         self.pri_dao.execute_queued_items()
         self.pub_dao.execute_queued_items()
 
@@ -354,20 +404,29 @@ class SuiteDatabaseManager(object):
                 {"key": key, "value": value})
 
     def put_task_event_timers(self, task_events_mgr):
-        """Put statements to update the task_action_timers table."""
-        if task_events_mgr.event_timers:
-            self.db_deletes_map[self.TABLE_TASK_ACTION_TIMERS].append({})
-            for key, timer in task_events_mgr.event_timers.items():
-                key1, point, name, submit_num = key
-                self.db_inserts_map[self.TABLE_TASK_ACTION_TIMERS].append({
-                    "name": name,
-                    "cycle": point,
-                    "ctx_key": json.dumps((key1, submit_num,)),
-                    "ctx": self._namedtuple2json(timer.ctx),
-                    "delays": json.dumps(timer.delays),
-                    "num": timer.num,
-                    "delay": timer.delay,
-                    "timeout": timer.timeout})
+        """Put statements to update the task_action_timers table.
+
+        Only event timers that have changed since the previous call are
+        written.
+        """
+        rows = {}
+        for key, timer in task_events_mgr.event_timers.items():
+            key1, point, name, submit_num = key
+            row = {
+                "name": name,
+                "cycle": point,
+                "ctx_key": json.dumps((key1, submit_num,)),
+                "ctx": self._namedtuple2json(timer.ctx),
+                "delays": json.dumps(timer.delays),
+                "num": timer.num,
+                "delay": timer.delay,
+                "timeout": timer.timeout}
+            rows[(row["cycle"], row["name"], row["ctx_key"])] = row
+        self._init_task_action_timer_rows()
+        self._put_table_rows(
+            self.TABLE_TASK_ACTION_TIMERS, self.task_event_timer_rows, rows,
+            ("cycle", "name", "ctx_key"))
+        self.task_event_timer_rows = rows
 
     def put_xtriggers(self, sat_xtrig):
         """Put statements to update external triggers table."""
@@ -381,48 +440,44 @@ class SuiteDatabaseManager(object):
         """Put statements to update the task_pool table in runtime database.
 
         Update the task_pool table and the task_action_timers table.
-        Queue delete (everything) statements to wipe the tables, and queue the
-        relevant insert statements for the current tasks in the pool.
+        Only rows of tasks that have been added, removed or changed since the
+        previous call are written, except on the first call, which queues
+        delete (everything) statements to wipe the tables, and the relevant
+        insert statements for the current tasks in the pool.
         """
-        self.db_deletes_map[self.TABLE_TASK_POOL].append({})
-        # No need to do:
-        # self.db_deletes_map[self.TABLE_TASK_ACTION_TIMERS].append({})
-        # Should already be done by self.put_task_event_timers above.
-        self.db_deletes_map[self.TABLE_TASK_TIMEOUT_TIMERS].append({})
+        task_pool_rows = {}
+        task_timeout_timer_rows = {}
+        task_action_timer_rows = {}
         for itask in pool.get_all_tasks():
-            self.db_inserts_map[self.TABLE_TASK_POOL].append({
-                "name": itask.tdef.name,
-                "cycle": str(itask.point),
+            name, cycle = itask.tdef.name, str(itask.point)
+            task_pool_rows[(cycle, name)] = {
+                "name": name,
+                "cycle": cycle,
                 "spawned": int(itask.has_spawned),
                 "status": itask.state.status,
-                "is_held": itask.state.is_held})
+                "is_held": itask.state.is_held}
             if itask.timeout is not None:
-                self.db_inserts_map[self.TABLE_TASK_TIMEOUT_TIMERS].append({
-                    "name": itask.tdef.name,
-                    "cycle": str(itask.point),
-                    "timeout": itask.timeout})
+                task_timeout_timer_rows[(cycle, name)] = {
+                    "name": name,
+                    "cycle": cycle,
+                    "timeout": itask.timeout}
+            timers = []
             if itask.poll_timer is not None:
-                self.db_inserts_map[self.TABLE_TASK_ACTION_TIMERS].append({
-                    "name": itask.tdef.name,
-                    "cycle": str(itask.point),
-                    "ctx_key": json.dumps("poll_timer"),
-                    "ctx": self._namedtuple2json(itask.poll_timer.ctx),
-                    "delays": json.dumps(itask.poll_timer.delays),
-                    "num": itask.poll_timer.num,
-                    "delay": itask.poll_timer.delay,
-                    "timeout": itask.poll_timer.timeout})
+                timers.append(("poll_timer", itask.poll_timer))
             for ctx_key_1, timer in itask.try_timers.items():
-                if timer is None:
-                    continue
-                self.db_inserts_map[self.TABLE_TASK_ACTION_TIMERS].append({
-                    "name": itask.tdef.name,
-                    "cycle": str(itask.point),
-                    "ctx_key": json.dumps(("try_timers", ctx_key_1)),
+                if timer is not None:
+                    timers.append((("try_timers", ctx_key_1), timer))
+            for ctx_key, timer in timers:
+                ctx_key = json.dumps(ctx_key)
+                task_action_timer_rows[(cycle, name, ctx_key)] = {
+                    "name": name,
+                    "cycle": cycle,
+                    "ctx_key": ctx_key,
                     "ctx": self._namedtuple2json(timer.ctx),
                     "delays": json.dumps(timer.delays),
                     "num": timer.num,
                     "delay": timer.delay,
-                    "timeout": timer.timeout})
+                    "timeout": timer.timeout}
             if itask.state.time_updated:
                 set_args = {
                     "time_updated": itask.state.time_updated,
@@ -430,20 +485,65 @@ class SuiteDatabaseManager(object):
                     "try_num": itask.get_try_num(),
                     "status": itask.state.status}
                 where_args = {
-                    "cycle": str(itask.point),
-                    "name": itask.tdef.name,
+                    "cycle": cycle,
+                    "name": name,
                 }
                 self.db_updates_map.setdefault(self.TABLE_TASK_STATES, [])
                 self.db_updates_map[self.TABLE_TASK_STATES].append(
                     (set_args, where_args))
                 itask.state.time_updated = None
 
+        if self.task_pool_rows is None:
+            self.db_deletes_map[self.TABLE_TASK_POOL].append({})
+            self.db_deletes_map[self.TABLE_TASK_TIMEOUT_TIMERS].append({})
+            self.task_pool_rows = {}
+            self.task_timeout_timer_rows = {}
+        self._init_task_action_timer_rows()
+        for table_name, prev_rows, rows, key_names in [
+                (self.TABLE_TASK_POOL,
+                 self.task_pool_rows, task_pool_rows,
+                 ("cycle", "name")),
+                (self.TABLE_TASK_TIMEOUT_TIMERS,
+                 self.task_timeout_timer_rows, task_timeout_timer_rows,
+                 ("cycle", "name")),
+                (self.TABLE_TASK_ACTION_TIMERS,
+                 self.task_action_timer_rows, task_action_timer_rows,
+                 ("cycle", "name", "ctx_key"))]:
+            self._put_table_rows(table_name, prev_rows, rows, key_names)
+        self.task_pool_rows = task_pool_rows
+        self.task_timeout_timer_rows = task_timeout_timer_rows
+        self.task_action_timer_rows = task_action_timer_rows
+
         self.db_inserts_map[self.TABLE_CHECKPOINT_ID].append({
             # id = -1 for latest
             "id": CylcSuiteDAO.CHECKPOINT_LATEST_ID,
             "time": get_current_time_string(),
             "event": CylcSuiteDAO.CHECKPOINT_LATEST_EVENT})
 
+    def _init_task_action_timer_rows(self):
+        """Wipe the task_action_timers table before its first write.
+
+        The table holds both task event timers and task action timers.
+        """
+        if self.task_action_timer_rows is None:
+            self.db_deletes_map[self.TABLE_TASK_ACTION_TIMERS].append({})
+            self.task_action_timer_rows = {}
+            self.task_event_timer_rows = {}
+
+    def _put_table_rows(self, table_name, prev_rows, rows, key_names):
+        """Put statements to change table rows from prev_rows to rows.
+
+        prev_rows and rows are dicts of rows (dicts of column values) by
+        primary key values (in the order of key_names). Queue delete
+        statements for removed rows, and insert (or replace) statements for
+        new or changed rows.
+        """
+        for key in prev_rows.keys() - rows.keys():
+            self.db_deletes_map[table_name].append(dict(zip(key_names, key)))
+        for key, row in rows.items():
+            if prev_rows.get(key) != row:
+                self.db_inserts_map[table_name].append(row)
+
     def put_insert_task_events(self, itask, args):
         """Put INSERT statement for task_events table."""
         self._put_insert_task_x(CylcSuiteDAO.TABLE_TASK_EVENTS, itask, args)
@@ -501,8 +601,15 @@ class SuiteDatabaseManager(object):
         self.db_updates_map[table_name].append((set_args, where_args))
 
     def recover_pub_from_pri(self):
-        """Recover public database from private database."""
+        """Recover public database from private database.
+
+        Try writing the items not yet written to the public database, waiting
+        longer for locks. Only if that fails, copy the content of the private
+        database into a new public database file.
+        """
         if self.pub_dao.n_tries >= self.pub_dao.MAX_TRIES:
+            if self.pub_dao.retry_queued_items():
+                return
             self.copy_pri_to_pub()
             LOG.warning(
                 "%(pub_db_name)s: recovered from %(pri_db_name)s" % {
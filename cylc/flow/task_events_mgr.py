@@ -26,6 +26,8 @@ This module provides logic to:
 """
 
 from collections import namedtuple
+from heapq import heappop, heappush
+from itertools import count
 from logging import getLevelName, CRITICAL, ERROR, WARNING, INFO, DEBUG
 import os
 from shlex import quote
@@ -40,6 +42,7 @@ from cylc.flow.hostuserutil import get_host, get_user
 from cylc.flow.pathutil import (
     get_remote_suite_run_job_dir,
     get_suite_run_job_dir)
+from cylc.flow.remote import get_ssh_control_opts
 from cylc.flow.subprocctx import SubProcContext
 from cylc.flow.task_action_timer import TaskActionTimer
 from cylc.flow.task_job_logs import (
@@ -104,6 +107,12 @@ class TaskEventsManager():
     * Manage task messages (received or otherwise).
     * Set up task (submission) retries on job (submission) failures.
     * Generate and manage task event handlers.
+
+    Job poll timers, job timeouts and event handler timers are scheduled in
+    min-heaps of (due time, sequence number, item), so each main loop
+    iteration only looks at the timers that are due. Entries are checked
+    against the current timers when they are popped, so stale entries are
+    simply dropped or rescheduled.
     """
     EVENT_FAILED = TASK_OUTPUT_FAILED
     EVENT_LATE = "late"
@@ -147,6 +156,10 @@ class TaskEventsManager():
         self.mail_footer = None
         self.next_mail_time = None
         self.event_timers = {}
+        self._event_timers_heap = []
+        self._event_mail_pending = set()
+        self._job_timers_heap = []
+        self._timers_seq = count()
         # Set pflag = True to stimulate task dependency negotiation whenever a
         # task changes state in such a way that others could be affected. The
         # flag should only be turned off again after use in
@@ -179,6 +192,30 @@ class TaskEventsManager():
         itask.poll_timer.next(no_exhaust=True)
         return True
 
+    def add_job_timer(self, itask):
+        """Schedule a check of the poll timer and timeout of itask."""
+        dues = [itask.timeout]
+        if itask.poll_timer is not None:
+            dues.append(itask.poll_timer.timeout)
+        dues = [due for due in dues if due is not None]
+        if dues:
+            heappush(
+                self._job_timers_heap,
+                (min(dues), next(self._timers_seq), itask))
+
+    def pop_job_timers(self, now):
+        """Return a list of tasks with a job timer due at now.
+
+        Each returned task should be checked with "check_job_time", and then
+        rescheduled with "add_job_timer" if it is still in the task pool.
+        """
+        itasks = {}
+        heap = self._job_timers_heap
+        while heap and heap[0][0] < now:
+            itask = heappop(heap)[2]
+            itasks[itask.identity] = itask
+        return list(itasks.values())
+
     def check_job_time(self, itask, now):
         """Check/handle job timeout and poll timer"""
         can_poll = self.check_poll_time(itask, now)
@@ -227,9 +264,23 @@ class TaskEventsManager():
         """
         ctx_groups = {}
         now = time()
-        for id_key, timer in self.event_timers.copy().items():
+        if self._event_mail_pending and (
+            schd_ctx.stop_mode or
+            self.next_mail_time is None or
+            self.next_mail_time <= now
+        ):
+            for id_key in self._event_mail_pending:
+                self._schedule_event_timer(id_key, 0)
+            self._event_mail_pending.clear()
+        id_keys = {}
+        heap = self._event_timers_heap
+        while heap and heap[0][0] < now:
+            id_keys[heappop(heap)[2]] = True
+        for id_key in id_keys:
             key1, point, name, submit_num = id_key
-            if timer.is_waiting:
+            timer = self.event_timers.get(id_key)
+            if timer is None or timer.is_waiting:
+                # Stale entry, the timer is rescheduled when required
                 continue
             # Set timer if timeout is None.
             if not timer.is_timeout_set():
@@ -249,7 +300,10 @@ class TaskEventsManager():
                         point, name, submit_num, key1,
                         timer.delay_timeout_as_str()))
             # Ready to run?
-            if not timer.is_delay_done() or (
+            if not timer.is_delay_done():
+                self._schedule_event_timer(id_key)
+                continue
+            if (
                 # Avoid flooding user's mail box with mail notification.
                 # Group together as many notifications as possible within a
                 # given interval.
@@ -258,6 +312,7 @@ class TaskEventsManager():
                 self.next_mail_time is not None and
                 self.next_mail_time > now
             ):
+                self._event_mail_pending.add(id_key)
                 continue
 
             timer.set_waiting()
@@ -284,6 +339,29 @@ class TaskEventsManager():
             elif ctx.ctx_type == self.HANDLER_JOB_LOGS_RETRIEVE:
                 self._process_job_logs_retrieval(schd_ctx, ctx, id_keys)
 
+    def add_event_timer(self, id_key, timer):
+        """Add an event handler timer, and schedule it."""
+        self.event_timers[id_key] = timer
+        self._schedule_event_timer(id_key)
+
+    def _schedule_event_timer(self, id_key, due=None):
+        """Schedule a check of an event handler timer.
+
+        If due is not specified, use the timeout of the timer, or schedule an
+        immediate check if the timeout is not set.
+        """
+        if due is None:
+            due = self.event_timers[id_key].timeout
+            if due is None:
+                due = 0
+        heappush(
+            self._event_timers_heap, (due, next(self._timers_seq), id_key))
+
+    def _unset_event_timer_waiting(self, id_key):
+        """Unset waiting flag of an event handler timer, to retry it."""
+        self.event_timers[id_key].unset_waiting()
+        self._schedule_event_timer(id_key)
+
     def process_message(
         self,
         itask,
@@ -510,7 +588,7 @@ class TaskEventsManager():
         if ctx.ret_code == 0:
             del self.event_timers[id_key]
         else:
-            self.event_timers[id_key].unset_waiting()
+            self._unset_event_timer_waiting(id_key)
 
     def _db_events_insert(self, itask, event="", message=""):
         """Record an event to the DB."""
@@ -584,7 +662,7 @@ class TaskEventsManager():
                     log_task_job_activity(
                         log_ctx, schd_ctx.suite, point, name, submit_num)
                 else:
-                    self.event_timers[id_key].unset_waiting()
+                    self._unset_event_timer_waiting(id_key)
             except KeyError as exc:
                 LOG.exception(exc)
 
@@ -610,6 +688,8 @@ class TaskEventsManager():
         else:
             s_user, s_host = (None, ctx.user_at_host)
         ssh_str = str(glbl_cfg().get_host_item("ssh command", s_host, s_user))
+        for opt in get_ssh_control_opts(s_user, s_host):
+            ssh_str += " " + quote(opt)
         rsync_str = str(glbl_cfg().get_host_item(
             "retrieve job logs command", s_host, s_user))
 
@@ -635,7 +715,8 @@ class TaskEventsManager():
         # Local target
         cmd.append(get_suite_run_job_dir(schd_ctx.suite) + "/")
         self.proc_pool.put_command(
-            SubProcContext(ctx, cmd, env=dict(os.environ), id_keys=id_keys),
+            SubProcContext(
+                ctx, cmd, env=dict(os.environ), id_keys=id_keys, host=s_host),
             self._job_logs_retrieval_callback, [schd_ctx])
 
     def _job_logs_retrieval_callback(self, proc_ctx, schd_ctx):
@@ -669,7 +750,7 @@ class TaskEventsManager():
                     for fname, exist_ok in sorted(fname_oks.items()):
                         if not exist_ok:
                             log_ctx.err += " %s" % fname
-                    self.event_timers[id_key].unset_waiting()
+                    self._unset_event_timer_waiting(id_key)
                 log_task_job_activity(
                     log_ctx, schd_ctx.suite, point, name, submit_num)
             except KeyError as exc:
@@ -862,14 +943,14 @@ class TaskEventsManager():
             itask, "retrieve job logs retry delays")
         if not retry_delays:
             retry_delays = [0]
-        self.event_timers[id_key] = TaskActionTimer(
+        self.add_event_timer(id_key, TaskActionTimer(
             TaskJobLogsRetrieveContext(
                 self.HANDLER_JOB_LOGS_RETRIEVE,  # key
                 self.HANDLER_JOB_LOGS_RETRIEVE,  # ctx_type
                 user_at_host,
                 self.get_host_conf(itask, "retrieve job logs max size"),
             ),
-            retry_delays)
+            retry_delays))
 
     def _setup_event_mail(self, itask, event):
         """Set up task event notification, by email."""
@@ -886,7 +967,7 @@ class TaskEventsManager():
         retry_delays = self._get_events_conf(itask, "mail retry delays")
         if not retry_delays:
             retry_delays = [0]
-        self.event_timers[id_key] = TaskActionTimer(
+        self.add_event_timer(id_key, TaskActionTimer(
             TaskEventMailContext(
                 self.HANDLER_MAIL,  # key
                 self.HANDLER_MAIL,  # ctx_type
@@ -898,7 +979,7 @@ class TaskEventsManager():
                 self._get_events_conf(itask, "mail to", get_user()),  # mail_to
                 self._get_events_conf(itask, "mail smtp"),  # mail_smtp
             ),
-            retry_delays)
+            retry_delays))
 
     def _setup_custom_event_handlers(self, itask, event, message):
         """Set up custom task event handlers."""
@@ -985,7 +1066,8 @@ class TaskEventsManager():
                 cmd = "%s '%s' '%s' '%s' '%s'" % (
                     handler, event, self.suite, itask.identity, message)
             LOG.debug("[%s] -Queueing %s handler: %s", itask, event, cmd)
-            self.event_timers[id_key] = (
+            self.add_event_timer(
+                id_key,
                 TaskActionTimer(
                     CustomTaskEventHandlerContext(
                         key1,
@@ -1067,3 +1149,4 @@ class TaskEventsManager():
         LOG.info('[%s] -%s', itask, message)
         # Set next poll time
         self.check_poll_time(itask)
+        self.add_job_timer(itask)
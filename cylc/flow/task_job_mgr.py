@@ -98,13 +98,18 @@ class TaskJobManager(object):
         """
         now = time()
         poll_tasks = set()
-        for itask in task_pool.get_tasks():
+        for itask in self.task_events_mgr.pop_job_timers(now):
+            # Get the task in the pool, which may be replaced on reload
+            itask = task_pool.pool.get(itask.point, {}).get(itask.identity)
+            if itask is None:
+                continue
             if self.task_events_mgr.check_job_time(itask, now):
                 poll_tasks.add(itask)
                 if itask.poll_timer.delay is not None:
                     LOG.info(
                         '[%s] -poll now, (next in %s)',
                         itask, itask.poll_timer.delay_timeout_as_str())
+            self.task_events_mgr.add_job_timer(itask)
         if poll_tasks:
             self.poll_task_jobs(suite, poll_tasks)
 
@@ -653,10 +658,12 @@ class TaskJobManager(object):
             auth_itasks[(itask.task_host, itask.task_owner)].append(itask)
         for (host, owner), itasks in sorted(auth_itasks.items()):
             cmd = ["cylc", cmd_key]
+            kwargs = {}
             if LOG.isEnabledFor(DEBUG):
                 cmd.append("--debug")
             if is_remote_host(host):
                 cmd.append("--host=%s" % (host))
+                kwargs['host'] = host
             if is_remote_user(owner):
                 cmd.append("--user=%s" % (owner))
             cmd.append("--")
@@ -667,7 +674,8 @@ class TaskJobManager(object):
                     itask.point, itask.tdef.name, itask.submit_num))
             cmd += job_log_dirs
             self.proc_pool.put_command(
-                SubProcContext(cmd_key, cmd), callback, [suite, itasks])
+                SubProcContext(cmd_key, cmd, **kwargs),
+                callback, [suite, itasks])
 
     @staticmethod
     def _set_retry_timers(itask, rtconfig=None):
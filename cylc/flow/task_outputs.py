@@ -50,14 +50,19 @@ class TaskOutputs(object):
                 trigger1 = message 1
 
     Can search item by message string or by trigger string.
+
+    A listener, callable as "listener(message, is_completed)", can be set with
+    "set_listener". It is called whenever the completion status of an output
+    changes, so that the task pool can keep its dependency index up to date.
     """
 
     # Memory optimization - constrain possible attributes to this list.
-    __slots__ = ["_by_message", "_by_trigger"]
+    __slots__ = ["_by_message", "_by_trigger", "_listener"]
 
     def __init__(self, tdef):
         self._by_message = {}
         self._by_trigger = {}
+        self._listener = None
         # Add standard outputs.
         for output in _SORT_ORDERS:
             self.add(output)
@@ -138,17 +143,22 @@ class TaskOutputs(object):
     def set_all_completed(self):
         """Set all outputs to complete."""
         for value in self._by_message.values():
-            value[_IS_COMPLETED] = True
+            self._set_item_completion(value, True)
 
     def set_all_incomplete(self):
         """Set all outputs to incomplete."""
         for value in self._by_message.values():
-            value[_IS_COMPLETED] = False
+            self._set_item_completion(value, False)
 
     def set_completion(self, message, is_completed):
         """Set output message completion status to is_completed (bool)."""
         if message in self._by_message:
-            self._by_message[message][_IS_COMPLETED] = is_completed
+            self._set_item_completion(
+                self._by_message[message], is_completed)
+
+    def set_listener(self, listener):
+        """Set (or unset with None) the output completion listener."""
+        self._listener = listener
 
     def set_msg_trg_completion(self, message=None, trigger=None,
                                is_completed=True):
@@ -163,7 +173,7 @@ class TaskOutputs(object):
         try:
             item = self._get_item(message, trigger)
             old_is_completed = item[_IS_COMPLETED]
-            item[_IS_COMPLETED] = is_completed
+            self._set_item_completion(item, is_completed)
         except KeyError:
             return None
         else:
@@ -182,6 +192,16 @@ class TaskOutputs(object):
         else:
             return self._by_message[message]
 
+    def _set_item_completion(self, item, is_completed):
+        """Set completion of item, notify listener if changed."""
+        old_is_completed = item[_IS_COMPLETED]
+        item[_IS_COMPLETED] = is_completed
+        if (
+                self._listener is not None
+                and bool(old_is_completed) != bool(is_completed)
+        ):
+            self._listener(item[_MESSAGE], bool(is_completed))
+
     @staticmethod
     def msg_sort_key(item):
         """Compare by _MESSAGE."""
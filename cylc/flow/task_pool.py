@@ -28,7 +28,11 @@ tasks against the new stop cycle.
 
 """
 
+from bisect import bisect_left, insort
 from fnmatch import fnmatchcase
+from functools import partial
+from heapq import heappop, heappush
+from itertools import count
 import json
 from time import time
 
@@ -55,6 +59,14 @@ from cylc.flow.task_state import (
 from cylc.flow.wallclock import get_current_time_string
 
 
+# Task statuses that do not hold back the runahead limit.
+_RUNAHEAD_FINISHED_STATUSES = frozenset([
+    TASK_STATUS_FAILED,
+    TASK_STATUS_SUCCEEDED,
+    TASK_STATUS_EXPIRED,
+])
+
+
 class TaskPool(object):
     """Task pool of a suite."""
 
@@ -88,6 +100,42 @@ class TaskPool(object):
         self.rhpool_changed = False
         self.pool_changes = []
 
+        # Dependency matching index, for tasks in the main pool only:
+        # {(name, point_str, output): {task_id: itask, ...}, ...}
+        self._prereq_index = {}
+        # Completed outputs of tasks in the main pool.
+        # {(name, point_str, output), ...}
+        self._completed_outputs = set()
+        # Outputs completed since the last dependency matching.
+        self._new_outputs = set()
+        # Tasks to match against all completed outputs, e.g. new in pool.
+        self._unmatched_tasks = {}
+
+        # Runahead accounting, for tasks in both pools, maintained on add,
+        # remove and status change of tasks (see release_runahead_tasks):
+        # Number of tasks at each point, and a sorted list of those points.
+        self._point_counts = {}
+        self._points = []
+        # Number of unfinished tasks at each point, and sorted points.
+        self._unfinished_point_counts = {}
+        self._unfinished_points = []
+        # Sorted points in the runahead pool.
+        self._runahead_points = []
+        # Finished tasks in the runahead pool: {task_id: itask, ...}
+        self._runahead_finished = {}
+
+        # Tasks to examine in the next readiness check (see
+        # get_ready_check_tasks): changed tasks {task_id: itask, ...}, a heap
+        # of time-based checks [(time, seq_num, itask), ...], and the
+        # earliest time-based check of each task {task_id: time, ...}.
+        self._ready_check_all = True
+        self._ready_check_tasks = {}
+        self._ready_check_timers = []
+        self._ready_check_times = {}
+        self._ready_check_seq = count()
+        # Number of tasks examined in the latest readiness check.
+        self.n_ready_check_tasks = 0
+
         self.is_held = False
         self.hold_point = None
         self.held_future_tasks = []
@@ -209,9 +257,19 @@ class TaskPool(object):
             itask.state.reset(is_held=True)
 
         # add to the runahead pool
-        self.runahead_pool.setdefault(itask.point, OrderedDict())
+        if itask.point not in self.runahead_pool:
+            self.runahead_pool[itask.point] = OrderedDict()
+            insort(self._runahead_points, itask.point)
         self.runahead_pool[itask.point][itask.identity] = itask
         self.rhpool_changed = True
+        self._count_point(self._point_counts, self._points, itask.point, 1)
+        if itask.state.status in _RUNAHEAD_FINISHED_STATUSES:
+            self._runahead_finished[itask.identity] = itask
+        else:
+            self._count_point(
+                self._unfinished_point_counts, self._unfinished_points,
+                itask.point, 1)
+        itask.state.set_listener(partial(self._set_task_status, itask))
 
         # add row to "task_states" table
         if is_new and itask.submit_num == 0:
@@ -226,6 +284,9 @@ class TaskPool(object):
     def release_runahead_tasks(self):
         """Release tasks from the runahead pool to the main pool.
 
+        Uses the per-point task counts maintained on add, remove and status
+        change of tasks, so the cost does not depend on the size of the pool.
+
         Return True if any tasks are released, else False.
         """
         released = False
@@ -234,40 +295,17 @@ class TaskPool(object):
 
         # Any finished tasks can be released immediately (this can happen at
         # restart when all tasks are initially loaded into the runahead pool).
-        for itask_id_maps in self.runahead_pool.copy().values():
-            for itask in itask_id_maps.copy().values():
-                if itask.state(
-                    TASK_STATUS_FAILED,
-                    TASK_STATUS_SUCCEEDED,
-                    TASK_STATUS_EXPIRED
-                ):
-                    self.release_runahead_task(itask)
-                    released = True
+        for itask in list(self._runahead_finished.values()):
+            self.release_runahead_task(itask)
+            released = True
 
-        limit = self.max_num_active_cycle_points
-
-        points = []
-        for point, itasks in sorted(
-                self.get_tasks_by_point(incl_runahead=True).items()):
-            has_unfinished_itasks = False
-            for itask in itasks:
-                if not itask.state(
-                    TASK_STATUS_FAILED,
-                    TASK_STATUS_SUCCEEDED,
-                    TASK_STATUS_EXPIRED
-                ):
-                    has_unfinished_itasks = True
-                    break
-            if not points and not has_unfinished_itasks:
-                # We need to begin with an unfinished cycle point.
-                continue
-            points.append(point)
+        if not self._unfinished_points:
+            return released
 
-        if not points:
-            return False
+        limit = self.max_num_active_cycle_points
 
         # Get the earliest point with unfinished tasks.
-        runahead_base_point = min(points)
+        runahead_base_point = self._unfinished_points[0]
 
         # Get all cycling points possible after the runahead base point.
         if (self._prev_runahead_base_point is not None and
@@ -275,23 +313,24 @@ class TaskPool(object):
             # Cache for speed.
             sequence_points = self._prev_runahead_sequence_points
         else:
-            sequence_points = []
+            sequence_points = set()
             for sequence in self.config.sequences:
-                point = runahead_base_point
-                for _ in range(limit):
-                    point = sequence.get_next_point(point)
-                    if point is None:
-                        break
-                    sequence_points.append(point)
-            sequence_points = set(sequence_points)
+                # The first "limit" points after the runahead base point.
+                points = sequence.get_points(
+                    runahead_base_point, limit=limit + 1)
+                if points and points[0] == runahead_base_point:
+                    del points[0]
+                sequence_points.update(points[:limit])
             self._prev_runahead_sequence_points = sequence_points
             self._prev_runahead_base_point = runahead_base_point
 
-        points = set(points).union(sequence_points)
-
         if self.custom_runahead_limit is None:
             # Calculate which tasks to release based on a maximum number of
             # active cycle points (active meaning non-finished tasks).
+            # (Only the first "limit" points with tasks can matter.)
+            index = bisect_left(self._points, runahead_base_point)
+            points = set(self._points[index:index + limit]).union(
+                sequence_points)
             latest_allowed_point = sorted(points)[:limit][-1]
             if self.max_future_offset is not None:
                 # For the first N points, release their future trigger tasks.
@@ -316,11 +355,14 @@ class TaskPool(object):
         if self.stop_point and latest_allowed_point > self.stop_point:
             latest_allowed_point = self.stop_point
 
-        for point, itask_id_map in self.runahead_pool.copy().items():
-            if point <= latest_allowed_point:
-                for itask in itask_id_map.copy().values():
-                    self.release_runahead_task(itask)
-                    released = True
+        while (
+                self._runahead_points
+                and self._runahead_points[0] <= latest_allowed_point
+        ):
+            for itask in list(
+                    self.runahead_pool[self._runahead_points[0]].values()):
+                self.release_runahead_task(itask)
+                released = True
         return released
 
     def load_db_task_pool_for_restart(self, row_idx, row):
@@ -477,8 +519,8 @@ class TaskPool(object):
             if isinstance(key1, list):
                 key1 = tuple(key1)
             key = (key1, cycle, name, submit_num)
-            self.task_events_mgr.event_timers[key] = TaskActionTimer(
-                ctx, delays, num, delay, timeout)
+            self.task_events_mgr.add_event_timer(key, TaskActionTimer(
+                ctx, delays, num, delay, timeout))
         else:
             LOG.exception(
                 "%(id)s: skip action timer %(ctx_key)s" %
@@ -498,24 +540,24 @@ class TaskPool(object):
         self.pool[itask.point][itask.identity] = itask
         self.pool_changed = True
         self.pool_changes.append(itask)
+        self._add_to_dependency_index(itask)
+        self._ready_check_tasks[itask.identity] = itask
+        self.task_events_mgr.add_job_timer(itask)
         LOG.debug("[%s] -released to the task pool", itask)
-        del self.runahead_pool[itask.point][itask.identity]
-        if not self.runahead_pool[itask.point]:
-            del self.runahead_pool[itask.point]
-        self.rhpool_changed = True
+        self._remove_from_runahead_pool(itask)
         if itask.tdef.max_future_prereq_offset is not None:
             self.set_max_future_offset()
 
     def remove(self, itask, reason=None):
         """Remove a task proxy from the pool."""
-        try:
-            del self.runahead_pool[itask.point][itask.identity]
-        except KeyError:
-            pass
-        else:
-            if not self.runahead_pool[itask.point]:
-                del self.runahead_pool[itask.point]
-            self.rhpool_changed = True
+        itask.state.set_listener(None)
+        self._count_point(self._point_counts, self._points, itask.point, -1)
+        if itask.state.status not in _RUNAHEAD_FINISHED_STATUSES:
+            self._count_point(
+                self._unfinished_point_counts, self._unfinished_points,
+                itask.point, -1)
+        if itask.identity in self.runahead_pool.get(itask.point, {}):
+            self._remove_from_runahead_pool(itask)
             return
 
         # remove from queue
@@ -525,6 +567,9 @@ class TaskPool(object):
         if not self.pool[itask.point]:
             del self.pool[itask.point]
         self.pool_changed = True
+        self._remove_from_dependency_index(itask)
+        self._ready_check_tasks.pop(itask.identity, None)
+        self._ready_check_times.pop(itask.identity, None)
         msg = "task proxy removed"
         if reason:
             msg += " (%s)" % reason
@@ -533,6 +578,104 @@ class TaskPool(object):
             self.set_max_future_offset()
         del itask
 
+    def _remove_from_runahead_pool(self, itask):
+        """Remove itask from the runahead pool data structures."""
+        del self.runahead_pool[itask.point][itask.identity]
+        if not self.runahead_pool[itask.point]:
+            del self.runahead_pool[itask.point]
+            del self._runahead_points[
+                bisect_left(self._runahead_points, itask.point)]
+        self._runahead_finished.pop(itask.identity, None)
+        self.rhpool_changed = True
+
+    def _set_task_status(self, itask, prev_status, status):
+        """Update the runahead accounting on task state change.
+
+        Listener for the state of tasks in both pools.
+        """
+        if itask.identity in self.pool.get(itask.point, {}):
+            self._ready_check_tasks[itask.identity] = itask
+        was_finished = prev_status in _RUNAHEAD_FINISHED_STATUSES
+        is_finished = status in _RUNAHEAD_FINISHED_STATUSES
+        if was_finished == is_finished:
+            return
+        self._count_point(
+            self._unfinished_point_counts, self._unfinished_points,
+            itask.point, -1 if is_finished else 1)
+        if itask.identity in self.runahead_pool.get(itask.point, {}):
+            if is_finished:
+                self._runahead_finished[itask.identity] = itask
+            else:
+                self._runahead_finished.pop(itask.identity, None)
+
+    def get_ready_check_tasks(self, now, itasks=None):
+        """Return the tasks that need to be examined for readiness.
+
+        These are tasks in the pool that have changed since the previous
+        check, tasks with time-based checks due at "now" (see
+        set_ready_check_time), and any of "itasks" still in the pool - or
+        all tasks in the pool if set_ready_check_all has been called.
+        """
+        if self._ready_check_all:
+            self._ready_check_all = False
+            self._ready_check_tasks.clear()
+            self._ready_check_timers.clear()
+            self._ready_check_times.clear()
+            ready_check_tasks = self.get_tasks()
+            self.n_ready_check_tasks = len(ready_check_tasks)
+            return ready_check_tasks
+        ready_check_tasks = self._ready_check_tasks
+        self._ready_check_tasks = {}
+        timers = self._ready_check_timers
+        while timers and timers[0][0] <= now:
+            check_time, _, itask = heappop(timers)
+            if self._ready_check_times.get(itask.identity) == check_time:
+                del self._ready_check_times[itask.identity]
+                ready_check_tasks[itask.identity] = itask
+        if itasks:
+            for itask in itasks:
+                if itask.identity in self.pool.get(itask.point, {}):
+                    ready_check_tasks[itask.identity] = itask
+        self.n_ready_check_tasks = len(ready_check_tasks)
+        return list(ready_check_tasks.values())
+
+    def set_ready_check_all(self):
+        """Examine all tasks in the next readiness check.
+
+        E.g. after commands that can change tasks in many ways.
+        """
+        self._ready_check_all = True
+
+    def set_ready_check_time(self, itask, check_time):
+        """Examine itask for readiness again at check_time, if not None.
+
+        Only the earliest check time of each task is kept - later ones should
+        be set again when the task is examined at that time.
+        """
+        if check_time is None:
+            return
+        prev_time = self._ready_check_times.get(itask.identity)
+        if prev_time is None or check_time < prev_time:
+            self._ready_check_times[itask.identity] = check_time
+            heappush(
+                self._ready_check_timers,
+                (check_time, next(self._ready_check_seq), itask))
+
+    @staticmethod
+    def _count_point(counts, points, point, delta):
+        """Add delta to the count of point.
+
+        Maintain "points" as the sorted list of points with a positive count.
+        """
+        count = counts.get(point, 0) + delta
+        if count > 0:
+            if point not in counts:
+                insort(points, point)
+            counts[point] = count
+        elif point in counts:
+            del counts[point]
+            del points[bisect_left(points, point)]
+
     def get_all_tasks(self):
         """Return a list of all task proxies."""
         return self.get_rh_tasks() + self.get_tasks()
@@ -978,19 +1121,79 @@ class TaskPool(object):
         """Run time dependency negotiation.
 
         Tasks attempt to get their prerequisites satisfied by other tasks'
-        outputs. Brokered negotiation is O(n) in number of tasks.
+        outputs. Only tasks that are new to the pool (or have had their
+        prerequisites reset) and tasks with prerequisites on outputs
+        completed since the previous negotiation are considered, so the cost
+        is proportional to the number of changes, not the size of the pool.
 
         """
-        all_task_outputs = set()
-        for itask in self.get_tasks():
-            for output in itask.state.outputs.get_completed():
-                all_task_outputs.add((itask.tdef.name,
-                                      str(itask.point),
-                                      output))
-        for itask in self.get_tasks():
-            # Try to satisfy itask if not already satisfied.
+        unmatched_tasks = self._unmatched_tasks
+        self._unmatched_tasks = {}
+        for itask in unmatched_tasks.values():
             if itask.state.prerequisites_are_not_all_satisfied():
-                itask.state.satisfy_me(all_task_outputs)
+                itask.state.satisfy_me(self._completed_outputs)
+
+        new_outputs = self._new_outputs
+        self._new_outputs = set()
+        touched_tasks = {}
+        for output in new_outputs:
+            touched_tasks.update(self._prereq_index.get(output, {}))
+        for id_, itask in touched_tasks.items():
+            if (
+                    id_ not in unmatched_tasks
+                    and itask.state.prerequisites_are_not_all_satisfied()
+            ):
+                itask.state.satisfy_me(new_outputs)
+                self._ready_check_tasks[id_] = itask
+        self._ready_check_tasks.update(unmatched_tasks)
+
+    def _add_to_dependency_index(self, itask):
+        """Add a task entering the main pool to the dependency index."""
+        for prereq in (
+                itask.state.prerequisites
+                + itask.state.suicide_prerequisites):
+            for output in prereq.satisfied:
+                self._prereq_index.setdefault(output, {})[
+                    itask.identity] = itask
+        name, point_str = itask.tdef.name, str(itask.point)
+        for message in itask.state.outputs.get_completed():
+            self._completed_outputs.add((name, point_str, message))
+            self._new_outputs.add((name, point_str, message))
+        itask.state.outputs.set_listener(
+            partial(self._set_output_completion, name, point_str))
+        self._unmatched_tasks[itask.identity] = itask
+
+    def _remove_from_dependency_index(self, itask):
+        """Remove a task leaving the main pool from the dependency index."""
+        for prereq in (
+                itask.state.prerequisites
+                + itask.state.suicide_prerequisites):
+            for output in prereq.satisfied:
+                itask_id_map = self._prereq_index.get(output)
+                if itask_id_map is None:
+                    continue
+                itask_id_map.pop(itask.identity, None)
+                if not itask_id_map:
+                    del self._prereq_index[output]
+        name, point_str = itask.tdef.name, str(itask.point)
+        for message in itask.state.outputs.get_completed():
+            self._completed_outputs.discard((name, point_str, message))
+            self._new_outputs.discard((name, point_str, message))
+        itask.state.outputs.set_listener(None)
+        self._unmatched_tasks.pop(itask.identity, None)
+
+    def _set_output_completion(self, name, point_str, message, is_completed):
+        """Record a change to the completion status of a task output.
+
+        Listener for the outputs of tasks in the main pool.
+        """
+        output = (name, point_str, message)
+        if is_completed:
+            self._completed_outputs.add(output)
+            self._new_outputs.add(output)
+        else:
+            self._completed_outputs.discard(output)
+            self._new_outputs.discard(output)
 
     def force_spawn(self, itask):
         """Spawn successor of itask."""
@@ -1136,6 +1339,13 @@ class TaskPool(object):
             if status and not itask.state(status, is_held=is_held):
                 LOG.info("[%s] -resetting state to %s", itask, status)
                 itask.state.reset(status, is_held=is_held)
+                if (
+                        status == TASK_STATUS_WAITING
+                        and itask.identity in self.pool.get(itask.point, {})
+                ):
+                    # Prerequisites are unset on reset to waiting, so they
+                    # must be matched against all completed outputs again.
+                    self._unmatched_tasks[itask.identity] = itask
                 if status in [TASK_STATUS_FAILED, TASK_STATUS_SUCCEEDED]:
                     itask.set_summary_time('finished',
                                            get_current_time_string())
@@ -378,6 +378,28 @@ class TaskProxy(object):
             and self.is_waiting_clock_done(now)
             and self.is_waiting_prereqs_done())
 
+    def get_ready_check_time(self, now):
+        """Return the next time (after now) when I may become ready or expire.
+
+        I.e. the time of my retry delay, clock trigger or expiry, if any.
+        Return None if no such time is set.
+
+        """
+        if self.state.is_held:
+            return None
+        if self.state.status in self.try_timers:
+            check_times = [self.try_timers[self.state.status].timeout]
+        elif self.state(TASK_STATUS_WAITING):
+            check_times = [self.clock_trigger_time, self.expire_time]
+        else:
+            return None
+        check_times = [
+            check_time for check_time in check_times
+            if check_time is not None and check_time >= now]
+        if check_times:
+            return min(check_times)
+        return None
+
     def reset_manual_trigger(self):
         """This is called immediately after manual trigger flag used."""
         if self.manual_trigger:
@@ -19,14 +19,17 @@ This module provides logic to:
 - Set up the directory structure on remote job hosts.
   - Copy suite service files to remote job hosts for communication clients.
   - Clean up of service files on suite shutdown.
+- Manage SSH control masters to remote job hosts.
 - Implement basic host select functionality.
 """
 
 import os
 from shlex import quote
 import re
+from shutil import rmtree
 from subprocess import Popen, PIPE, DEVNULL
 import tarfile
+from tempfile import mkdtemp
 from time import time
 
 from cylc.flow import LOG
@@ -35,6 +38,7 @@ from cylc.flow.exceptions import TaskRemoteMgmtError
 import cylc.flow.flags
 from cylc.flow.hostuserutil import is_remote, is_remote_host, is_remote_user
 from cylc.flow.pathutil import get_remote_suite_run_dir
+from cylc.flow.remote import SSH_CONTROL_DIR_ENV, SSHControlMaster
 from cylc.flow.subprocctx import SubProcContext
 from cylc.flow.suite_files import (
     SuiteFiles,
@@ -52,7 +56,17 @@ REMOTE_INIT_FAILED = 'REMOTE INIT FAILED'
 
 
 class TaskRemoteMgr(object):
-    """Manage task job remote initialisation, tidy, selection."""
+    """Manage task job remote initialisation, tidy, selection.
+
+    If "ssh control master" is set for a remote host, an SSH control master
+    (see cylc.flow.remote.SSHControlMaster) is started on remote init, and
+    the commands to the host connect through it. Control masters are checked
+    every SSH_MASTER_CHECK_INTERVAL seconds, restarted if they are not
+    healthy, and stopped on remote tidy.
+    """
+
+    # Interval in seconds between health checks of SSH control masters
+    SSH_MASTER_CHECK_INTERVAL = 60.0
 
     def __init__(self, suite, proc_pool):
         self.suite = suite
@@ -64,6 +78,11 @@ class TaskRemoteMgr(object):
         self.single_task_mode = False
         self.uuid_str = None
         self.ready = False
+        # self.ssh_masters = {(host, owner): SSHControlMaster, ...}
+        self.ssh_masters = {}
+        # Directory of the SSH control sockets
+        self.ssh_ctrl_dir = None
+        self.ssh_masters_check_time = None
 
     def remote_host_select(self, host_str):
         """Evaluate a task host string.
@@ -160,6 +179,8 @@ class TaskRemoteMgr(object):
                 del self.remote_init_map[(host, owner)]  # reset to allow retry
             return status
 
+        self._ssh_master_start(host, owner)
+
         # Determine what items to install
         comm_meth = glbl_cfg().get_host_item(
             'task communication method', host, owner)
@@ -192,8 +213,10 @@ class TaskRemoteMgr(object):
             open(uuid_fname, 'wb').write(str(self.uuid_str).encode())
         # Build the command
         cmd = ['cylc', 'remote-init']
+        kwargs = {}
         if is_remote_host(host):
             cmd.append('--host=%s' % host)
+            kwargs['host'] = host
         if is_remote_user(owner):
             cmd.append('--user=%s' % owner)
         if cylc.flow.flags.debug:
@@ -203,7 +226,8 @@ class TaskRemoteMgr(object):
         cmd.append(str(self.uuid_str))
         cmd.append(get_remote_suite_run_dir(host, owner, self.suite))
         self.proc_pool.put_command(
-            SubProcContext('remote-init', cmd, stdin_files=[tmphandle]),
+            SubProcContext(
+                'remote-init', cmd, stdin_files=[tmphandle], **kwargs),
             self._remote_init_callback,
             [host, owner, tmphandle])
         # None status: Waiting for command to finish
@@ -217,7 +241,8 @@ class TaskRemoteMgr(object):
         This method is called on suite shutdown, so we want nothing to hang.
         Timeout any incomplete commands after 10 seconds.
 
-        Also remove UUID file on suite host ".service/uuid".
+        Also remove UUID file on suite host ".service/uuid", and stop the SSH
+        control masters.
         """
         # Remove UUID file
         uuid_fname = os.path.join(
@@ -268,6 +293,80 @@ class TaskRemoteMgr(object):
                     TaskRemoteMgmtError.MSG_TIDY,
                     (host, owner), ' '.join(quote(item) for item in cmd),
                     proc.returncode, out, err))
+        # Stop SSH control masters
+        for master in self.ssh_masters.values():
+            master.stop()
+        self.ssh_masters.clear()
+        if self.ssh_ctrl_dir is not None:
+            rmtree(self.ssh_ctrl_dir, ignore_errors=True)
+            os.environ.pop(SSH_CONTROL_DIR_ENV, None)
+            self.ssh_ctrl_dir = None
+
+    def check_ssh_masters(self):
+        """Check SSH control masters, and restart those that are unhealthy.
+
+        A control master is unhealthy if its process has exited, or if it
+        does not respond to "ssh -O check" after running for
+        SSH_MASTER_CHECK_INTERVAL seconds.
+        """
+        now = time()
+        if not self.ssh_masters or (
+                self.ssh_masters_check_time is not None and
+                now < self.ssh_masters_check_time):
+            return
+        self.ssh_masters_check_time = now + self.SSH_MASTER_CHECK_INTERVAL
+        for (host, owner), master in self.ssh_masters.items():
+            if not master.is_alive():
+                if master.proc is not None:
+                    LOG.warning(
+                        '%s: SSH control master exited (%s), restarting\n%s',
+                        ' '.join(quote(item) for item in master.get_cmd()),
+                        master.proc.returncode, master.get_err())
+                self._ssh_master_start(host, owner)
+            elif now - master.start_time > self.SSH_MASTER_CHECK_INTERVAL:
+                self.proc_pool.put_command(
+                    SubProcContext(
+                        'ssh-control-check', master.get_check_cmd()),
+                    self._ssh_master_check_callback,
+                    [host, owner, master.proc])
+
+    def _ssh_master_check_callback(self, proc_ctx, host, owner, proc):
+        """Callback when "ssh -O check" for a control master exits."""
+        master = self.ssh_masters.get((host, owner))
+        if proc_ctx.ret_code == 0 or master is None or master.proc is not proc:
+            # Good status, or control master restarted or stopped since
+            return
+        LOG.warning(
+            '%s\nSSH control master not responding, restarting', proc_ctx)
+        master.stop()
+        self._ssh_master_start(host, owner)
+
+    def _ssh_master_start(self, host, owner):
+        """Start an SSH control master to [owner@]host, if configured.
+
+        Do nothing if the control master is already running.
+        """
+        if not glbl_cfg().get_host_item('ssh control master', host, owner):
+            return
+        master = self.ssh_masters.get((host, owner))
+        if master is not None and master.is_alive():
+            return
+        if self.ssh_ctrl_dir is None:
+            self.ssh_ctrl_dir = mkdtemp(prefix='cylc-ssh-')
+            # Tell commands run by the suite where the control sockets are
+            os.environ[SSH_CONTROL_DIR_ENV] = self.ssh_ctrl_dir
+        if master is None:
+            master = SSHControlMaster(host, owner, self.ssh_ctrl_dir)
+            self.ssh_masters[(host, owner)] = master
+        try:
+            master.start()
+        except OSError as exc:
+            LOG.warning(
+                '%s: cannot start SSH control master: %s',
+                ' '.join(quote(item) for item in master.get_cmd()), exc)
+        else:
+            LOG.debug(
+                '$ %s', ' '.join(quote(item) for item in master.get_cmd()))
 
     def _remote_host_select_callback(self, proc_ctx, cmd_str):
         """Callback when host select command exits"""
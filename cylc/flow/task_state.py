@@ -217,6 +217,9 @@ class TaskState(object):
             List of prerequisites that will cause the task to suicide.
         .time_updated (str):
             Time string of latest update time.
+        ._listener (callable):
+            Called as "listener(prev_status, status)" on change of status
+            or held state.
         .xtriggers (dict):
             xtriggers as {trigger (str): satisfied (boolean), ...}.
         ._is_satisfied (boolean):
@@ -239,6 +242,7 @@ class TaskState(object):
         "time_updated",
         "xtriggers",
         "_is_satisfied",
+        "_listener",
         "_suicide_is_satisfied",
     ]
 
@@ -248,6 +252,7 @@ class TaskState(object):
         self.is_held = is_held
         self.is_updated = False
         self.time_updated = None
+        self._listener = None
 
         self._is_satisfied = None
         self._suicide_is_satisfied = None
@@ -317,6 +322,10 @@ class TaskState(object):
                     self._is_satisfied = None
                     self._suicide_is_satisfied = None
 
+    def set_listener(self, listener):
+        """Set (or unset with None) the state change listener."""
+        self._listener = listener
+
     def xtriggers_all_satisfied(self):
         """Return True if all xtriggers are satisfied."""
         return all(self.xtriggers.values())
@@ -422,6 +431,7 @@ class TaskState(object):
             return False
 
         prev_message = str(self)
+        prev_status = self.status
 
         # perform the actual state change
         self.status, self.is_held = requested_status
@@ -429,6 +439,8 @@ class TaskState(object):
         self.time_updated = get_current_time_string()
         self.is_updated = True
         LOG.debug("[%s] -%s => %s", self.identity, prev_message, str(self))
+        if self._listener is not None:
+            self._listener(prev_status, self.status)
 
         if is_held:
             # only reset task outputs if not setting task to held
@@ -29,7 +29,7 @@ class TaskDef(object):
 
     # Memory optimization - constrain possible attributes to this list.
     __slots__ = [
-        "run_mode", "rtconfig", "start_point",
+        "run_mode", "_rtconfig", "start_point",
         "spawn_ahead", "sequences",
         "used_in_offset_trigger", "max_future_prereq_offset",
         "intercycle_offsets", "sequential", "is_coldstart",
@@ -45,7 +45,7 @@ class TaskDef(object):
             raise TaskDefError("Illegal task name: %s" % name)
 
         self.run_mode = run_mode
-        self.rtconfig = rtcfg
+        self._rtconfig = rtcfg
         self.start_point = start_point
         self.spawn_ahead = spawn_ahead
 
@@ -70,6 +70,17 @@ class TaskDef(object):
         self.name = name
         self.elapsed_times = deque(maxlen=self.MAX_LEN_ELAPSED_TIMES)
 
+    @property
+    def rtconfig(self):
+        """The dense runtime config of the task.
+
+        In lazy runtime mode, rtcfg is a function returning it, called on
+        every access, so the result should not be kept.
+        """
+        if callable(self._rtconfig):
+            return self._rtconfig()
+        return self._rtconfig
+
     def add_dependency(self, dependency, sequence):
         """Add a dependency to a named sequence.
 
@@ -144,6 +144,31 @@ class TestIntegerSequence(unittest.TestCase):
         sequence = IntegerSequence('R/P1!5', 1, 5)
         self.assertEqual(sequence.get_stop_point(), point_4)
 
+    def test_get_points(self):
+        """Test getting the points of a sequence in one call."""
+        sequence = IntegerSequence('R/1/P2!(5, R/1/P6)', 1, 20)
+        self.assertEqual(
+            [int(point) for point in sequence.get_points(
+                IntegerPoint(2), IntegerPoint(16))],
+            [3, 9, 11, 15])
+        self.assertEqual(
+            [int(point) for point in sequence.get_points(
+                IntegerPoint(1), limit=5)],
+            [3, 9, 11, 15, 17])
+        self.assertEqual(
+            [int(point) for point in sequence.get_points(IntegerPoint(16))],
+            [17])
+        self.assertEqual(
+            sequence.get_points(IntegerPoint(20), IntegerPoint(30)), [])
+        # Irregular (one-off) sequences are iterated.
+        sequence = IntegerSequence('R1', 4, 20)
+        self.assertEqual(
+            [int(point) for point in sequence.get_points(
+                IntegerPoint(1), IntegerPoint(10))],
+            [4])
+        with self.assertRaises(ValueError):
+            IntegerSequence('R/1/P1', 1).get_points(IntegerPoint(1))
+
     def test_simple(self):
         """Run some simple tests for integer cycling."""
         sequence = IntegerSequence('R/1/P3', 1, 10)
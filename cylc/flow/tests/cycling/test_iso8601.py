@@ -527,6 +527,77 @@ class TestISO8601Sequence(unittest.TestCase):
         self.assertFalse(
             sequence.is_on_sequence(ISO8601Point('20100809T0005')))
 
+    def test_get_points(self):
+        """Test getting the points of a sequence in one call."""
+        for sequence_string, start, stop, limit, values in [
+            ('PT6H!(T06, 20000102T00Z)', '20000101T01Z', '20000102T13Z',
+             None, ['20000101T1200Z', '20000101T1800Z', '20000102T1200Z']),
+            ('PT6H!(T06, 20000102T00Z)', '20000101T00Z', None, 4,
+             ['20000101T0000Z', '20000101T1200Z', '20000101T1800Z',
+              '20000102T1200Z']),
+            ('R3/P1D', '19990101T00Z', '20010101T00Z', None,
+             ['20000228T0000Z', '20000229T0000Z', '20000301T0000Z']),
+            # Irregular sequences are iterated.
+            ('P1M', '20000115T00Z', '20000401T00Z', None,
+             ['20000201T0000Z', '20000301T0000Z', '20000401T0000Z']),
+        ]:
+            sequence = ISO8601Sequence(
+                sequence_string, '20000101T00Z', '20000301T00Z')
+            if stop is not None:
+                stop = ISO8601Point(stop)
+            points = sequence.get_points(ISO8601Point(start), stop, limit)
+            self.assertEqual([str(point) for point in points], values)
+            # The same points as iterating one point at a time.
+            self.assertEqual(
+                points,
+                sequence._get_points_iteratively(
+                    ISO8601Point(start), stop, limit))
+
+
+class TestISO8601Point(unittest.TestCase):
+    """Contains unit tests for the ISO8601Point class."""
+
+    def setUp(self):
+        init(time_zone='Z')
+
+    def test_add_sub(self):
+        """Test adding and subtracting fixed and calendar intervals."""
+        point = ISO8601Point('20000131T0000Z')
+        for interval, value in [
+            ('PT6H', '20000131T0600Z'),
+            ('P1W', '20000207T0000Z'),
+            ('-PT30M', '20000130T2330Z'),
+        ]:
+            new_point = point + ISO8601Interval(interval)
+            self.assertEqual(str(new_point), value)
+            self.assertEqual(new_point - ISO8601Interval(interval), point)
+        new_point = point + ISO8601Interval('P1M')
+        self.assertEqual(str(new_point), '20000229T0000Z')
+        self.assertEqual(
+            str(new_point - ISO8601Interval('P1M')), '20000129T0000Z')
+        # Chained adds, string value produced lazily
+        new_point = point
+        for _ in range(30):
+            new_point += ISO8601Interval('PT1H')
+        self.assertEqual(str(new_point), '20000201T0600Z')
+        self.assertEqual(str(new_point - point), 'P1DT6H')
+
+    def test_cmp_hash(self):
+        """Test ordering and hashing of points."""
+        points = [
+            ISO8601Point('20000101T0000Z') + ISO8601Interval('PT%dH' % hour)
+            for hour in (3, 0, 2, 1)]
+        self.assertEqual(
+            [str(point) for point in sorted(points)],
+            ['20000101T0000Z', '20000101T0100Z', '20000101T0200Z',
+             '20000101T0300Z'])
+        self.assertEqual(min(points), ISO8601Point('20000101T0000Z'))
+        # Same point in a different time zone
+        point = ISO8601Point('20000101T0100+01')
+        self.assertEqual(point, ISO8601Point('20000101T0000Z'))
+        self.assertEqual(hash(point), hash(ISO8601Point('20000101T0000Z')))
+        self.assertEqual(len(set(points)), 4)
+
 
 class TestRelativeCyclePoint(unittest.TestCase):
     """Contains unit tests for cycle point relative to current time."""
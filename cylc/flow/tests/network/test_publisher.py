@@ -14,15 +14,22 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from unittest import main
+import asyncio
+from unittest import main, mock
 from time import sleep
 
+import zmq
+
 from cylc.flow import LOG
 from cylc.flow.cfgspec.glbl_cfg import glbl_cfg
 from cylc.flow.tests.util import CylcWorkflowTestCase, create_task_proxy
-from cylc.flow.data_store_mgr import DataStoreMgr, DELTAS_MAP
-from cylc.flow.network.publisher import WorkflowPublisher, serialize_data
-from cylc.flow.network.subscriber import WorkflowSubscriber
+from cylc.flow.data_store_mgr import (
+    DataStoreMgr, DELTAS_MAP, TASK_PROXIES, WORKFLOW, generate_checksum)
+from cylc.flow.network.publisher import (
+    DeltaFilter, WorkflowPublisher, get_element_type, get_filter_topic,
+    serialize_data)
+from cylc.flow.network.subscriber import (
+    WorkflowSubscriber, process_delta_msg)
 
 
 def get_port_range():
@@ -33,6 +40,14 @@ def get_port_range():
 PORT_RANGE = get_port_range()
 
 
+class StalledSubscriber(WorkflowSubscriber):
+    """Subscriber with a minimal receive queue, for never receiving."""
+
+    def _socket_options(self):
+        super()._socket_options()
+        self.socket.rcvhwm = 1
+
+
 def test_serialize_data():
     str1 = 'hello'
     assert serialize_data(str1, None) == str1
@@ -40,6 +55,22 @@ def test_serialize_data():
     assert serialize_data(str1, bytes, 'utf-8') == bytes(str1, 'utf-8')
 
 
+def test_get_filter_topic():
+    topic = get_filter_topic(
+        'task_proxies', max_point='2', namespace='f*', states=['b', 'a'])
+    assert topic == (
+        b'filter:task_proxies?max_point=2&namespace=f%2A&state=a%2Cb;')
+    assert get_filter_topic('jobs') == b'filter:jobs?;'
+    assert get_element_type(topic.decode('utf-8')) == 'task_proxies'
+    assert get_element_type('jobs') == 'jobs'
+    try:
+        get_filter_topic(WORKFLOW)
+    except ValueError:
+        pass
+    else:
+        assert False, 'workflow filter topic'
+
+
 class TestWorkflowPublisher(CylcWorkflowTestCase):
 
     suite_name = "five"
@@ -83,7 +114,8 @@ class TestWorkflowPublisher(CylcWorkflowTestCase):
         self.scheduler.data_store_mgr.initiate_data_model()
         self.workflow_id = self.scheduler.data_store_mgr.workflow_id
         self.publisher = WorkflowPublisher(
-            self.suite_name, threaded=False, daemon=True)
+            self.suite_name, threaded=False, daemon=True,
+            data_store_mgr=self.scheduler.data_store_mgr)
         self.pub_data = self.scheduler.data_store_mgr.get_publish_deltas()
 
     def tearDown(self):
@@ -115,6 +147,124 @@ class TestWorkflowPublisher(CylcWorkflowTestCase):
             self.publisher.publish(None)
         self.assertIn('publish: ', cm.output[0])
 
+    def test_delta_filter(self):
+        """Test filtering deltas."""
+        for topic in (b'filter:task_proxies?state=;', b'filter:foo?;',
+                      b'filter:task_proxies?max_point=x;'):
+            with self.assertRaises(ValueError):
+                DeltaFilter(topic)
+        data = self.scheduler.data_store_mgr.data[self.workflow_id]
+        delta = DELTAS_MAP[TASK_PROXIES]()
+        delta.deltas.extend(data[TASK_PROXIES].values())
+        delta_filter = DeltaFilter(get_filter_topic(
+            TASK_PROXIES, max_point='20130808T00', namespace='f*'))
+        filtered = delta_filter.filter(delta, data)
+        self.assertEqual(
+            ['foo'], [element.name for element in filtered.deltas])
+        foo_id = filtered.deltas[0].id
+        self.assertEqual({foo_id}, delta_filter.ids)
+        self.assertEqual(
+            generate_checksum([data[TASK_PROXIES][foo_id].stamp]),
+            filtered.checksum)
+        # Snapshots hold the matching elements in full.
+        snapshot = delta_filter.snapshot(data)
+        self.assertTrue(snapshot.reloaded)
+        self.assertEqual([data[TASK_PROXIES][foo_id]], list(snapshot.deltas))
+        self.assertEqual(filtered.checksum, snapshot.checksum)
+        # Elements no longer matching are pruned.
+        delta_filter = DeltaFilter(get_filter_topic(
+            TASK_PROXIES, states=['waiting']))
+        for element in data[TASK_PROXIES].values():
+            element.state = 'waiting'
+        delta_filter.reset(data)
+        self.assertEqual(set(data[TASK_PROXIES]), delta_filter.ids)
+        data[TASK_PROXIES][foo_id].state = 'running'
+        delta = DELTAS_MAP[TASK_PROXIES]()
+        delta.deltas.add(id=foo_id, state='running')
+        filtered = delta_filter.filter(delta, data)
+        self.assertEqual([foo_id], list(filtered.pruned))
+        self.assertEqual(0, len(filtered.deltas))
+        self.assertIsNone(delta_filter.filter(delta, data))
+
+    def test_publish_filter(self):
+        """Test publishing to a filter topic."""
+        self.publisher.start(*PORT_RANGE)
+        topic = get_filter_topic(TASK_PROXIES, namespace='bar')
+        subscriber = WorkflowSubscriber(
+            self.suite_name,
+            host=self.scheduler.host,
+            port=self.publisher.port,
+            topics=[topic])
+        sleep(1.0)
+        self.publisher.publish(self.pub_data)
+        self.assertIn(topic, self.publisher.filters)
+        btopic, msg = subscriber.loop.run_until_complete(
+            subscriber.socket.recv_multipart())
+        self.assertEqual(topic, btopic)
+        _, delta = process_delta_msg(btopic, msg, None)
+        self.assertEqual(
+            {'bar'}, {element.name for element in delta.deltas})
+        subscriber.socket.recv_multipart(flags=zmq.NOBLOCK)
+        # Another subscriber to the topic gets a snapshot, for all to resync.
+        other = WorkflowSubscriber(
+            self.suite_name,
+            host=self.scheduler.host,
+            port=self.publisher.port,
+            topics=[topic])
+        sleep(1.0)
+        self.publisher.publish([])
+        for sub in (subscriber, other):
+            btopic, msg = sub.loop.run_until_complete(asyncio.wait_for(
+                sub.socket.recv_multipart(), 5.0))
+            _, snapshot = process_delta_msg(btopic, msg, None)
+            self.assertTrue(snapshot.reloaded)
+            self.assertEqual(
+                {'bar'}, {element.name for element in snapshot.deltas})
+        subscriber.stop()
+        other.stop()
+
+    @mock.patch('cylc.flow.network.publisher.MAX_PENDING_TIME', 0.2)
+    def test_publish_stalled_subscriber(self):
+        """Test deltas are merged for, but not held back by, a stalled
+        subscriber."""
+        self.publisher.start(*PORT_RANGE)
+        self.publisher.socket.sndhwm = 10
+        topic = TASK_PROXIES.encode('utf-8')
+        stalled, healthy = [
+            subscriber_cls(
+                self.suite_name,
+                host=self.scheduler.host,
+                port=self.publisher.port,
+                topics=[topic, b'shutdown'])
+            for subscriber_cls in (StalledSubscriber, WorkflowSubscriber)]
+        sleep(1.0)
+        # More than the stalled subscriber's queues and socket buffers hold.
+        ids = set()
+        n_merged = 0
+        with self.assertLogs(LOG, level='WARNING') as cm:
+            for num in range(200):
+                delta = DELTAS_MAP[TASK_PROXIES]()
+                delta.deltas.add(id=str(num), name='x' * 100000)
+                self.publisher.publish([(topic, delta, 'SerializeToString')])
+                if topic in self.publisher.pending:
+                    sleep(0.01)
+                    continue
+                btopic, msg = healthy.loop.run_until_complete(
+                    asyncio.wait_for(healthy.socket.recv_multipart(), 5.0))
+                _, delta = process_delta_msg(btopic, msg, None)
+                ids.update(element.id for element in delta.deltas)
+                n_merged += len(delta.deltas) > 1
+        self.assertIn('behind for over', cm.output[0])
+        self.assertTrue(n_merged)
+        self.assertEqual({str(num) for num in range(200)}, ids)
+        self.publisher.publish([(b'shutdown', b'bye')])
+        self.assertEqual(
+            [b'shutdown', b'bye'],
+            healthy.loop.run_until_complete(asyncio.wait_for(
+                healthy.socket.recv_multipart(), 5.0)))
+        stalled.stop()
+        healthy.stop()
+
     def test_start(self):
         """Test publisher start."""
         self.assertIsNone(self.publisher.loop)
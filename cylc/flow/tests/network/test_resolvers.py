@@ -20,7 +20,7 @@ import asyncio
 
 from cylc.flow.tests.util import CylcWorkflowTestCase, create_task_proxy
 from cylc.flow.data_store_mgr import (
-    DataStoreMgr, ID_DELIM, EDGES, TASK_PROXIES, WORKFLOW
+    DataStoreMgr, ID_DELIM, EDGES, FAMILY_PROXIES, TASK_PROXIES, WORKFLOW
 )
 from cylc.flow.network.schema import parse_node_id
 from cylc.flow.network.resolvers import node_filter, Resolvers
@@ -156,6 +156,47 @@ class TestResolvers(CylcWorkflowTestCase):
             if n in self.data[TASK_PROXIES].values()]
         self.assertEqual(1, len(nodes))
 
+    def test_get_nodes_all_indexed(self):
+        """Test node filtering using the data store indexes gives the
+        same nodes as a scan."""
+        data_store_mgr = self.scheduler.data_store_mgr
+        data_store_mgr.update_data_structure(self.task_pool.get_all_tasks())
+        indexed = Resolvers(
+            data_store_mgr.data, indexes=data_store_mgr.indexes,
+            schd=self.scheduler)
+        index = data_store_mgr.indexes[self.workflow_id][TASK_PROXIES]
+        self.assertEqual(set(self.data[TASK_PROXIES]), set(index.keys))
+        point = self.data[TASK_PROXIES][self.node_ids[0]].cycle_point
+        for ids, states, is_held in [
+                ([f'{point}{ID_DELIM}foo'], [], None),
+                ([f'{point[:4]}*{ID_DELIM}f*'], [], None),
+                (['foo', 'b*:waiting'], [], None),
+                (['root'], [], None),
+                (['*o*'], ['waiting'], None),
+                ([], ['waiting', 'failed'], None),
+                ([], [], True),
+                ([], [], None)]:
+            args = deepcopy(NODE_ARGS)
+            args['ghosts'] = True
+            args['ids'] = [parse_node_id(id_, TASK_PROXIES) for id_ in ids]
+            args['states'] = states
+            args['is_held'] = is_held
+            for node_type in TASK_PROXIES, FAMILY_PROXIES:
+                expected = _run_coroutine(
+                    self.resolvers.get_nodes_all(node_type, args))
+                nodes = _run_coroutine(
+                    indexed.get_nodes_all(node_type, args))
+                self.assertEqual(
+                    sorted(n.id for n in expected),
+                    sorted(n.id for n in nodes))
+        args = deepcopy(NODE_ARGS)
+        args['ids'] = [parse_node_id('foo', TASK_PROXIES)]
+        self.assertEqual(
+            {n_id for n_id in self.node_ids if n_id.endswith('|foo')},
+            index.get_candidates(args))
+        args['ids'] = [parse_node_id('*o*', TASK_PROXIES)]
+        self.assertIsNone(index.get_candidates(args))
+
     def test_get_nodes_by_ids(self):
         """Test method returning workflow(s) node messages
         who's ID is a match to any given."""
@@ -16,9 +16,11 @@
 
 import tempfile
 import unittest
+from unittest import mock
 
 import jinja2
 
+from cylc.flow.parsec import jinja2support
 from cylc.flow.parsec.jinja2support import *
 
 
@@ -83,6 +85,54 @@ class TestJinja2support(unittest.TestCase):
             jinja2process(lines, template_dir, template_vars=None)
             self.assertIn('jinja2.UndefinedError', str(exc))
 
+    def test_jinja2process_cache(self):
+        lines = ["skipped", "{% for i in range(n) %}", "i={{ i }}",
+                 "{% endfor %}"]
+        with tempfile.TemporaryDirectory() as template_dir:
+            cache_dir = os.path.join(template_dir, 'cache')
+
+            r = jinja2process(lines, template_dir, {'n': 2}, cache_dir)
+
+            self.assertEqual(['i=0', 'i=1'], r)
+            self.assertEqual(1, len(os.listdir(cache_dir)))
+            # The environment is reused.
+            env = jinja2support._ENVIRONMENTS[(template_dir, cache_dir)][1]
+            r = jinja2process(lines, template_dir, {'n': 1}, cache_dir)
+            self.assertEqual(['i=0'], r)
+            self.assertIs(
+                env,
+                jinja2support._ENVIRONMENTS[(template_dir, cache_dir)][1])
+            # A new environment loads the compiled template from the cache.
+            del jinja2support._ENVIRONMENTS[(template_dir, cache_dir)]
+            with mock.patch.object(
+                    jinja2.Environment, 'compile',
+                    side_effect=AssertionError('compiled')):
+                r = jinja2process(lines, template_dir, {'n': 3}, cache_dir)
+            self.assertEqual(['i=0', 'i=1', 'i=2'], r)
+            # Changed source is compiled again.
+            lines[2] = "j={{ i }}"
+            r = jinja2process(lines, template_dir, {'n': 1}, cache_dir)
+            self.assertEqual(['j=0'], r)
+            del jinja2support._ENVIRONMENTS[(template_dir, cache_dir)]
+
+    def test_jinja2process_cache_new_plugin(self):
+        """Test a cached environment picks up a new Jinja2 filter."""
+        lines = ["skipped", "{{ 1 }}"]
+        with tempfile.TemporaryDirectory() as template_dir:
+            cache_dir = os.path.join(template_dir, 'cache')
+            self.assertEqual(
+                ['1'], jinja2process(lines, template_dir, {}, cache_dir))
+            filters_dir = os.path.join(template_dir, 'Jinja2Filters')
+            os.mkdir(filters_dir)
+            with open(os.path.join(filters_dir, 'cylctestadd1.py'), 'w') as f:
+                f.write("def cylctestadd1(value):\n    return value + 1\n")
+            lines[1] = "{{ 1 | cylctestadd1 }}"
+            self.assertEqual(
+                ['2'], jinja2process(lines, template_dir, {}, cache_dir))
+            del jinja2support._ENVIRONMENTS[(template_dir, cache_dir)]
+            sys.path.remove(os.path.abspath(filters_dir))
+            del sys.modules['cylctestadd1']
+
     def test_pymoduleloader(self):
         temp_directory = tempfile.mkdtemp(prefix='cylc', suffix='test_jinja2')
         filters_dir = os.path.join(temp_directory, 'Jinja2filters')
@@ -14,6 +14,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from collections import OrderedDict
 import unittest
 
 from cylc.flow.parsec.util import *
@@ -116,6 +117,32 @@ class TestUtil(unittest.TestCase):
         self.assertEqual(str(source_2), str(target_2))
         self.assertEqual(str(source_3), str(target_3))
 
+    # --- layer
+
+    def test_layer(self):
+        base = OrderedDictWithDefaults()
+        base["name"] = "sea"
+        base["environment"] = OrderedDictWithDefaults()
+        base["environment"]["FOO"] = "foo"
+        base["directives"] = OrderedDictWithDefaults()
+        base["directives"]["-l"] = "walltime=1"
+        source = OrderedDictWithDefaults()
+        source["environment"] = OrderedDictWithDefaults()
+        source["environment"]["BAR"] = ["bar"]
+        source["origin"] = "fridge"
+
+        target = layer(base, source)
+
+        expected = pdeepcopy(base)
+        replicate(expected, source)
+        self.assertEqual(str(expected), str(target))
+        # Items not overridden are shared, others are not.
+        self.assertIs(base["directives"], target["directives"])
+        self.assertIsNot(base["environment"], target["environment"])
+        self.assertIsNot(source["environment"]["BAR"],
+                         target["environment"]["BAR"])
+        self.assertNotIn("BAR", base["environment"])
+
     # --- pdeepcopy
 
     def test_pdeepcopy(self):
@@ -301,6 +328,37 @@ class TestUtil(unittest.TestCase):
         with self.assertRaises(Exception):
             m_override(target, source)
 
+    # --- expand_section
+
+    def test_expand_section(self):
+        defaults = OrderedDictWithDefaults()
+        defaults["script"] = None
+        defaults["environment"] = OrderedDictWithDefaults()
+        defaults["job"] = OrderedDictWithDefaults()
+        defaults["job"]["batch system"] = "background"
+        defaults["job"]["retry delays"] = []
+        sparse = OrderedDictWithDefaults()
+        sparse["script"] = "true"
+        sparse["environment"] = OrderedDictWithDefaults()
+        sparse["environment"]["FOO"] = "foo"
+        sparse["job"] = OrderedDictWithDefaults()
+        sparse["job"]["retry delays"] = [1, 2]
+
+        target = expand_section(sparse, defaults)
+
+        self.assertEqual("true", target["script"])
+        self.assertEqual("foo", target["environment"]["FOO"])
+        self.assertEqual("background", target["job"]["batch system"])
+        self.assertEqual([1, 2], target["job"]["retry delays"])
+        self.assertIsNot(sparse["job"]["retry delays"],
+                         target["job"]["retry delays"])
+        # Defaults are shared, not copied.
+        self.assertIs(defaults["job"], target["job"].defaults_)
+        self.assertNotIn("batch system", OrderedDict.keys(target["job"]))
+        self.assertIs(defaults["environment"],
+                      expand_section(OrderedDictWithDefaults(),
+                                     defaults)["environment"])
+
     # --- un_many
 
     def test_un_many(self):
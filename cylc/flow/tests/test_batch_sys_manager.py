@@ -0,0 +1,186 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from contextlib import redirect_stdout
+from io import StringIO
+import json
+from pathlib import Path
+import re
+import sys
+from tempfile import TemporaryDirectory
+from time import sleep, time
+from types import ModuleType
+import unittest
+from unittest import mock
+
+from cylc.flow.batch_sys_manager import BatchSysManager
+from cylc.flow.batch_sys_poll_cache import BatchSysPollCache
+
+
+class SlowHandler():
+    """Batch system that takes a second to submit each job."""
+    SUBMIT_CMD_TMPL = "bash -c 'sleep 1; echo \"$0\"' %(job)s"
+    REC_ID_FROM_SUBMIT_OUT = re.compile(r"\A(?P<id>\S+)\Z")
+
+
+class SubmitHandler():
+    """Batch system with a custom submit, which records its concurrency."""
+    REC_ID_FROM_SUBMIT_OUT = re.compile(r"\A(?P<id>\S+)\Z")
+
+    def __init__(self):
+        self.n_calls = 0
+        self.max_calls = 0
+
+    def submit(self, job_file_path, submit_opts):
+        self.n_calls += 1
+        self.max_calls = max(self.max_calls, self.n_calls)
+        sleep(0.1)
+        self.n_calls -= 1
+        return 0, job_file_path + "\n", ""
+
+
+class ManyHandler():
+    """Batch system that submits multiple jobs in one go."""
+    SUBMIT_CMD_TMPL = "false"
+    REC_ID_FROM_SUBMIT_OUT = re.compile(r"\A(?P<id>\d+)\Z")
+
+    def __init__(self):
+        self.calls = []
+
+    def submit_many(self, job_file_paths, submit_opts_list):
+        self.calls.append(job_file_paths)
+        return [(0, "%d\n" % (i + 1), "") for i in range(len(job_file_paths))]
+
+
+class PollHandler():
+    """Batch system with only job "11" in it."""
+
+    @staticmethod
+    def get_poll_many_cmd(_):
+        return ['echo', '11']
+
+
+class TestBatchSysManager(unittest.TestCase):
+
+    def setUp(self):
+        self.handlers = {
+            'slow_batch_sys': SlowHandler(),
+            'submit_batch_sys': SubmitHandler(),
+            'many_batch_sys': ManyHandler(),
+            'poll_batch_sys': PollHandler(),
+        }
+        for name, handler in self.handlers.items():
+            module = ModuleType(name)
+            module.BATCH_SYS_HANDLER = handler
+            sys.modules[name] = module
+
+    def tearDown(self):
+        for name in self.handlers:
+            sys.modules.pop(name, None)
+            BatchSysManager._INSTANCES.pop(name, None)
+
+    @staticmethod
+    def _jobs_submit(job_log_root, jobs):
+        """Write job files, run jobs_submit, and return its summary lines."""
+        for job_log_dir, header in jobs:
+            job_dir = Path(job_log_root, job_log_dir)
+            job_dir.mkdir(parents=True)
+            (job_dir / 'job').write_text('#!/bin/bash\n%s\ntrue\n' % header)
+            (job_dir / 'job').chmod(0o755)
+        out = StringIO()
+        with redirect_stdout(out):
+            BatchSysManager().jobs_submit(
+                job_log_root, [job_log_dir for job_log_dir, _ in jobs])
+        return [
+            line.split('|', 1)[1]
+            for line in out.getvalue().splitlines()
+            if line.startswith(BatchSysManager.OUT_PREFIX_SUMMARY)]
+
+    def test_jobs_submit_concurrent(self):
+        """Test jobs are submitted concurrently, and reported in order."""
+        with TemporaryDirectory() as job_log_root:
+            jobs = [
+                ('1/t%d/01' % i, '# Job submit method: slow_batch_sys')
+                for i in range(BatchSysManager.SUBMIT_MAX_WORKERS)]
+            start = time()
+            lines = self._jobs_submit(job_log_root, jobs)
+            self.assertLess(time() - start, len(jobs) - 1)
+            self.assertEqual(lines, [
+                '%s|0|%s/%s/job' % (job_log_dir, job_log_root, job_log_dir)
+                for job_log_dir, _ in jobs])
+
+    def test_jobs_submit_custom_submit(self):
+        """Test jobs are submitted one at a time via a custom "submit"."""
+        with TemporaryDirectory() as job_log_root:
+            jobs = [
+                ('1/t%d/01' % i, '# Job submit method: submit_batch_sys')
+                for i in range(BatchSysManager.SUBMIT_MAX_WORKERS)]
+            lines = self._jobs_submit(job_log_root, jobs)
+            self.assertEqual(self.handlers['submit_batch_sys'].max_calls, 1)
+            self.assertEqual(lines, [
+                '%s|0|%s/%s/job' % (job_log_dir, job_log_root, job_log_dir)
+                for job_log_dir, _ in jobs])
+
+    def test_jobs_submit_many(self):
+        """Test jobs are submitted via "submit_many", where possible."""
+        with TemporaryDirectory() as job_log_root:
+            lines = self._jobs_submit(job_log_root, [
+                ('1/a/01', '# Job submit method: many_batch_sys'),
+                ('1/b/01', '# Job submit method: many_batch_sys\n'
+                           '# Job submit command template: echo 99'),
+                ('1/c/01', '# Job submit method: many_batch_sys'),
+                ('1/d/01', '# no job submit method'),
+            ])
+            self.assertEqual(self.handlers['many_batch_sys'].calls, [[
+                str(Path(job_log_root, '1', name, '01', 'job'))
+                for name in ('a', 'c')]])
+            self.assertIn(
+                'CYLC_BATCH_SYS_JOB_ID=2',
+                Path(job_log_root, '1', 'c', '01', 'job.status').read_text())
+        self.assertEqual(lines, [
+            '1/a/01|0|1', '1/b/01|0|99', '1/c/01|0|2', '1/d/01|1|'])
+
+    def test_jobs_poll_cache(self):
+        """Test suites share batch system queries via a poll cache."""
+        query = BatchSysManager._jobs_poll_batch_sys_query
+        with TemporaryDirectory() as temp_dir, mock.patch.object(
+                BatchSysManager, '_get_poll_cache',
+                return_value=BatchSysPollCache(
+                    temp_dir, 'poll_batch_sys', 60.0)), mock.patch.object(
+                BatchSysManager, '_jobs_poll_batch_sys_query',
+                side_effect=query) as mock_query:
+            results = []
+            # Suite "a" polls job 11 twice, suite "b" polls job 12
+            for suite, job_id in [('a', '11'), ('b', '12'), ('a', '11')]:
+                job_dir = Path(temp_dir, suite, '1', 't', '01')
+                job_dir.mkdir(parents=True, exist_ok=True)
+                (job_dir / 'job.status').write_text(
+                    'CYLC_BATCH_SYS_NAME=poll_batch_sys\n'
+                    'CYLC_BATCH_SYS_JOB_ID=%s\n' % job_id)
+                out = StringIO()
+                with redirect_stdout(out):
+                    BatchSysManager().jobs_poll(
+                        str(Path(temp_dir, suite)), ['1/t/01'])
+                results.append(json.loads(
+                    out.getvalue().split('|', 2)[2])['batch_sys_exit_polled'])
+        self.assertEqual(results, [0, 1, 0])
+        self.assertEqual(
+            [call[0][1] for call in mock_query.call_args_list],
+            [['11'], ['12']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from tempfile import TemporaryDirectory
+import unittest
+from unittest import mock
+
+from cylc.flow.batch_sys_poll_cache import BatchSysPollCache
+
+
+class TestBatchSysPollCache(unittest.TestCase):
+
+    def setUp(self):
+        self.queries = []
+        self.present_ids = {'1', '2', '3'}
+
+    def query(self, job_ids):
+        self.queries.append(job_ids)
+        if self.present_ids is None:
+            return None
+        return self.present_ids.intersection(job_ids)
+
+    def test_get_present_ids(self):
+        """Test queries are shared by suites until the cache expires."""
+        with TemporaryDirectory() as cache_dir, mock.patch(
+                'cylc.flow.batch_sys_poll_cache.time') as mock_time:
+            # Caches of two suites
+            caches = [
+                BatchSysPollCache(cache_dir, 'slurm', 30.0) for _ in range(2)]
+            mock_time.return_value = 100.0
+            self.assertEqual(
+                caches[0].get_present_ids(['1', '4'], self.query), {'1'})
+            self.assertEqual(
+                caches[1].get_present_ids(['1'], self.query), {'1'})
+            # New ID queried on its own
+            self.assertEqual(
+                caches[1].get_present_ids(['1', '2'], self.query),
+                {'1', '2'})
+            self.assertEqual(self.queries, [['1', '4'], ['2']])
+            # Cache expired: all wanted IDs queried in one go
+            mock_time.return_value = 130.0
+            self.present_ids = {'2'}
+            self.assertEqual(
+                caches[0].get_present_ids(['1', '4'], self.query), set())
+            self.assertEqual(
+                caches[1].get_present_ids(['1', '2'], self.query), {'2'})
+            self.assertEqual(self.queries[2:], [['1', '2', '4']])
+            # IDs no longer registered are no longer queried
+            mock_time.return_value = 430.0
+            self.assertEqual(
+                caches[0].get_present_ids(['3'], self.query), set())
+            self.assertEqual(self.queries[3:], [['3']])
+            # Failures are not cached
+            self.present_ids = None
+            mock_time.return_value = 460.0
+            self.assertIsNone(caches[0].get_present_ids(['3'], self.query))
+            self.present_ids = {'3'}
+            self.assertEqual(
+                caches[0].get_present_ids(['3'], self.query), {'3'})
+            self.assertEqual(self.queries[4:], [['3'], ['3']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from threading import Thread
+
+from cylc.flow.cache import LRUCache, get_cache_stats, lru_memoize
+
+
+def test_lru_cache():
+    """Least recently used items are evicted, and stats counted."""
+    cache = LRUCache('test_lru_cache', 2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)  # evicts 'b'
+    assert cache.get('b') is None
+    assert cache.get('b', 'missing') == 'missing'
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert len(cache) == 2
+    assert get_cache_stats()['test_lru_cache'] == {
+        'size': 2, 'hits': 3, 'misses': 2, 'evictions': 1}
+    # Caches with the same name share stats
+    other_cache = LRUCache('test_lru_cache', 2)
+    other_cache.put('a', 1)
+    assert other_cache.get('a') == 1
+    assert get_cache_stats()['test_lru_cache'] == {
+        'size': 3, 'hits': 4, 'misses': 2, 'evictions': 1}
+    del other_cache
+    assert get_cache_stats()['test_lru_cache']['size'] == 2
+
+
+def test_lru_memoize():
+    """Function results, including None, are cached."""
+    calls = []
+
+    @lru_memoize(2)
+    def func(arg):
+        calls.append(arg)
+        return None
+
+    for arg in 1, 1, 2, 3, 1:
+        assert func(arg) is None
+    assert calls == [1, 2, 3, 1]
+    assert get_cache_stats()[func.__qualname__] == {
+        'size': 2, 'hits': 1, 'misses': 4, 'evictions': 2}
+
+
+def test_get_cache_stats_threads():
+    """Stats can be got while caches are created in another thread."""
+    def create_caches():
+        for i in range(5000):
+            LRUCache('test_get_cache_stats_threads_%d' % i, 1)
+
+    thread = Thread(target=create_caches)
+    thread.start()
+    while thread.is_alive():
+        get_cache_stats()
+    thread.join()
+    assert 'test_get_cache_stats_threads_4999' in get_cache_stats()
@@ -18,9 +18,17 @@ import os
 import pytest
 from tempfile import TemporaryDirectory, NamedTemporaryFile
 from pathlib import Path
+from cylc.flow.cfgspec.glbl_cfg import glbl_cfg
 from cylc.flow.config import SuiteConfig
 
 
+def as_dict(cfg):
+    """Return a nested dict of the items of cfg, including defaults."""
+    if isinstance(cfg, dict):
+        return {key: as_dict(cfg[key]) for key in cfg.keys()}
+    return cfg
+
+
 def get_test_inheritance_quotes():
     """Provide test data for test_family_inheritance_and_quotes."""
     return [
@@ -211,3 +219,116 @@ class TestSuiteConfig(object):
                         ['MAINFAM_major1_minor10'])
                 assert 'goodbye_0_major1_minor10' in \
                        config.runtime['descendants']['SOMEFAM']
+
+    def test_cache(self, monkeypatch):
+        """Test the processed config is loaded from the cache if up to date.
+        """
+        global_config = glbl_cfg()
+
+        class CacheGlobalConfig(object):
+            """Global config with the suite config cache on."""
+
+            @staticmethod
+            def get(keys):
+                if keys == ['cylc', 'suite config cache']:
+                    return True
+                return global_config.get(keys)
+
+        monkeypatch.setattr(
+            'cylc.flow.config.glbl_cfg', lambda: CacheGlobalConfig)
+        with TemporaryDirectory() as temp_dir:
+            os.mkdir(os.path.join(temp_dir, '.service'))
+            suite_rc = Path(temp_dir, 'suite.rc')
+            suite_rc.write_text('''#!Jinja2
+[scheduling]
+    initial cycle point = 2018-01-01
+    [[graph]]
+        P1D = '@wall_clock => foo{{ N }} => bar'
+''')
+            config = SuiteConfig(
+                'cached', str(suite_rc), template_vars={'N': 1},
+                run_dir=temp_dir)
+            assert os.path.exists(config.get_cache_path())
+
+            def raw_suite_config(*_):
+                raise AssertionError('suite.rc processed')
+
+            monkeypatch.setattr(
+                'cylc.flow.config.RawSuiteConfig', raw_suite_config)
+            cached_config = SuiteConfig(
+                'cached', str(suite_rc), template_vars={'N': 1},
+                run_dir=temp_dir)
+            assert sorted(cached_config.taskdefs) == ['bar', 'foo1']
+            assert cached_config.sequences == config.sequences
+            assert 'wall_clock' in cached_config.xtrigger_mgr.functx_map
+            # Different template variables or file content: not cached.
+            with pytest.raises(AssertionError):
+                SuiteConfig(
+                    'cached', str(suite_rc), template_vars={'N': 2},
+                    run_dir=temp_dir)
+            with suite_rc.open(mode='a') as handle:
+                handle.write('# comment\n')
+            with pytest.raises(AssertionError):
+                SuiteConfig(
+                    'cached', str(suite_rc), template_vars={'N': 1},
+                    run_dir=temp_dir)
+
+    def test_lazy_runtime(self, monkeypatch):
+        """Test namespace runtime configs are resolved on access in lazy
+        runtime mode, equal to those of the default mode."""
+        global_config = glbl_cfg()
+
+        class LazyGlobalConfig(object):
+            """Global config with lazy runtime mode on."""
+
+            lazy = True
+
+            @classmethod
+            def get(cls, keys):
+                if keys == ['cylc', 'lazy runtime']:
+                    return cls.lazy
+                if keys == ['cylc', 'runtime cache size']:
+                    return 2
+                return global_config.get(keys)
+
+        monkeypatch.setattr(
+            'cylc.flow.config.glbl_cfg', lambda: LazyGlobalConfig)
+        with TemporaryDirectory() as temp_dir:
+            suite_rc = Path(temp_dir, 'suite.rc')
+            suite_rc.write_text('''
+[scheduling]
+    [[graph]]
+        R1 = 'foo & bar => baz'
+[runtime]
+    [[root]]
+        [[[meta]]]
+            URL = http://%(suite_name)s/%(task_name)s
+    [[FAM]]
+        script = echo FAM
+        [[[environment]]]
+            FAM = fam
+    [[foo, bar]]
+        inherit = FAM
+        [[[environment]]]
+            X = x
+''')
+            config = SuiteConfig('lazy', str(suite_rc), run_dir=temp_dir)
+            runtime = config.cfg['runtime']
+            assert runtime.cache.maxsize == 2
+            LazyGlobalConfig.lazy = False
+            eager_config = SuiteConfig('lazy', str(suite_rc), run_dir=temp_dir)
+        assert list(runtime) == list(eager_config.cfg['runtime'])
+        for name in ['root', 'FAM', 'foo', 'bar', 'baz']:
+            rtconfig = runtime[name]
+            assert as_dict(rtconfig) == as_dict(
+                eager_config.cfg['runtime'][name])
+            assert rtconfig['meta']['URL'] == 'http://lazy/' + name
+            assert rtconfig['job']['batch system'] == 'background'
+            assert len(runtime.cache) <= 2
+        assert config.taskdefs['foo'].rtconfig['environment'] == {
+            'FAM': 'fam', 'X': 'x'}
+        # Changes are not kept once evicted.
+        runtime['foo']['script'] = 'echo foo'
+        runtime['root']
+        runtime['FAM']
+        assert runtime['foo']['script'] == 'echo FAM'
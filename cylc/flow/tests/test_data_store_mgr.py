@@ -14,13 +14,16 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from collections import Counter
 from unittest import main
 
 from cylc.flow.tests.util import CylcWorkflowTestCase, create_task_proxy
 from cylc.flow.data_store_mgr import (
-    DataStoreMgr, task_mean_elapsed_time, ID_DELIM,
-    FAMILY_PROXIES, TASKS, TASK_PROXIES, WORKFLOW
+    DataStoreMgr, task_mean_elapsed_time, merge_deltas, apply_delta,
+    ID_DELIM, FAMILY_PROXIES, TASKS, TASK_PROXIES, WORKFLOW
 )
+from cylc.flow.data_messages_pb2 import (
+    PbTask, PbTaskProxy, PbWorkflow, TPDeltas)
 
 
 class FakeTDef:
@@ -33,6 +36,42 @@ def test_task_mean_elapsed_time():
     assert result == 5.0
 
 
+def test_merge_deltas():
+    delta = TPDeltas(time=1.0, pruned=['c'])
+    delta.deltas.add(
+        id='a', task='foo', state='waiting', outputs=['x'], is_held=True)
+    delta.deltas.add(id='b', task='foo', state='waiting')
+    new_delta = TPDeltas(time=2.0, pruned=['b'])
+    new_delta.deltas.add(id='a', state='running', outputs=['y'])
+    new_delta.deltas.add(id='c', task='foo', state='waiting')
+    # Applying the merged delta is the same as applying both in turn.
+    data = {
+        TASKS: {'foo': PbTask(proxies=['a', 'b', 'c'])},
+        TASK_PROXIES: {'c': PbTaskProxy(id='c', task='foo', state='failed')},
+        WORKFLOW: PbWorkflow(task_proxies=['a', 'b', 'c'])}
+    apply_delta(TASK_PROXIES, delta, data)
+    apply_delta(TASK_PROXIES, new_delta, data)
+    merge_deltas(TASK_PROXIES, delta, new_delta)
+    assert delta.time == 2.0
+    assert list(delta.pruned) == ['b']
+    merged = {element.id: element for element in delta.deltas}
+    assert merged == data[TASK_PROXIES]
+    assert list(merged['a'].outputs) == ['y']
+    assert not merged['a'].is_held
+    # A reloaded delta replaces the earlier one, and later ones merge in.
+    reloaded = TPDeltas(time=3.0, reloaded=True, checksum=5)
+    reloaded.deltas.add(id='d', task='foo', state='waiting')
+    merge_deltas(TASK_PROXIES, delta, reloaded)
+    assert delta == reloaded
+    new_delta = TPDeltas(time=4.0, checksum=6)
+    new_delta.deltas.add(id='d', state='running')
+    merge_deltas(TASK_PROXIES, delta, new_delta)
+    assert delta.reloaded
+    assert delta.checksum == 6
+    assert [(element.id, element.state) for element in delta.deltas] == [
+        ('d', 'running')]
+
+
 class TestDataStoreMgr(CylcWorkflowTestCase):
 
     suite_name = "five"
@@ -188,6 +227,56 @@ class TestDataStoreMgr(CylcWorkflowTestCase):
         self.assertEqual(
             len(point_fams), len(self._collect_states(FAMILY_PROXIES)))
 
+    def test_update_state_counts(self):
+        """Test family and workflow state counts are kept up to date
+        as task states change."""
+        self.data_store_mgr.initiate_data_model()
+        update_tasks = self.task_pool.get_all_tasks()
+        self.data_store_mgr.update_data_structure(update_tasks)
+        self.assertEqual(
+            Counter(self._collect_states(TASK_PROXIES)),
+            dict(self.data[WORKFLOW].state_totals))
+        itask = update_tasks[0]
+        point_string = str(itask.point)
+        fp_id = f'{self.data_store_mgr.workflow_id}|{point_string}|root'
+        self.data_store_mgr.update_state_counts(
+            point_string, itask.tdef.name, 'failed', True)
+        self.assertEqual(1, self.data_store_mgr.held_total)
+        self.assertEqual(1, self.data_store_mgr.state_totals['failed'])
+        self.data_store_mgr.update_family_proxies([point_string])
+        fp_delta = self.data_store_mgr.updates[FAMILY_PROXIES][fp_id]
+        self.assertEqual('failed', fp_delta.state)
+        self.assertTrue(fp_delta.is_held)
+        # Nothing changed since.
+        self.data_store_mgr.updates[FAMILY_PROXIES].clear()
+        self.data_store_mgr.update_family_proxies([point_string])
+        self.assertEqual({}, self.data_store_mgr.updates[FAMILY_PROXIES])
+        self.data_store_mgr.update_state_counts(
+            point_string, itask.tdef.name, 'waiting', False)
+        self.assertEqual(0, self.data_store_mgr.held_total)
+        self.assertNotIn('failed', self.data_store_mgr.state_totals)
+        self.data_store_mgr.prune_points([point_string])
+        self.assertNotIn(point_string, self.data_store_mgr.family_states)
+        self.assertEqual(
+            len(self.data_store_mgr.cycle_states),
+            len(self.data_store_mgr.family_states))
+        self.assertEqual(
+            sum(len(states) for states in
+                self.data_store_mgr.cycle_states.values()),
+            sum(self.data_store_mgr.state_totals.values()))
+
+    def test_generate_ghost_task_existing(self):
+        """Test regenerating an existing task proxy keeps its state in the
+        state counts."""
+        self.data_store_mgr.initiate_data_model()
+        update_tasks = self.task_pool.get_all_tasks()
+        self.data_store_mgr.update_data_structure(update_tasks)
+        state_totals = dict(self.data_store_mgr.state_totals)
+        self.assertTrue(sum(state_totals.values()) > 0)
+        for itask in update_tasks:
+            self.data_store_mgr.generate_ghost_task(itask.identity)
+        self.assertEqual(state_totals, self.data_store_mgr.state_totals)
+
     def test_update_task_proxies(self):
         """Test update_task_proxies. This method will iterate over given
         task instances (TaskProxy), and update any corresponding
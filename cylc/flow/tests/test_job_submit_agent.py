@@ -0,0 +1,85 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from io import BytesIO
+from pathlib import Path
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+import unittest
+
+from cylc.flow.batch_sys_manager import BatchSysManager
+from cylc.flow.job_submit_agent import (
+    FrameDecoder, get_frame, get_request, read_frame, submit)
+from cylc.flow.subprocctx import SubProcContext
+
+
+class TestJobSubmitAgent(unittest.TestCase):
+
+    def test_frames(self):
+        """Test frames are decoded whole, however the data is split."""
+        data = [{'a': 1}, {'b': 'x\ny'}, {}]
+        frames = b''.join(get_frame(item) for item in data)
+        handle = BytesIO(frames)
+        self.assertEqual(
+            [read_frame(handle) for _ in range(4)], data + [None])
+        decoder = FrameDecoder()
+        results = []
+        for i in range(0, len(frames), 3):
+            results += decoder.decode(frames[i:i + 3])
+        self.assertEqual(results, data)
+        with self.assertRaises(EOFError):
+            read_frame(BytesIO(get_frame(data[0])[:-1]))
+
+    def test_get_request(self):
+        """Test the request for a "cylc jobs-submit" command."""
+        with NamedTemporaryFile() as handle:
+            handle.write(b'job file\n')
+            handle.flush()
+            ctx = SubProcContext('jobs-submit', [
+                'cylc', 'jobs-submit', '--debug', '--host=h', '--remote-mode',
+                '--', '$HOME/cylc-run/s/log/job', '1/a/01', '1/b/01'],
+                stdin_files=[handle.name])
+            self.assertEqual(get_request(ctx), {
+                'job_log_root': '$HOME/cylc-run/s/log/job',
+                'job_log_dirs': ['1/a/01', '1/b/01'],
+                'remote_mode': True,
+                'utc_mode': False,
+                'stdin': 'job file\n',
+            })
+
+    def test_submit_remote_mode(self):
+        """Test serving a request with job files in STDIN."""
+        job = (
+            '#!/bin/bash\n'
+            '# Job submit method: background\n'
+            '# Job log directory: 1/t/01\n'
+            'true\n'
+            '#EOF: 1/t/01\n')
+        with TemporaryDirectory() as temp_dir:
+            response = submit(BatchSysManager(), {
+                'job_log_root': temp_dir,
+                'job_log_dirs': ['1/t/01'],
+                'remote_mode': True,
+                'stdin': job,
+            })
+            self.assertEqual(
+                Path(temp_dir, '1', 't', '01', 'job').read_text(), job)
+        self.assertEqual(response['ret_code'], 0)
+        self.assertIn('|1/t/01|0|', response['out'])
+        self.assertEqual(response['err'], '')
+
+
+if __name__ == '__main__':
+    unittest.main()
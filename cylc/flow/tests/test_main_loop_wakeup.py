@@ -0,0 +1,69 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from subprocess import Popen
+from threading import Timer
+from time import time
+
+import pytest
+
+from cylc.flow.main_loop_wakeup import MainLoopWakeup, WakeupQueue
+
+
+@pytest.fixture
+def wakeup():
+    wakeup = MainLoopWakeup()
+    yield wakeup
+    wakeup.close()
+
+
+def test_wait_timeout(wakeup):
+    """Wait returns False on timeout if not woken up."""
+    time0 = time()
+    assert not wakeup.wait(0.1)
+    assert time() - time0 >= 0.1
+
+
+def test_set_clear(wakeup):
+    """Wait returns True when set, until cleared."""
+    wakeup.set()
+    wakeup.set()
+    assert wakeup.wait(0.0)
+    assert wakeup.wait(0.0)
+    wakeup.clear()
+    assert not wakeup.wait(0.0)
+
+
+def test_queue_put(wakeup):
+    """Putting an item in a WakeupQueue from another thread wakes up."""
+    queue = WakeupQueue(wakeup)
+    assert queue.time_put is None
+    timer = Timer(0.1, queue.put, ['hello'])
+    timer.start()
+    time0 = time()
+    assert wakeup.wait(10.0)
+    assert time() - time0 < 10.0
+    assert queue.get() == 'hello'
+    assert queue.time_put >= time0
+    timer.join()
+
+
+def test_sigchld(wakeup):
+    """Exit of a child process wakes up."""
+    wakeup.install_sigchld()
+    proc = Popen(['true'])
+    assert wakeup.wait(10.0)
+    proc.wait()
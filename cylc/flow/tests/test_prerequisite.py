@@ -0,0 +1,80 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from cylc.flow.exceptions import TriggerExpressionError
+from cylc.flow.prerequisite import Prerequisite, _COMPILED_CONDITIONS
+
+
+def make_prereq(point, expr, messages):
+    """Return a conditional prerequisite on messages at point."""
+    prereq = Prerequisite(point)
+    for name, output in messages:
+        prereq.add(name, point, output)
+    prereq.set_condition(expr)
+    return prereq
+
+
+@pytest.mark.parametrize(
+    'outputs,expected',
+    [
+        ([], False),
+        ([('a', 'succeeded')], False),
+        ([('b', 'succeeded')], False),
+        ([('a', 'succeeded'), ('b', 'succeeded')], True),
+        ([('c', 'failed')], True),
+    ]
+)
+def test_conditional_is_satisfied(outputs, expected):
+    """Test evaluation of a conditional expression."""
+    prereq = make_prereq(
+        '1',
+        '(a.1 succeeded & b.1 succeeded) | c.1 failed',
+        [('a', 'succeeded'), ('b', 'succeeded'), ('c', 'failed')])
+    assert not prereq.is_satisfied()
+    prereq.satisfy_me(set((name, '1', output) for name, output in outputs))
+    assert prereq.is_satisfied() == expected
+    assert prereq.get_raw_conditional_expression() == (
+        '(a.1 succeeded & b.1 succeeded) | c.1 failed')
+
+
+def test_conditional_shared():
+    """Prerequisites of the same dependency share the compiled expression."""
+    prereqs = [
+        make_prereq(
+            point,
+            'a.%s succeeded | b.%s succeeded' % (point, point),
+            [('a', 'succeeded'), ('b', 'succeeded')])
+        for point in ('1', '2')]
+    for prereq in prereqs:
+        prereq.is_satisfied()
+    shape = prereqs[0]._conditional_shape
+    assert shape == 's[0] | s[1]'
+    assert shape is prereqs[1]._conditional_shape
+    assert shape in _COMPILED_CONDITIONS
+    prereqs[1].satisfy_me({('b', '2', 'succeeded')})
+    assert not prereqs[0].is_satisfied()
+    assert prereqs[1].is_satisfied()
+
+
+def test_conditional_bad_expression():
+    """Test an illegal expression raises TriggerExpressionError."""
+    prereq = make_prereq(
+        '1', 'a.1 succeeded | (b.1 succeeded',
+        [('a', 'succeeded'), ('b', 'succeeded')])
+    with pytest.raises(TriggerExpressionError):
+        prereq.is_satisfied()
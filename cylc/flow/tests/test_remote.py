@@ -0,0 +1,86 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+from tempfile import TemporaryDirectory
+import unittest
+from unittest import mock
+
+from cylc.flow.remote import (
+    SSH_CONTROL_DIR_ENV, SSHControlMaster, construct_ssh_cmd)
+
+
+def get_host_item(ssh_command, ssh_control_master=True):
+    """Return a mock of GlobalConfig.get_host_item."""
+    items = {
+        'ssh command': ssh_command,
+        'ssh control master': ssh_control_master,
+        'use login shell': False,
+        'cylc executable': 'cylc',
+    }
+    return lambda key, host=None, user=None: items[key]
+
+
+class TestRemote(unittest.TestCase):
+
+    @mock.patch('cylc.flow.remote.glbl_cfg')
+    def test_construct_ssh_cmd_control_master(self, mock_glbl_cfg):
+        """Test ssh commands connect via the control master if any."""
+        mock_glbl_cfg.return_value.get_host_item.side_effect = (
+            get_host_item('ssh -oBatchMode=yes'))
+        with mock.patch.dict(os.environ):
+            os.environ.pop(SSH_CONTROL_DIR_ENV, None)
+            self.assertEqual(
+                construct_ssh_cmd(['true'], user='me', host='foo')[:2],
+                ['ssh', '-oBatchMode=yes'])
+            os.environ[SSH_CONTROL_DIR_ENV] = '/tmp/cylc-ssh-x'
+            command = construct_ssh_cmd(['true'], user='me', host='foo')
+        self.assertEqual(command[:5], [
+            'ssh', '-oBatchMode=yes', '-oControlMaster=no',
+            '-oControlPath=/tmp/cylc-ssh-x/%C', 'me@foo'])
+
+    @mock.patch('cylc.flow.remote.glbl_cfg')
+    def test_ssh_control_master(self, mock_glbl_cfg):
+        """Test start, stop and exit of an SSH control master."""
+        mock_glbl_cfg.return_value.get_host_item.side_effect = (
+            get_host_item('sh -c "sleep 10"'))
+        with TemporaryDirectory() as ctrl_dir:
+            master = SSHControlMaster('foo', None, ctrl_dir)
+            self.assertEqual(master.get_cmd(), [
+                'sh', '-c', 'sleep 10',
+                '-oControlPath=%s' % os.path.join(ctrl_dir, '%C'),
+                '-N', '-oControlMaster=yes', '-oControlPersist=no', 'foo'])
+            self.assertEqual(
+                master.get_check_cmd()[-3:], ['-O', 'check', 'foo'])
+            self.assertFalse(master.is_alive())
+            master.start()
+            self.assertTrue(master.is_alive())
+            master.stop()
+            self.assertFalse(master.is_alive())
+            self.assertIsNone(master.proc)
+            # Control master exits on error
+            mock_glbl_cfg.return_value.get_host_item.side_effect = (
+                get_host_item('sh -c "echo oops >&2; exit 3"'))
+            master.start()
+            master.proc.wait()
+            self.assertFalse(master.is_alive())
+            self.assertEqual(master.proc.returncode, 3)
+            self.assertEqual(master.get_err(), 'oops\n')
+            master.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
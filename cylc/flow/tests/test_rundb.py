@@ -22,6 +22,8 @@ import unittest
 from tempfile import mktemp
 from unittest import mock
 
+import pytest
+
 from cylc.flow.rundb import CylcSuiteDAO
 from cylc.flow.tests.util import set_up_globalrc
 
@@ -267,5 +269,73 @@ def test_upgrade_to_platforms(set_up_globalrc):
         assert not dao.upgrade_to_platforms()
 
 
+def test_writer(tmp_path):
+    """Test writes in a background thread."""
+    dao = CylcSuiteDAO(str(tmp_path / 'db'))
+    dao.start_writer()
+    try:
+        for point in range(3):
+            dao.add_insert_item(
+                CylcSuiteDAO.TABLE_TASK_POOL,
+                {'cycle': str(point), 'name': 'foo', 'status': 'waiting'})
+            dao.execute_queued_items()
+        dao.add_delete_item(CylcSuiteDAO.TABLE_TASK_POOL, {'cycle': '1'})
+        dao.execute_queued_items()
+        # Reads wait for queued writes.
+        assert [
+            row for row in dao.connect().execute(
+                'SELECT cycle FROM task_pool ORDER BY cycle')
+        ] == [('0',), ('2',)]
+        assert [
+            row for row in dao.connect().execute('PRAGMA journal_mode')
+        ] == [('wal',)]
+    finally:
+        dao.close()
+    assert dao.writer is None
+
+
+def test_retry_queued_items(tmp_path):
+    """Test statements of failed public writes are retried in order."""
+    db_file_name = str(tmp_path / 'db')
+    CylcSuiteDAO(db_file_name).close()
+    dao = CylcSuiteDAO(db_file_name, is_public=True)
+    lock_conn = sqlite3.connect(db_file_name)
+    lock_conn.execute('BEGIN EXCLUSIVE')
+    try:
+        dao.add_insert_item(
+            CylcSuiteDAO.TABLE_TASK_POOL,
+            {'cycle': '1', 'name': 'foo', 'status': 'waiting'})
+        dao.execute_queued_items()
+        dao.add_delete_item(
+            CylcSuiteDAO.TABLE_TASK_POOL, {'cycle': '1', 'name': 'foo'})
+        dao.add_insert_item(
+            CylcSuiteDAO.TABLE_TASK_POOL,
+            {'cycle': '2', 'name': 'foo', 'status': 'waiting'})
+        dao.execute_queued_items()
+        assert dao.n_tries == 2
+        assert not dao.retry_queued_items(timeout=0.1)
+    finally:
+        lock_conn.close()
+    assert dao.retry_queued_items(timeout=0.1)
+    assert dao.pending_stmts == []
+    assert list(
+        dao.connect().execute('SELECT cycle FROM task_pool')) == [('2',)]
+    dao.close()
+
+
+def test_writer_private_error(tmp_path):
+    """Test errors writing to the private database reach the main thread."""
+    dao = CylcSuiteDAO(str(tmp_path / 'db'))
+    dao.start_writer()
+    dao.add_update_item(
+        CylcSuiteDAO.TABLE_TASK_POOL, {'status': 'waiting'}, {'cycle': '1'})
+    dao.tables[CylcSuiteDAO.TABLE_TASK_POOL].update_queues = {
+        'UPDATE nowhere SET x=?': [['y']]}
+    dao.execute_queued_items()
+    with pytest.raises(sqlite3.OperationalError):
+        dao.flush()
+    dao.close()
+
+
 if __name__ == '__main__':
     unittest.main()
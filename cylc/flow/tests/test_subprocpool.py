@@ -16,11 +16,16 @@
 
 from tempfile import NamedTemporaryFile, SpooledTemporaryFile, TemporaryFile,\
     TemporaryDirectory
+import sys
 import unittest
+from unittest import mock
 
 from pathlib import Path
+from time import sleep
 
-from cylc.flow.subprocctx import SubProcContext
+from cylc.flow.job_submit_agent import JobSubmitAgent
+from cylc.flow.subprocctx import SubFuncContext, SubProcContext
+from cylc.flow.task_events_mgr import CustomTaskEventHandlerContext
 from cylc.flow.subprocpool import SubProcPool, _XTRIG_FUNCS, get_func
 
 
@@ -137,6 +142,224 @@ class TestSubProcPool(unittest.TestCase):
         for handle in handles:
             handle.close()
 
+    def test_process(self):
+        """Test running commands in the pool, with large output."""
+        pool = SubProcPool()
+        ctxs = []
+        for i in range(pool.size + 1):
+            ctx = SubProcContext('parrot', [
+                'bash', '-c', 'head -c 200000 /dev/zero; echo %d >&2' % i])
+            pool.put_command(ctx, ctxs.append)
+        while pool.is_not_done():
+            pool.process()
+            sleep(0.01)
+        self.assertEqual(len(ctxs), pool.size + 1)
+        for i, ctx in enumerate(ctxs):
+            self.assertEqual(ctx.ret_code, 0)
+            self.assertEqual(ctx.out, '\0' * 200000)
+        self.assertEqual(
+            sorted(ctx.err for ctx in ctxs),
+            sorted('%d\n' % i for i in range(pool.size + 1)))
+        self.assertFalse(pool.is_process_due())
+
+    def test_process_limits(self):
+        """Test queued commands of a type at its limit do not block others."""
+        pool = SubProcPool()
+        pool.limits = {'event-handler': 1}
+        for _ in range(3):
+            pool.put_command(SubProcContext(
+                (('event-handler-00', 'failed'), 1), ['sleep', '10']))
+        pool.put_command(SubProcContext('jobs-submit', ['sleep', '10']))
+        self.assertTrue(pool.is_process_due())
+        pool.process()
+        self.assertEqual(
+            [pool.get_cmd_type(ctx.cmd_key) for _, ctx, _, _ in pool.runnings],
+            ['event-handler', 'jobs-submit'])
+        self.assertEqual(len(pool.queuings), 2)
+        self.assertFalse(pool.is_process_due())
+        pool.terminate()
+
+    def test_process_host_limits(self):
+        """Test queued commands to a host at its limit do not block others."""
+        pool = SubProcPool()
+        pool.size = 10
+        pool.host_limits = {'foo': 2, 'bar': None}
+        for host in ['foo', 'foo', 'foo', 'bar', 'bar', 'bar']:
+            pool.put_command(
+                SubProcContext('jobs-poll', ['sleep', '10'], host=host))
+        pool.put_command(SubProcContext('jobs-poll', ['sleep', '10']))
+        self.assertTrue(pool.is_process_due())
+        pool.process()
+        self.assertEqual(
+            [ctx.cmd_kwargs.get('host') for _, ctx, _, _ in pool.runnings],
+            ['foo', 'foo', 'bar', 'bar', 'bar', None])
+        self.assertEqual(len(pool.queuings), 1)
+        self.assertEqual(pool.n_runnings_by_host, {'foo': 2, 'bar': 3})
+        self.assertFalse(pool.is_process_due())
+        # Count of a host goes down when its commands exit
+        pool.proc_pool_timeout = 0.0
+        for _, ctx, _, _ in pool.runnings:
+            ctx.timeout = 0.0
+        pool.process()
+        self.assertEqual(
+            [ctx.cmd_kwargs.get('host') for _, ctx, _, _ in pool.runnings],
+            ['foo'])
+        self.assertEqual(pool.n_runnings_by_host, {'foo': 1, 'bar': 0})
+        pool.terminate()
+
+    @mock.patch('cylc.flow.subprocpool.glbl_cfg')
+    def test_get_host_limit(self, mock_glbl_cfg):
+        """Test default limit of commands to hosts with SSH control master."""
+        pool = SubProcPool()
+        mock_glbl_cfg.return_value.get_host_item.side_effect = (
+            lambda key, host: {
+                ('max concurrent commands', 'foo'): 3,
+                ('ssh control master', 'bar'): True,
+            }.get((key, host)))
+        self.assertEqual(pool._get_host_limit('foo'), 3)
+        self.assertEqual(pool._get_host_limit('bar'), pool.SSH_MAX_SESSIONS)
+        self.assertIsNone(pool._get_host_limit('baz'))
+        self.assertEqual(
+            pool.host_limits,
+            {'foo': 3, 'bar': pool.SSH_MAX_SESSIONS, 'baz': None})
+
+    def test_get_cmd_type(self):
+        """Test SubProcPool.get_cmd_type."""
+        for cmd_key, cmd_type in [
+            ('jobs-submit', 'jobs-submit'),
+            ((('event-handler-01', 'failed'), 1), 'event-handler'),
+            (('suite-event-handler-00', 'stalled'), 'suite-event-handler'),
+            (CustomTaskEventHandlerContext(
+                ('event-handler-00', 'failed'), 'event-handler', 'true'),
+             'event-handler'),
+        ]:
+            self.assertEqual(SubProcPool.get_cmd_type(cmd_key), cmd_type)
+
+    def test_process_function_workers(self):
+        """Test running functions in function worker processes."""
+        with TemporaryDirectory() as temp_dir:
+            python_dir = Path(temp_dir, "lib", "python")
+            python_dir.mkdir(parents=True)
+            (python_dir / "snooze.py").write_text(
+                "from time import sleep\n"
+                "def snooze(secs):\n"
+                "    print('snoozing')\n"
+                "    sleep(secs)\n"
+                "    return True, {'secs': secs}\n")
+            pool = SubProcPool()
+            pool.func_workers = 2
+            pool.proc_pool_timeout = 2.0
+            ctxs = []
+            for secs in [0, 0, 10]:
+                ctx = SubFuncContext('snooze', 'snooze', [secs], {})
+                ctx.update_command(temp_dir)
+                pool.put_command(ctx, ctxs.append)
+            while pool.is_not_done():
+                pool.process()
+                sleep(0.01)
+            pool.close()
+            pool.process()
+        self.assertEqual(
+            [(ctx.ret_code, ctx.out, ctx.err) for ctx in ctxs[0:2]],
+            [(0, '[true, {"secs": 0}]', 'snoozing\n')] * 2)
+        self.assertEqual(ctxs[2].ret_code, 1)
+        self.assertIn('killed on timeout', ctxs[2].err)
+        self.assertIsNone(pool.func_executor)
+
+    def test_process_job_submit_agent(self):
+        """Test running "cylc jobs-submit" commands in an agent."""
+        agent_cmd = [
+            sys.executable, '-c',
+            'from cylc.flow.job_submit_agent import run_agent; run_agent()']
+        pool = SubProcPool()
+        with TemporaryDirectory() as temp_dir, mock.patch.object(
+                JobSubmitAgent, 'get_cmd', return_value=agent_cmd), \
+                mock.patch.object(pool, '_use_agent', return_value=True):
+            job_dir = Path(temp_dir, '1', 't', '01')
+            job_dir.mkdir(parents=True)
+            (job_dir / 'job').write_text(
+                '#!/bin/bash\n# Job submit method: background\ntrue\n')
+            (job_dir / 'job').chmod(0o755)
+            ctxs = []
+            for job_log_dir in ['1/t/01', '1/t/02']:
+                pool.put_command(
+                    SubProcContext('jobs-submit', [
+                        'cylc', 'jobs-submit', '--', temp_dir, job_log_dir]),
+                    ctxs.append)
+            while pool.is_not_done():
+                pool.process()
+                sleep(0.01)
+            # One agent serves both commands, and is stopped on close.
+            self.assertEqual(list(pool.agents), [(None, None)])
+            pool.close()
+            pool.process()
+            self.assertEqual(pool.agents, {})
+        self.assertEqual(ctxs[0].ret_code, 0)
+        self.assertIn('|1/t/01|0|', ctxs[0].out)
+        self.assertEqual(ctxs[1].ret_code, 1)
+        self.assertIn('No such file or directory', ctxs[1].err)
+
+    def test_process_job_submit_agent_large_request(self):
+        """Test a request larger than the pipe does not block the pool."""
+        agent_cmd = [
+            sys.executable, '-c',
+            'import time; time.sleep(1);'
+            ' from cylc.flow.job_submit_agent import run_agent; run_agent()']
+        job = (
+            '#!/bin/bash\n'
+            '# Job submit method: background\n'
+            '# Job log directory: 1/t/01\n'
+            '#%s\n'
+            'true\n'
+            '#EOF: 1/t/01\n') % ('x' * (1 << 20))
+        pool = SubProcPool()
+        with TemporaryDirectory() as temp_dir, mock.patch.object(
+                JobSubmitAgent, 'get_cmd', return_value=agent_cmd), \
+                mock.patch.object(pool, '_use_agent', return_value=True), \
+                TemporaryFile() as handle:
+            handle.write(job.encode())
+            handle.seek(0)
+            ctxs = []
+            pool.put_command(
+                SubProcContext(
+                    'jobs-submit',
+                    ['cylc', 'jobs-submit', '--remote-mode', '--',
+                     temp_dir, '1/t/01'],
+                    stdin_files=[handle]),
+                ctxs.append)
+            pool.process()
+            agent = pool.agents[(None, None)]
+            self.assertTrue(agent.sendbuf)
+            while pool.is_not_done():
+                pool.process()
+                sleep(0.01)
+            self.assertEqual(agent.sendbuf, b'')
+            self.assertEqual(
+                Path(temp_dir, '1', 't', '01', 'job').read_text(), job)
+            pool.close()
+            pool.process()
+        self.assertEqual(ctxs[0].ret_code, 0)
+        self.assertIn('|1/t/01|0|', ctxs[0].out)
+
+    def test_process_job_submit_agent_bad(self):
+        """Test commands run as normal if an agent fails."""
+        pool = SubProcPool()
+        with mock.patch.object(
+                JobSubmitAgent, 'get_cmd', return_value=['false']), \
+                mock.patch('cylc.flow.subprocpool.glbl_cfg') as mock_cfg:
+            mock_cfg.return_value.get_host_item.return_value = True
+            ctxs = []
+            pool.put_command(
+                SubProcContext('jobs-submit', ['echo', '--', 'hello']),
+                ctxs.append)
+            while pool.is_not_done():
+                pool.process()
+                sleep(0.01)
+        self.assertEqual(pool.bad_agents, {(None, None)})
+        self.assertEqual(pool.agents, {})
+        self.assertEqual(ctxs[0].ret_code, 0)
+        self.assertEqual(ctxs[0].out, '-- hello\n')
+
     def test_xfunction(self):
         """Test xtrigger function import."""
         with TemporaryDirectory() as temp_dir:
@@ -0,0 +1,209 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from cylc.flow.suite_db_mgr import SuiteDatabaseManager
+
+
+def make_task(name, point, status='waiting', timeout=None):
+    """Return a minimal task proxy for writing to the task_pool table."""
+    return SimpleNamespace(
+        tdef=SimpleNamespace(name=name),
+        point=point,
+        has_spawned=False,
+        state=SimpleNamespace(
+            status=status, is_held=False, time_updated=None),
+        timeout=timeout,
+        poll_timer=None,
+        try_timers={},
+        submit_num=0,
+        get_try_num=lambda: 1)
+
+
+@pytest.fixture(params=[
+    SuiteDatabaseManager.WRITE_MODE_MAIN_LOOP,
+    SuiteDatabaseManager.WRITE_MODE_THREAD,
+])
+def suite_db_mgr(request, tmp_path):
+    """Return a started SuiteDatabaseManager, in each write mode."""
+    (tmp_path / 'pri').mkdir()
+    (tmp_path / 'pub').mkdir()
+    suite_db_mgr = SuiteDatabaseManager(
+        str(tmp_path / 'pri'), str(tmp_path / 'pub'))
+    suite_db_mgr.on_suite_start(is_restart=False, write_mode=request.param)
+    yield suite_db_mgr
+    suite_db_mgr.on_suite_shutdown()
+
+
+def select(dao, table):
+    """Return the sorted rows of a table."""
+    return sorted(dao.connect().execute('SELECT * FROM %s' % table))
+
+
+def test_put_task_pool(suite_db_mgr):
+    """Only rows of added, changed or removed tasks are written."""
+    itasks = [make_task('foo', point) for point in range(5)]
+    pool = SimpleNamespace(get_all_tasks=lambda: itasks)
+    suite_db_mgr.put_task_pool(pool)
+    assert suite_db_mgr.db_deletes_map['task_pool'] == [{}]
+    assert len(suite_db_mgr.db_inserts_map['task_pool']) == 5
+    suite_db_mgr.process_queued_ops()
+
+    # Nothing has changed.
+    suite_db_mgr.put_task_pool(pool)
+    assert not suite_db_mgr.db_deletes_map['task_pool']
+    assert not suite_db_mgr.db_inserts_map['task_pool']
+
+    itasks[1].state.status = 'succeeded'
+    itasks[2].timeout = 10.0
+    itasks.pop(3)
+    itasks.append(make_task('bar', 0))
+    suite_db_mgr.put_task_pool(pool)
+    assert suite_db_mgr.db_deletes_map['task_pool'] == [
+        {'cycle': '3', 'name': 'foo'}]
+    assert [
+        row['name'] + '.' + row['cycle']
+        for row in suite_db_mgr.db_inserts_map['task_pool']
+    ] == ['foo.1', 'bar.0']
+    assert suite_db_mgr.db_inserts_map['task_timeout_timers'] == [
+        {'name': 'foo', 'cycle': '2', 'timeout': 10.0}]
+    suite_db_mgr.process_queued_ops()
+
+    for dao in (suite_db_mgr.pri_dao, suite_db_mgr.pub_dao):
+        assert select(dao, 'task_pool') == sorted(
+            (str(itask.point), itask.tdef.name, 0, itask.state.status, 0)
+            for itask in itasks)
+        assert select(dao, 'task_timeout_timers') == [('2', 'foo', 10.0)]
+
+    # Checkpoints contain the current task pool.
+    suite_db_mgr.checkpoint('test')
+    suite_db_mgr.process_queued_ops()
+    assert [
+        row[1:] for row in select(
+            suite_db_mgr.pri_dao, 'task_pool_checkpoints')
+    ] == select(suite_db_mgr.pri_dao, 'task_pool')
+
+
+def test_put_task_event_timers(suite_db_mgr):
+    """Task event timers and task action timers share a table."""
+    timer = SimpleNamespace(
+        ctx=None, delays=[1.0], num=0, delay=None, timeout=None)
+    event_timers = {('event-handler-00', '1', 'foo', 1): timer}
+    task_events_mgr = SimpleNamespace(event_timers=event_timers)
+    itask = make_task('foo', 1)
+    itask.poll_timer = timer
+    pool = SimpleNamespace(get_all_tasks=lambda: [itask])
+    suite_db_mgr.put_task_event_timers(task_events_mgr)
+    suite_db_mgr.put_task_pool(pool)
+    assert suite_db_mgr.db_deletes_map['task_action_timers'] == [{}]
+    suite_db_mgr.process_queued_ops()
+    assert len(select(suite_db_mgr.pri_dao, 'task_action_timers')) == 2
+
+    event_timers.clear()
+    suite_db_mgr.put_task_event_timers(task_events_mgr)
+    suite_db_mgr.put_task_pool(pool)
+    assert len(suite_db_mgr.db_deletes_map['task_action_timers']) == 1
+    assert not suite_db_mgr.db_inserts_map['task_action_timers']
+    suite_db_mgr.process_queued_ops()
+    assert [
+        row[2] for row in select(suite_db_mgr.pri_dao, 'task_action_timers')
+    ] == ['"poll_timer"']
+
+
+def test_put_task_pool_pub_write_fail(suite_db_mgr):
+    """Statements kept after a failed public write are written in order."""
+    pub_dao = suite_db_mgr.pub_dao
+    timer = SimpleNamespace(
+        ctx=None, delays=[1.0], num=0, delay=None, timeout=None)
+    itask = make_task('foo', 1, timeout=10.0)
+    itask.poll_timer = timer
+    itasks = [itask]
+    pool = SimpleNamespace(get_all_tasks=lambda: itasks)
+    suite_db_mgr.put_task_pool(pool)
+    suite_db_mgr.process_queued_ops()
+    itasks.clear()
+    suite_db_mgr.put_task_pool(pool)
+    suite_db_mgr.process_queued_ops()
+    # Lock the public database, so the insert fails.
+    lock_conn = sqlite3.connect(pub_dao.db_file_name)
+    lock_conn.execute('BEGIN EXCLUSIVE')
+    itasks.append(itask)
+    suite_db_mgr.put_task_pool(pool)
+    suite_db_mgr.process_queued_ops()
+    pub_dao.flush()
+    assert pub_dao.n_tries == 1
+    lock_conn.close()
+    # The delete is written after the insert.
+    itasks.clear()
+    suite_db_mgr.put_task_pool(pool)
+    suite_db_mgr.process_queued_ops()
+    pub_dao.flush()
+    assert pub_dao.n_tries == 0
+    for dao in (suite_db_mgr.pri_dao, pub_dao):
+        for table in (
+                'task_pool', 'task_timeout_timers', 'task_action_timers'):
+            assert not select(dao, table)
+
+
+def test_copy_pri_to_pub(suite_db_mgr):
+    """The public database is a copy of the private one, not in WAL mode."""
+    pool = SimpleNamespace(get_all_tasks=lambda: [make_task('foo', 1)])
+    suite_db_mgr.put_task_pool(pool)
+    suite_db_mgr.process_queued_ops()
+    suite_db_mgr.pub_dao.add_delete_item('task_pool')
+    suite_db_mgr.process_queued_ops()
+    assert not select(suite_db_mgr.pub_dao, 'task_pool')
+    suite_db_mgr.copy_pri_to_pub()
+    assert select(suite_db_mgr.pub_dao, 'task_pool') == [
+        ('1', 'foo', 0, 'waiting', 0)]
+    assert list(
+        suite_db_mgr.pub_dao.connect().execute('PRAGMA journal_mode')
+    ) == [('delete',)]
+
+
+def test_recover_pub_from_pri(suite_db_mgr, monkeypatch):
+    """Recover the public database by retrying queued items if possible,
+    else by copying the private database."""
+    pub_dao = suite_db_mgr.pub_dao
+    monkeypatch.setattr(pub_dao, 'MAX_TRIES', 1)
+    monkeypatch.setattr(
+        pub_dao, 'retry_queued_items',
+        lambda orig=pub_dao.retry_queued_items: orig(timeout=0.1))
+    pub_dao.connect()
+    for i, name in enumerate(['foo', 'bar']):
+        # Lock the public database
+        lock_conn = sqlite3.connect(pub_dao.db_file_name)
+        lock_conn.execute('BEGIN EXCLUSIVE')
+        pool = SimpleNamespace(get_all_tasks=lambda: [make_task(name, 1)])
+        suite_db_mgr.put_task_pool(pool)
+        suite_db_mgr.process_queued_ops()
+        pub_dao.flush()
+        assert pub_dao.n_tries == 1
+        if i == 0:
+            # Lock released: items written by retrying
+            lock_conn.close()
+            suite_db_mgr.recover_pub_from_pri()
+        else:
+            # Still locked: database copied
+            suite_db_mgr.recover_pub_from_pri()
+            lock_conn.close()
+        assert pub_dao.n_tries == 0
+        assert not pub_dao.pending_stmts
+        assert select(pub_dao, 'task_pool') == [('1', name, 0, 'waiting', 0)]
@@ -14,9 +14,12 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from types import SimpleNamespace
 import unittest
 from unittest import mock
-from cylc.flow.task_events_mgr import TaskEventsManager
+from cylc.flow.task_action_timer import TaskActionTimer
+from cylc.flow.task_events_mgr import (
+    CustomTaskEventHandlerContext, TaskEventsManager)
 from cylc.flow.subprocctx import SubProcContext
 
 
@@ -52,6 +55,79 @@ class TestTaskEventsManager(unittest.TestCase):
         self.assertEqual(1, cylc_log.debug.call_count)
         self.assertTrue(cylc_log.debug.call_args.contains("ls /tmp/123"))
 
+    def test_pop_job_timers(self):
+        """Test that only tasks with a due job timer are popped."""
+        task_events_manager = TaskEventsManager(None, None, None, None, None)
+        itasks = []
+        for i, (poll_time, timeout) in enumerate(
+                [(10.0, None), (None, 20.0), (30.0, 5.0), (None, None)]):
+            itasks.append(SimpleNamespace(
+                identity='t%d.1' % i,
+                poll_timer=TaskActionTimer(timeout=poll_time),
+                timeout=timeout))
+            task_events_manager.add_job_timer(itasks[-1])
+        # Duplicated entries are popped once
+        task_events_manager.add_job_timer(itasks[0])
+        self.assertEqual([], task_events_manager.pop_job_timers(5.0))
+        self.assertEqual(
+            [itasks[2], itasks[0]], task_events_manager.pop_job_timers(15.0))
+        self.assertEqual([], task_events_manager.pop_job_timers(15.0))
+        self.assertEqual(
+            [itasks[1]], task_events_manager.pop_job_timers(100.0))
+        self.assertEqual([], task_events_manager._job_timers_heap)
+
+    @mock.patch("cylc.flow.task_action_timer.time")
+    @mock.patch("cylc.flow.task_events_mgr.time")
+    def test_process_events_timers(self, mock_time, mock_timer_time):
+        """Test that process_events only runs due event handlers."""
+        mock_timer_time.side_effect = mock_time
+        mock_time.return_value = 100.0
+        proc_pool = mock.Mock()
+        task_events_manager = TaskEventsManager(
+            None, proc_pool, None, None, None)
+        schd_ctx = SimpleNamespace(suite='suite', stop_mode=None)
+        id_keys = []
+        for i, timeout in enumerate([None, 50.0, 150.0]):
+            id_keys.append(
+                (('event-handler-%02d' % i, 'failed'), '1', 't%d' % i, 1))
+            task_events_manager.add_event_timer(id_keys[-1], TaskActionTimer(
+                CustomTaskEventHandlerContext(
+                    id_keys[-1][0], TaskEventsManager.HANDLER_CUSTOM, 'true'),
+                [10.0, 10.0],
+                timeout=timeout))
+        # 1st: delay set, not done; 2nd: done; 3rd: not due
+        task_events_manager.process_events(schd_ctx)
+        self.assertEqual(1, proc_pool.put_command.call_count)
+        self.assertEqual(
+            [id_keys[1]], proc_pool.put_command.call_args[0][2][1:])
+        timers = task_events_manager.event_timers
+        self.assertEqual(110.0, timers[id_keys[0]].timeout)
+        self.assertTrue(timers[id_keys[1]].is_waiting)
+        # Only the due entries are popped
+        self.assertEqual(
+            [110.0, 150.0],
+            sorted(item[0] for item in task_events_manager._event_timers_heap))
+        mock_time.return_value = 120.0
+        task_events_manager.process_events(schd_ctx)
+        self.assertEqual(2, proc_pool.put_command.call_count)
+        self.assertEqual(
+            [id_keys[0]], proc_pool.put_command.call_args[0][2][1:])
+        # A failed handler is retried after its waiting flag is unset
+        proc_ctx = SubProcContext(
+            (id_keys[0][0], 1), 'true', ret_code=1)
+        with mock.patch(
+                "cylc.flow.task_events_mgr.log_task_job_activity"):
+            task_events_manager._custom_handler_callback(
+                proc_ctx, schd_ctx, id_keys[0])
+        task_events_manager.process_events(schd_ctx)
+        self.assertEqual(2, proc_pool.put_command.call_count)
+        self.assertFalse(timers[id_keys[0]].is_waiting)
+        self.assertEqual(130.0, timers[id_keys[0]].timeout)
+        self.assertIn(
+            (130.0, id_keys[0]),
+            [(item[0], item[2])
+             for item in task_events_manager._event_timers_heap])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -15,6 +15,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import random
 import unittest
+from types import SimpleNamespace
 
 from cylc.flow.task_outputs import TaskOutputs
 
@@ -42,5 +43,29 @@ class TestMessageSorting(unittest.TestCase):
             self.assertEqual(output, self.TEST_MESSAGES, output)
 
 
+class TestListener(unittest.TestCase):
+
+    def test_listener(self):
+        """The listener is called on changes of completion status only."""
+        outputs = TaskOutputs(SimpleNamespace(outputs=[('x', 'message x')]))
+        calls = []
+        outputs.set_listener(lambda *args: calls.append(args))
+        outputs.set_completion('succeeded', True)
+        outputs.set_completion('succeeded', True)
+        outputs.set_msg_trg_completion(trigger='x', is_completed=True)
+        outputs.set_all_incomplete()
+        outputs.set_listener(None)
+        outputs.set_all_completed()
+        self.assertEqual(
+            calls,
+            [
+                ('succeeded', True),
+                ('message x', True),
+                ('succeeded', False),
+                ('message x', False),
+            ]
+        )
+
+
 if __name__ == '__main__':
     unittest.main()
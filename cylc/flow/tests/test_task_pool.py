@@ -0,0 +1,176 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from cylc.flow.cycling.integer import IntegerPoint
+from cylc.flow.prerequisite import Prerequisite
+from cylc.flow.taskdef import TaskDef
+from cylc.flow.task_pool import TaskPool
+from cylc.flow.task_state import (
+    TaskState,
+    TASK_STATUS_FAILED,
+    TASK_STATUS_SUCCEEDED,
+    TASK_STATUS_WAITING,
+)
+
+
+def make_task(name, point, upstream=None):
+    """Return a minimal task proxy, depending on upstream:succeeded."""
+    tdef = TaskDef(name, {}, 'live', point, True)
+    tstate = TaskState(tdef, point, TASK_STATUS_WAITING, False)
+    if upstream:
+        prereq = Prerequisite(point)
+        prereq.add(upstream, point, TASK_STATUS_SUCCEEDED)
+        tstate.prerequisites.append(prereq)
+    return SimpleNamespace(
+        tdef=tdef, point=point, identity=tstate.identity, state=tstate,
+        stop_point=None, submit_num=0)
+
+
+def make_pool(*itasks, limit=3, release=True):
+    """Return a task pool with itasks added to it.
+
+    If release is True, release itasks into the main pool.
+    """
+    config = MagicMock()
+    config.final_point = None
+    config.get_custom_runahead_limit.return_value = None
+    config.get_max_num_active_cycle_points.return_value = limit
+    config.sequences = []
+    pool = TaskPool(config, MagicMock(), MagicMock(), MagicMock())
+    pool.hold_point = None
+    pool.is_held = False
+    for itask in itasks:
+        pool.myq[itask.tdef.name] = 'default'
+        pool.add_to_runahead_pool(itask, is_new=False)
+        if release:
+            pool.release_runahead_task(itask)
+    return pool
+
+
+def get_released(pool):
+    """Return the sorted IDs of tasks in the main pool."""
+    return sorted(
+        itask.identity
+        for itasks in pool.pool.values() for itask in itasks.values())
+
+
+def test_match_dependencies_new_output():
+    """A newly completed output satisfies the dependent task."""
+    foo = make_task('foo', '1')
+    bar = make_task('bar', '1', upstream='foo')
+    pool = make_pool(foo, bar)
+    pool.match_dependencies()
+    assert not bar.state.prerequisites_are_all_satisfied()
+    foo.state.reset(TASK_STATUS_FAILED)
+    pool.match_dependencies()
+    assert not bar.state.prerequisites_are_all_satisfied()
+    foo.state.reset(TASK_STATUS_SUCCEEDED)
+    pool.match_dependencies()
+    assert bar.state.prerequisites_are_all_satisfied()
+
+
+def test_match_dependencies_new_task():
+    """A task entering the pool is matched against existing outputs."""
+    foo = make_task('foo', '1')
+    foo.state.reset(TASK_STATUS_SUCCEEDED)
+    pool = make_pool(foo)
+    pool.match_dependencies()
+    bar = make_task('bar', '1', upstream='foo')
+    pool.add_to_runahead_pool(bar, is_new=False)
+    pool.release_runahead_task(bar)
+    pool.match_dependencies()
+    assert bar.state.prerequisites_are_all_satisfied()
+
+
+def test_match_dependencies_removed_task():
+    """Outputs of tasks removed from the pool no longer satisfy anything."""
+    foo = make_task('foo', '1')
+    bar = make_task('bar', '1', upstream='foo')
+    pool = make_pool(foo, bar)
+    foo.state.reset(TASK_STATUS_SUCCEEDED)
+    pool.remove(foo)
+    pool.match_dependencies()
+    assert not bar.state.prerequisites_are_all_satisfied()
+    assert not pool._completed_outputs
+    pool.remove(bar)
+    assert not pool._prereq_index
+
+
+def test_release_runahead_tasks():
+    """Tasks are released up to the limit of active cycle points."""
+    itasks = [make_task('foo', IntegerPoint(i)) for i in range(1, 7)]
+    pool = make_pool(*itasks, limit=3, release=False)
+    assert pool.release_runahead_tasks()
+    assert get_released(pool) == ['foo.1', 'foo.2', 'foo.3']
+    assert not pool.release_runahead_tasks()
+    # Finishing the earliest task moves the runahead base point on.
+    itasks[0].state.reset(TASK_STATUS_SUCCEEDED)
+    assert pool.release_runahead_tasks()
+    assert get_released(pool) == ['foo.1', 'foo.2', 'foo.3', 'foo.4']
+    # Removing finished tasks does not release anything else.
+    pool.remove(itasks[0])
+    assert not pool.release_runahead_tasks()
+    assert pool._unfinished_points == [IntegerPoint(i) for i in range(2, 7)]
+    assert pool._runahead_points == [IntegerPoint(5), IntegerPoint(6)]
+    # Reset of a finished task holds the runahead base point back again.
+    itasks[1].state.reset(TASK_STATUS_FAILED)
+    itasks[1].state.reset(TASK_STATUS_WAITING)
+    assert not pool.release_runahead_tasks()
+    for itask in itasks[1:4]:
+        itask.state.reset(TASK_STATUS_SUCCEEDED)
+    assert pool.release_runahead_tasks()
+    assert not pool.runahead_pool
+    assert not pool._runahead_points
+
+
+def test_release_runahead_tasks_finished():
+    """Finished tasks are released regardless of the runahead limit."""
+    itasks = [make_task('foo', IntegerPoint(i)) for i in range(1, 5)]
+    itasks[3].state.reset(TASK_STATUS_SUCCEEDED)
+    pool = make_pool(*itasks, limit=1, release=False)
+    assert pool.release_runahead_tasks()
+    assert get_released(pool) == ['foo.1', 'foo.4']
+
+
+def test_get_ready_check_tasks():
+    """Only changed tasks and tasks due a timed check are examined."""
+    foo = make_task('foo', '1')
+    bar = make_task('bar', '1')
+    pool = make_pool(foo, bar)
+    # All tasks are examined in the first check.
+    assert len(pool.get_ready_check_tasks(0)) == 2
+    assert pool.get_ready_check_tasks(0) == []
+    assert pool.n_ready_check_tasks == 0
+    # Changed tasks.
+    foo.state.reset(is_held=True)
+    assert pool.get_ready_check_tasks(0) == [foo]
+    # Tasks due a timed check - only the earliest check time is kept.
+    pool.set_ready_check_time(bar, 20)
+    pool.set_ready_check_time(bar, 10)
+    pool.set_ready_check_time(bar, 30)
+    assert pool.get_ready_check_tasks(5) == []
+    assert pool.get_ready_check_tasks(10) == [bar]
+    assert pool.get_ready_check_tasks(100) == []
+    # Given tasks, if still in the pool.
+    pool.set_ready_check_time(bar, 10)
+    pool.remove(bar)
+    assert pool.get_ready_check_tasks(100, [foo, bar]) == [foo]
+    pool.set_ready_check_all()
+    assert pool.get_ready_check_tasks(0) == [foo]
+    assert pool.n_ready_check_tasks == 1
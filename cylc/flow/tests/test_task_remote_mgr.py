@@ -0,0 +1,85 @@
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import unittest
+from unittest import mock
+
+from cylc.flow.remote import SSH_CONTROL_DIR_ENV
+from cylc.flow.subprocctx import SubProcContext
+from cylc.flow.task_remote_mgr import TaskRemoteMgr
+
+
+def get_host_item(key, host=None, user=None):
+    """Mock of GlobalConfig.get_host_item."""
+    return {
+        'ssh command': 'sh -c "sleep 10"',
+        'ssh control master': host == 'foo',
+    }[key]
+
+
+class TestTaskRemoteMgr(unittest.TestCase):
+
+    @mock.patch('cylc.flow.remote.glbl_cfg')
+    @mock.patch('cylc.flow.task_remote_mgr.glbl_cfg')
+    def test_ssh_masters(self, mock_glbl_cfg, mock_remote_glbl_cfg):
+        """Test start, health check and stop of SSH control masters."""
+        for mock_cfg in mock_glbl_cfg, mock_remote_glbl_cfg:
+            mock_cfg.return_value.get_host_item.side_effect = get_host_item
+        proc_pool = mock.Mock()
+        task_remote_mgr = TaskRemoteMgr('suite', proc_pool)
+        with mock.patch.dict(os.environ):
+            task_remote_mgr._ssh_master_start('bar', None)
+            self.assertEqual(task_remote_mgr.ssh_masters, {})
+            task_remote_mgr._ssh_master_start('foo', None)
+            master = task_remote_mgr.ssh_masters[('foo', None)]
+            self.assertTrue(master.is_alive())
+            ctrl_dir = task_remote_mgr.ssh_ctrl_dir
+            self.assertTrue(os.path.isdir(ctrl_dir))
+            self.assertEqual(os.environ[SSH_CONTROL_DIR_ENV], ctrl_dir)
+            # Exited control master is restarted
+            proc = master.proc
+            proc.kill()
+            proc.wait()
+            task_remote_mgr.check_ssh_masters()
+            self.assertTrue(master.is_alive())
+            self.assertIsNot(master.proc, proc)
+            # Not checked again until the next interval
+            master.start_time -= 2 * task_remote_mgr.SSH_MASTER_CHECK_INTERVAL
+            task_remote_mgr.check_ssh_masters()
+            self.assertFalse(proc_pool.put_command.called)
+            # Control master not responding is restarted
+            task_remote_mgr.ssh_masters_check_time = None
+            task_remote_mgr.check_ssh_masters()
+            ctx, callback, args = proc_pool.put_command.call_args[0]
+            self.assertEqual(ctx.cmd, master.get_check_cmd())
+            proc = master.proc
+            ctx = SubProcContext(ctx.cmd_key, ctx.cmd, ret_code=255)
+            callback(ctx, *args)
+            self.assertTrue(master.is_alive())
+            self.assertIsNot(master.proc, proc)
+            self.assertIsNotNone(proc.poll())
+            # Control masters stopped on remote tidy
+            proc = master.proc
+            task_remote_mgr.remote_tidy()
+            self.assertIsNotNone(proc.poll())
+            self.assertEqual(task_remote_mgr.ssh_masters, {})
+            self.assertFalse(os.path.exists(ctrl_dir))
+            self.assertNotIn(SSH_CONTROL_DIR_ENV, os.environ)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -328,13 +328,11 @@ def test_callback(xtrigger_mgr):
     assert xtrigger_mgr.sat_xtrig
 
 
-def test_check_xtriggers(xtrigger_mgr_procpool):
+def test_check_xtriggers(xtrigger_mgr_procpool_broadcast):
     """Test check_xtriggers call.
 
-    check_xtriggers does pretty much the same as collate. The
-    difference is that besides tallying on all the xtriggers and
-    clock xtriggers available, it then proceeds to trying to
-    satisfy them."""
+    check_xtriggers tries to satisfy the xtriggers of the given tasks, and
+    remembers which tasks wait on each active function call."""
 
     # add a xtrigger
     # that will cause all_xtrig to be populated, but not all_xclock
@@ -344,7 +342,7 @@ def test_check_xtriggers(xtrigger_mgr_procpool):
         func_args=[],
         func_kwargs={}
     )
-    xtrigger_mgr_procpool.add_trig("get_name", get_name, 'fdir')
+    xtrigger_mgr_procpool_broadcast.add_trig("get_name", get_name, 'fdir')
     get_name.out = "[\"True\", {\"name\": \"Yossarian\"}]"
     tdef1 = TaskDef(
         name="foo",
@@ -369,7 +367,7 @@ def test_check_xtriggers(xtrigger_mgr_procpool):
         func_kwargs={}
     )
     wall_clock.out = "[\"True\", \"1\"]"
-    xtrigger_mgr_procpool.add_trig("wall_clock", wall_clock, "fdir")
+    xtrigger_mgr_procpool_broadcast.add_trig("wall_clock", wall_clock, "fdir")
     # create a task
     tdef2 = TaskDef(
         name="foo",
@@ -384,10 +382,45 @@ def test_check_xtriggers(xtrigger_mgr_procpool):
     # create task proxy
     itask2 = TaskProxy(tdef=tdef2, start_point=start_point)
 
-    xtrigger_mgr_procpool.check_xtriggers([itask1, itask2])
+    assert not xtrigger_mgr_procpool_broadcast.check_xtriggers(
+        [itask1, itask2])
     # won't be satisfied, as it is async, we are are not calling callback
-    assert not xtrigger_mgr_procpool.sat_xtrig
-    assert xtrigger_mgr_procpool.all_xtrig
+    assert not xtrigger_mgr_procpool_broadcast.sat_xtrig
+    assert not itask1.state.xtriggers_all_satisfied()
+    # itask1 is checked again when the function returns
+    assert not xtrigger_mgr_procpool_broadcast.get_callback_tasks()
+    ctx = xtrigger_mgr_procpool_broadcast.get_xtrig_ctx(itask1, "get_name")
+    ctx.out = "[true, {\"name\": \"Yossarian\"}]"
+    xtrigger_mgr_procpool_broadcast.callback(ctx)
+    assert xtrigger_mgr_procpool_broadcast.get_callback_tasks() == [itask1]
+    assert not xtrigger_mgr_procpool_broadcast.get_callback_tasks()
+    xtrigger_mgr_procpool_broadcast.check_xtriggers([itask1])
+    assert itask1.state.xtriggers_all_satisfied()
+
+
+def test_check_xtriggers_check_times(xtrigger_mgr_procpool):
+    """Test check_xtriggers returns when to check unsatisfied tasks again."""
+    wall_clock = SubFuncContext(
+        label="wall_clock",
+        func_name="wall_clock",
+        func_args=[],
+        func_kwargs={}
+    )
+    xtrigger_mgr_procpool.add_trig("wall_clock", wall_clock, "fdir")
+    tdef = TaskDef(
+        name="foo",
+        rtcfg=None,
+        run_mode="live",
+        start_point=1,
+        spawn_ahead=False
+    )
+    init()
+    sequence = ISO8601Sequence('P1D', '30000101T0000Z')
+    tdef.xtrig_labels[sequence] = ["wall_clock"]
+    itask = TaskProxy(tdef=tdef, start_point=ISO8601Point('30000101T0000Z'))
+    assert xtrigger_mgr_procpool.check_xtriggers([itask]) == {
+        itask.identity: itask.get_point_as_seconds()}
+    assert not itask.state.xtriggers_all_satisfied()
 
 
 # mock objects
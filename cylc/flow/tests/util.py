@@ -27,6 +27,7 @@ from cylc.flow.config import SuiteConfig
 from cylc.flow.job_pool import JobPool
 from cylc.flow.scheduler import Scheduler
 from cylc.flow.suite_db_mgr import SuiteDatabaseManager
+from cylc.flow.task_events_mgr import TaskEventsManager
 from cylc.flow.task_pool import TaskPool
 from cylc.flow.task_proxy import TaskProxy
 
@@ -120,11 +121,15 @@ class CylcWorkflowTestCase(TestCase):
         self.job_pool = JobPool(self.suite_name, self.owner)
         self.scheduler.job_pool = self.job_pool
 
+        # TaskEventsManager
+        self.task_events_mgr = TaskEventsManager(
+            self.suite_name, None, self.suite_db_mgr, None, self.job_pool)
+
         # TaskPool
         self.task_pool = TaskPool(
             self.suite_config,
             suite_db_mgr=self.suite_db_mgr,
-            task_events_mgr=None,
+            task_events_mgr=self.task_events_mgr,
             job_pool=self.job_pool)
         self.scheduler.pool = self.task_pool
 
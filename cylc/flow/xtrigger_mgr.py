@@ -18,12 +18,12 @@ import json
 import re
 from copy import deepcopy
 from time import time
-from typing import List, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 from cylc.flow import LOG
 import cylc.flow.flags
 from cylc.flow.hostuserutil import get_user
-from cylc.flow.xtriggers.wall_clock import wall_clock
+from cylc.flow.xtriggers.wall_clock import get_wall_clock_time, wall_clock
 
 from cylc.flow.subprocctx import SubFuncContext
 from cylc.flow.broadcast_mgr import BroadcastMgr
@@ -146,6 +146,10 @@ class XtriggerManager(object):
         self.active = []
         # All trigger and clock signatures in the current task pool.
         self.all_xtrig = []
+        # Tasks waiting on active functions, by signature.
+        self.active_tasks = {}
+        # Tasks to check again, after callback of functions they wait on.
+        self.callback_tasks = {}
 
         self.pflag = False
 
@@ -272,12 +276,17 @@ class XtriggerManager(object):
         ctx.update_command(self.suite_source_dir)
         return ctx
 
-    def satisfy_xtriggers(self, itask: TaskProxy):
+    def satisfy_xtriggers(self, itask: TaskProxy) -> Optional[float]:
         """Attempt to satisfy itask's xtriggers.
 
         Args:
             itask (TaskProxy): TaskProxy
+        Returns:
+            Optional[float]: the next time itask's xtriggers need checking
+                again, if any (tasks waiting on a function callback are
+                returned by get_callback_tasks instead).
         """
+        check_times = []
         for label, sig, ctx, _ in self._get_xtrigs(itask, unsat_only=True):
             if sig.startswith("wall_clock"):
                 # Special case: synchronous clock check.
@@ -290,6 +299,9 @@ class XtriggerManager(object):
                     itask.state.xtriggers[label] = True
                     self.sat_xtrig[sig] = {}
                     LOG.info('xtrigger satisfied: %s = %s', label, sig)
+                else:
+                    check_times.append(
+                        get_wall_clock_time(*ctx.func_args, **ctx.func_kwargs))
                 continue
             # General case: asynchronous xtrigger function call.
             if sig in self.sat_xtrig:
@@ -310,15 +322,21 @@ class XtriggerManager(object):
                 continue
             if sig in self.active:
                 # Already waiting on this result.
+                self.active_tasks[sig][itask.identity] = itask
                 continue
             now = time()
             if sig in self.t_next_call and now < self.t_next_call[sig]:
                 # Too soon to call this one again.
+                check_times.append(self.t_next_call[sig])
                 continue
             self.t_next_call[sig] = now + ctx.intvl
             # Queue to the process pool, and record as active.
             self.active.append(sig)
+            self.active_tasks[sig] = {itask.identity: itask}
             self.proc_pool.put_command(ctx, self.callback)
+        if check_times:
+            return min(check_times)
+        return None
 
     def collate(self, itasks: List[TaskProxy]):
         """Get list of all current xtrigger signatures.
@@ -343,6 +361,7 @@ class XtriggerManager(object):
         LOG.debug(ctx)
         sig = ctx.get_signature()
         self.active.remove(sig)
+        self.callback_tasks.update(self.active_tasks.pop(sig, {}))
         try:
             satisfied, results = json.loads(ctx.out)
         except (ValueError, TypeError):
@@ -353,13 +372,30 @@ class XtriggerManager(object):
             self.pflag = True
             self.sat_xtrig[sig] = results
 
-    def check_xtriggers(self, itasks: List[TaskProxy]):
+    def check_xtriggers(
+        self, itasks: List[TaskProxy]
+    ) -> Dict[str, float]:
         """See if any xtriggers are satisfied.
 
+        Only the given tasks are checked: those that have changed or are due
+        a check, plus those returned by get_callback_tasks.
+
         Args:
             itasks (List[TaskProxy]): list of TaskProxy's
+        Returns:
+            Dict[str, float]: the next time each task's xtriggers need
+                checking again, by task ID.
         """
-        self.collate(itasks)
+        check_times = {}
         for itask in itasks:
             if itask.state.xtriggers:
-                self.satisfy_xtriggers(itask)
+                check_time = self.satisfy_xtriggers(itask)
+                if check_time is not None:
+                    check_times[itask.identity] = check_time
+        return check_times
+
+    def get_callback_tasks(self) -> List[TaskProxy]:
+        """Return (and forget) tasks waiting on functions that returned."""
+        itasks = list(self.callback_tasks.values())
+        self.callback_tasks.clear()
+        return itasks
@@ -24,8 +24,13 @@ from cylc.flow.cycling.iso8601 import interval_parse
 
 def wall_clock(offset=None, point_as_seconds=None):
     """Return True if now > (point + offset) else False."""
+    return time() > get_wall_clock_time(offset, point_as_seconds)
+
+
+def get_wall_clock_time(offset=None, point_as_seconds=None):
+    """Return (point + offset) in seconds since epoch."""
     if offset is None:
         offset_as_seconds = 0
     else:
         offset_as_seconds = int(interval_parse(offset).get_seconds())
-    return time() > (point_as_seconds + offset_as_seconds)
+    return point_as_seconds + offset_as_seconds
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Standalone performance test of conditional prerequisite evaluation.
+
+Compares evaluation of wide family triggers, e.g. "FAM:succeed-any => bar",
+by Prerequisite against the old method of text substitution and eval() of
+the trigger expression for every newly satisfied message.
+
+Usage: conditional-trigger-test.py [N_MEMBERS [N_TASKS]]
+"""
+
+import sys
+from time import time
+
+from cylc.flow.prerequisite import Prerequisite
+
+# Number of family members in the trigger expression.
+N_MEMBERS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+# Number of dependent tasks (i.e. cycle points), one prerequisite each.
+N_TASKS = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+OLD_TEMPLATE = 'bool(satisfied[("%s", "%s", "%s")])'
+
+
+def old_eval(expr, satisfied):
+    """Evaluate the trigger expression the old way."""
+    for message in satisfied:
+        expr = expr.replace(
+            Prerequisite.MESSAGE_TEMPLATE % message, OLD_TEMPLATE % message)
+    return eval(expr)
+
+
+def main():
+    """Time the old and new methods for each operator."""
+    for operator in ('|', '&'):
+        new_time = old_time = 0.0
+        for point in range(N_TASKS):
+            point = str(point)
+            messages = [
+                ('m%d' % ind, point, 'succeeded') for ind in range(N_MEMBERS)]
+            expr = operator.join(
+                Prerequisite.MESSAGE_TEMPLATE % message
+                for message in messages)
+            # Force conditional evaluation for '&' too.
+            if operator == '&':
+                expr = '(%s)|%s' % (
+                    expr, Prerequisite.MESSAGE_TEMPLATE % messages[0])
+
+            prereq = Prerequisite(point)
+            for message in messages:
+                prereq.add(*message)
+            prereq.set_condition(expr)
+            time0 = time()
+            for message in messages:
+                prereq.satisfy_me({message})
+            new_time += time() - time0
+
+            satisfied = dict.fromkeys(messages, False)
+            time0 = time()
+            for message in messages:
+                satisfied[message] = True
+                old_eval(expr, satisfied)
+            old_time += time() - time0
+        print('%d x "%s" of %d members: old %.3fs, new %.3fs (%.1fx)' % (
+            N_TASKS, operator, N_MEMBERS, old_time, new_time,
+            old_time / new_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Standalone performance test of ISO8601Point arithmetic and ordering.
+
+Compares ISO8601Point, which orders, hashes and adds fixed intervals by its
+integer seconds since the Unix epoch, against the old method of comparing
+and adding parsed strings (behind the memoize cache), for N_POINTS points.
+
+Usage: iso8601-point-benchmark.py [N_POINTS]
+"""
+
+import sys
+from time import time
+
+from cylc.flow.cycling import cmp
+from cylc.flow.cycling.iso8601 import (
+    ISO8601Interval, ISO8601Point, init, interval_parse, memoize,
+    point_parse)
+
+# Number of points.
+N_POINTS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+
+class OldISO8601Point(ISO8601Point):
+    """ISO8601Point, with the old string based methods."""
+
+    __slots__ = ()
+
+    def add(self, other):
+        return OldISO8601Point(self._old_add(self.value, other.value))
+
+    def __cmp__(self, other):
+        if self.value == other.value:
+            return 0
+        return self._old_cmp(self.value, other.value)
+
+    def __lt__(self, other):
+        return self.__cmp__(other) < 0
+
+    def __eq__(self, other):
+        return self.__cmp__(other) == 0
+
+    def __hash__(self):
+        return hash(self.value)
+
+    @staticmethod
+    @memoize
+    def _old_add(point_string, interval_string):
+        return str(point_parse(point_string) + interval_parse(interval_string))
+
+    @staticmethod
+    @memoize
+    def _old_cmp(point_string, other_point_string):
+        return cmp(
+            point_parse(point_string), point_parse(other_point_string))
+
+
+def run(point_cls):
+    """Return seconds taken to add, sort, min and hash points of point_cls.
+    """
+    interval = ISO8601Interval('PT1H')
+    time0 = time()
+    points = [point_cls('20000101T0000Z')]
+    for _ in range(N_POINTS - 1):
+        points.append(points[-1] + interval)
+    times = [time() - time0]
+    time0 = time()
+    points = sorted(reversed(points))
+    times.append(time() - time0)
+    time0 = time()
+    for _ in range(10):
+        min(points)
+    times.append(time() - time0)
+    time0 = time()
+    len(set(points))
+    times.append(time() - time0)
+    time0 = time()
+    for point in points:
+        str(point)
+    times.append(time() - time0)
+    return times
+
+
+def main():
+    """Time the old and new methods."""
+    init(time_zone='Z')
+    print('%d points' % N_POINTS)
+    print('%-10s %8s %8s %8s %8s %8s' % (
+        '', 'add', 'sort', 'min x10', 'set', 'str'))
+    for name, point_cls in ('old', OldISO8601Point), ('new', ISO8601Point):
+        print('%-10s %7.3fs %7.3fs %7.3fs %7.3fs %7.3fs' % (
+            (name,) + tuple(run(point_cls))))
+
+
+if __name__ == '__main__':
+    main()
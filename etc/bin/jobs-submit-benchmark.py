@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Standalone performance test of job submission throughput.
+
+Generates N_BATCHES batches of BATCH_SIZE trivial background jobs, and
+submits each batch as the suite server program would, with a new
+"cylc jobs-submit" command for each batch, and with requests to a
+persistent "cylc jobs-submit-agent". Prints the throughput in jobs/sec.
+
+Usage: jobs-submit-benchmark.py [N_BATCHES [BATCH_SIZE]]
+"""
+
+import os
+from subprocess import DEVNULL, PIPE, run
+import sys
+from tempfile import TemporaryDirectory
+from time import sleep, time
+
+from cylc.flow.job_submit_agent import JobSubmitAgent, read_frame
+from cylc.flow.subprocctx import SubProcContext
+
+# Number of batches.
+N_BATCHES = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+# Number of jobs in each batch.
+BATCH_SIZE = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+
+def get_batches(job_log_root, submit_num):
+    """Write the job files, and return the batches of job log dirs."""
+    batches = []
+    for i in range(N_BATCHES):
+        batch = []
+        for j in range(BATCH_SIZE):
+            job_log_dir = os.path.join(
+                str(i), 't%d' % j, '%02d' % submit_num)
+            os.makedirs(os.path.join(job_log_root, job_log_dir))
+            job_file_path = os.path.join(job_log_root, job_log_dir, 'job')
+            with open(job_file_path, 'w') as handle:
+                handle.write(
+                    '#!/bin/bash\n# Job submit method: background\ntrue\n')
+            os.chmod(job_file_path, 0o755)
+            batch.append(job_log_dir)
+        batches.append(batch)
+    return batches
+
+
+def check(out, batch):
+    """Check all the jobs of a batch are submitted."""
+    for job_log_dir in batch:
+        if '|%s|0|' % job_log_dir not in out:
+            sys.exit('%s: not submitted:\n%s' % (job_log_dir, out))
+
+
+def submit_by_command(job_log_root):
+    """Submit with a new "cylc jobs-submit" command for each batch."""
+    batches = get_batches(job_log_root, 1)
+    start = time()
+    for batch in batches:
+        proc = run(
+            ['cylc', 'jobs-submit', '--', job_log_root] + batch,
+            stdin=DEVNULL, stdout=PIPE, check=True)
+        check(proc.stdout.decode(), batch)
+    return time() - start
+
+
+def submit_by_agent(job_log_root):
+    """Submit with requests to a "cylc jobs-submit-agent"."""
+    batches = get_batches(job_log_root, 2)
+    start = time()
+    agent = JobSubmitAgent()
+    agent.start()
+    for batch in batches:
+        agent.queuings.append([SubProcContext(
+            'jobs-submit',
+            ['cylc', 'jobs-submit', '--', job_log_root] + batch), None, None])
+        agent.send()
+        check(read_frame(agent.proc.stdout)['out'], batch)
+    agent.proc.stdin.close()
+    agent.proc.wait()
+    return time() - start
+
+
+def main():
+    n_jobs = N_BATCHES * BATCH_SIZE
+    with TemporaryDirectory() as job_log_root:
+        for label, func in [
+                ('cylc jobs-submit', submit_by_command),
+                ('cylc jobs-submit-agent', submit_by_agent)]:
+            elapsed = func(job_log_root)
+            print('%-24s %4d jobs in %6.2fs: %7.1f jobs/sec' % (
+                label, n_jobs, elapsed, n_jobs / elapsed))
+        # Let the jobs finish writing their logs.
+        sleep(1)
+
+
+if __name__ == '__main__':
+    main()
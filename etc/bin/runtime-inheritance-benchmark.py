@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Standalone performance test of runtime namespace inheritance.
+
+Generates a suite of N_TASKS parameterised tasks, in a hierarchy of
+DEPTH levels of families, each with some settings. Compares the time and
+memory taken by SuiteConfig.compute_inheritance, which layers the settings
+of each namespace over those of its parent, sharing settings not
+overridden, against the old method of replicating every ancestor of each
+namespace into a new dict.
+
+Usage: runtime-inheritance-benchmark.py [N_TASKS [DEPTH]]
+"""
+
+import os
+import sys
+from tempfile import TemporaryDirectory
+from time import time
+import tracemalloc
+
+from cylc.flow.config import SuiteConfig
+from cylc.flow.parsec.OrderedDict import OrderedDictWithDefaults
+from cylc.flow.parsec.util import replicate
+
+# Number of tasks.
+N_TASKS = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+# Depth of the family hierarchy.
+DEPTH = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+# Number of families at each level.
+N_FAMILIES = 4
+
+
+class OldSuiteConfig(SuiteConfig):
+    """SuiteConfig, with the old replicating inheritance."""
+
+    def compute_inheritance(self):
+        results = OrderedDictWithDefaults()
+        nses = list(self.cfg['runtime'])
+        nses.sort(key=lambda ns: ns != 'root')
+        for ns in nses:
+            hierarchy = list(self.runtime['linearized ancestors'][ns])
+            hierarchy.reverse()
+            result = OrderedDictWithDefaults()
+            for name in hierarchy:
+                replicate(result, self.cfg['runtime'][name])
+            results[ns] = result
+        self.cfg['runtime'] = results
+
+
+def write_suite(suite_rc):
+    """Write the suite definition."""
+    lines = [
+        '[cylc]',
+        '    [[parameters]]',
+        '        i = 0..%d' % (N_TASKS - 1),
+        '[scheduling]',
+        '    [[graph]]',
+        '        R1 = "foo<i>"',
+        '[runtime]',
+        '    [[root]]',
+        '        script = echo "$CYLC_TASK_ID"',
+        '        [[[environment]]]',
+        '            ROOT = root',
+        '        [[[events]]]',
+        '            handlers = echo %(event)s',
+        '            handler events = failed, submission failed',
+    ]
+    parents = ['root']
+    for level in range(DEPTH):
+        names = []
+        for i in range(N_FAMILIES ** (level + 1)):
+            name = 'F%d_%d' % (level, i)
+            lines += [
+                '    [[%s]]' % name,
+                '        inherit = %s' % parents[i // N_FAMILIES],
+                '        [[[environment]]]',
+                '            %s = %d' % (name, i),
+                '        [[[directives]]]',
+                '            -l = select=%d' % level,
+            ]
+            names.append(name)
+        parents = names
+    lines += [
+        '    [[foo<i>]]',
+        '        inherit = %s' % parents[0],
+        '        [[[environment]]]',
+        '            I = ${CYLC_TASK_PARAM_i}',
+    ]
+    with open(suite_rc, 'w') as handle:
+        handle.write('\n'.join(lines) + '\n')
+
+
+def run(config_cls, suite_rc):
+    """Return (seconds, memory allocated in MB) of config_cls inheritance,
+    and memory retained (in MB) after the config is loaded."""
+    stats = {}
+
+    def mem_log(message):
+        stats[message] = (time(), tracemalloc.get_traced_memory()[0])
+
+    tracemalloc.start()
+    config = config_cls('benchmark', suite_rc)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del config
+    tracemalloc.start()
+    config_cls('benchmark', suite_rc, mem_log_func=mem_log)
+    tracemalloc.stop()
+    before = stats['config.py: before inheritance']
+    after = stats['config.py: after inheritance']
+    return (
+        after[0] - before[0], (after[1] - before[1]) / 1e6, retained / 1e6)
+
+
+def main():
+    """Time the old and new methods."""
+    print('%d tasks, %d levels of families' % (N_TASKS, DEPTH))
+    print('%-10s %12s %15s %15s' % (
+        '', 'inheritance', 'inheritance MB', 'config MB'))
+    with TemporaryDirectory() as temp_dir:
+        suite_rc = os.path.join(temp_dir, 'suite.rc')
+        write_suite(suite_rc)
+        for name, config_cls in ('old', OldSuiteConfig), ('new', SuiteConfig):
+            print('%-10s %11.3fs %15.1f %15.1f' % (
+                (name,) + run(config_cls, suite_rc)))
+
+
+if __name__ == '__main__':
+    main()
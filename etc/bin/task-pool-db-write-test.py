@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# THIS FILE IS PART OF THE CYLC SUITE ENGINE.
+# Copyright (C) 2008-2019 NIWA & British Crown (Met Office) & Contributors.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Standalone test of database writes per main loop iteration.
+
+Writes the task_pool table for a pool of N_TASKS tasks, changing the status
+of one task per iteration, and reports the bytes written to the private and
+public database files (as counted by the "wchar" field of /proc/self/io, so
+Linux only) and the time taken per iteration, for the incremental writes of
+SuiteDatabaseManager.put_task_pool and the old method of rewriting all rows.
+
+Usage: task-pool-db-write-test.py [N_TASKS [N_ITERATIONS]]
+"""
+
+import sys
+from tempfile import TemporaryDirectory
+from time import time
+from types import SimpleNamespace
+
+from cylc.flow.suite_db_mgr import SuiteDatabaseManager
+
+N_TASKS = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+N_ITERATIONS = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+
+def get_bytes_written():
+    """Return bytes written by this process so far."""
+    with open('/proc/self/io') as handle:
+        for line in handle:
+            key, value = line.split(':')
+            if key == 'wchar':
+                return int(value)
+
+
+def make_task(ind):
+    """Return a minimal task proxy for writing to the task_pool table."""
+    return SimpleNamespace(
+        tdef=SimpleNamespace(name='t%d' % ind),
+        point=1,
+        has_spawned=False,
+        state=SimpleNamespace(
+            status='waiting', is_held=False, time_updated=None),
+        timeout=None,
+        poll_timer=None,
+        try_timers={},
+        submit_num=0,
+        get_try_num=lambda: 1)
+
+
+def run(is_incremental):
+    """Return bytes written and time taken per iteration."""
+    itasks = [make_task(ind) for ind in range(N_TASKS)]
+    pool = SimpleNamespace(get_all_tasks=lambda: itasks)
+    with TemporaryDirectory() as pri_d, TemporaryDirectory() as pub_d:
+        suite_db_mgr = SuiteDatabaseManager(pri_d, pub_d)
+        suite_db_mgr.on_suite_start(is_restart=False)
+        suite_db_mgr.put_task_pool(pool)
+        suite_db_mgr.process_queued_ops()
+        bytes0 = get_bytes_written()
+        time0 = time()
+        for ind in range(N_ITERATIONS):
+            itasks[ind].state.status = 'succeeded'
+            if not is_incremental:
+                # Force rewrite of all rows.
+                suite_db_mgr.task_pool_rows = None
+            suite_db_mgr.put_task_pool(pool)
+            suite_db_mgr.process_queued_ops()
+        elapsed = time() - time0
+        n_bytes = get_bytes_written() - bytes0
+        suite_db_mgr.on_suite_shutdown()
+    return n_bytes / N_ITERATIONS, elapsed / N_ITERATIONS
+
+
+def main():
+    """Compare incremental and full writes of the task_pool table."""
+    print('%d tasks, 1 status change per iteration:' % N_TASKS)
+    for label, is_incremental in [('full', False), ('incremental', True)]:
+        n_bytes, elapsed = run(is_incremental)
+        print('  %-11s %12.0f bytes/iteration %8.3fs/iteration' % (
+            label, n_bytes, elapsed))
+
+
+if __name__ == '__main__':
+    main()